@@ -0,0 +1,79 @@
+"""
+Verify a large dump of claims (e.g. an overnight list of forwarded messages) in bulk.
+
+    python batch_verify.py forwards.jsonl verdicts.jsonl                      # resumes if interrupted
+    python batch_verify.py forwards.jsonl verdicts.jsonl --restart            # ignore the checkpoint
+    python batch_verify.py forwards.jsonl verdicts.jsonl --llm-concurrency 16 --near-threshold 0.95
+
+Input: one JSON object per line, {"id"?, "claim", "image_path"?} ("text"/"message" and
+"image" work too; plain-text lines are taken as the claim). Output: one line per input
+line with the verdict, answer and sources; duplicates carry `duplicate_of`.
+"""
+import json
+import os
+import time
+from typing import Optional
+
+import typer
+
+app = typer.Typer(help="Bulk claim verification.")
+
+
+@app.command()
+def verify(
+    input_path: str = typer.Argument(..., help="Claims JSONL"),
+    output_path: str = typer.Argument(..., help="Verdicts JSONL (appended to when resuming)"),
+    chunk_size: int = typer.Option(256, help="Claims embedded / retrieved / checkpointed together"),
+    llm_concurrency: int = typer.Option(8, help="Verdict LLM calls in flight"),
+    near_threshold: float = typer.Option(0.97, help="Cosine above which two claims count as the same"),
+    limit: Optional[int] = typer.Option(None, help="Stop after this many more input lines"),
+    restart: bool = typer.Option(False, "--restart", help="Start over instead of resuming"),
+    json_out: bool = typer.Option(False, "--json", help="Print the final report as JSON"),
+    log_level: str = typer.Option(os.getenv("LOG_LEVEL", "INFO"), help="WARNING hides the resume notice"),
+    log_format: str = typer.Option(os.getenv("LOG_FORMAT", "console"), help="console | json (degraded verdicts carry claim_id)"),
+    profile: Optional[str] = typer.Option(None, help="Profile the whole run: sample (all threads) | cprofile"),
+    profile_memory: bool = typer.Option(False, "--profile-memory", help="tracemalloc over the run, by model / search / prompt stage"),
+):
+    from src.runtime.logs import configure_logging
+    from src.runtime.profiling import KINDS as PROFILERS, maybe_profile
+
+    if profile is not None and profile not in PROFILERS:
+        raise typer.BadParameter(f"--profile must be one of: {', '.join(PROFILERS)}")
+
+    configure_logging(level=log_level, fmt=log_format)
+
+    from src.batch.backends import QdrantLLMBackend
+    from src.batch.claims import BatchVerifier
+
+    verifier = BatchVerifier(
+        QdrantLLMBackend(),
+        chunk_size=chunk_size,
+        llm_concurrency=llm_concurrency,
+        near_threshold=near_threshold,
+    )
+
+    def progress(summary):
+        print(
+            f"📈 {summary['claims']} claims ({summary['unique']} unique, {summary['llm_calls_saved']} deduped) "
+            f"in {summary['seconds']:.0f}s -> {summary['claims_per_sec']} claims/s"
+        )
+
+    with maybe_profile(profile, profile_memory, name=f"batch-{time.strftime('%Y%m%d-%H%M%S')}") as session:
+        summary = verifier.run(input_path, output_path, resume=not restart, limit=limit, on_chunk=progress)
+    if session is not None:
+        summary["profile"] = session.paths
+    if json_out:
+        print(json.dumps(summary, indent=2))
+        return
+    print(f"\n✅ {summary['claims']} claims -> {output_path}")
+    print(f"   unique {summary['unique']} | exact dupes {summary['exact_duplicates']} | "
+          f"near dupes {summary['near_duplicates']} | invalid {summary['invalid']} | degraded {summary['degraded']}")
+    print(f"   {summary['seconds']}s total, {summary['claims_per_sec']} claims/s")
+    for name, s in summary["stages"].items():
+        print(f"   ⏱️ {name:<8} {s['items']:>7} items, {s['seconds']:>8.1f}s busy, {s['per_sec']:>8} items/s")
+    if session is not None:
+        print(f"   🔬 Profile: {', '.join(session.paths)}")
+
+
+if __name__ == "__main__":
+    app()
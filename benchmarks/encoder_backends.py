@@ -0,0 +1,174 @@
+# benchmarks/encoder_backends.py
+"""
+Compares the dense encoder backends (torch / onnx / onnx-int8).
+
+    python benchmarks/encoder_backends.py drift --sample 200     # cosine vs the vectors stored in Qdrant
+    python benchmarks/encoder_backends.py latency --runs 50      # single-query latency + batch throughput
+
+ONNX graphs are exported on first use into ONNX_CACHE_DIR (same cache the app uses).
+"""
+import json
+import os
+import statistics
+import sys
+import time
+from typing import List, Optional
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (project root) so 'src' is importable
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import numpy as np
+import typer
+from dotenv import load_dotenv
+from sentence_transformers import SentenceTransformer
+
+load_dotenv()
+
+DENSE_TEXT_MODEL_NAME = "intfloat/multilingual-e5-base"
+DENSE_IMAGE_MODEL_NAME = "clip-ViT-B-32"
+BACKENDS = ["torch", "onnx", "onnx-int8"]
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", ".cache/onnx")
+
+SAMPLE_QUERIES = [
+    "Can EVMs be hacked via Bluetooth?",
+    "How do I check my name in the electoral roll?",
+    "VVPAT slips are counted in five random polling stations per constituency",
+    "क्या ईवीएम को हैक किया जा सकता है?",
+    "What is the Model Code of Conduct and when does it apply?",
+]
+
+app = typer.Typer(help="Dense encoder backend drift and latency benchmarks.")
+
+
+def _encoders(model_name, backends):
+    """One torch load, shared by every ONNX wrapper (they only borrow its tokenizer/processor)."""
+    from src.runtime.onnx_encoders import onnx_encoder
+    torch_model = SentenceTransformer(model_name)
+    encoders = {}
+    for backend in backends:
+        if backend == "torch":
+            encoders[backend] = torch_model
+        else:
+            encoders[backend] = onnx_encoder(torch_model, model_name, ONNX_CACHE_DIR, quantize=backend == "onnx-int8")
+    return encoders
+
+
+def _cosines(a, b):
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+def _drift_row(backend, vector_name, cosines):
+    return {
+        "backend": backend,
+        "vector": vector_name,
+        "n": int(len(cosines)),
+        "mean_cosine": round(float(np.mean(cosines)), 5),
+        "min_cosine": round(float(np.min(cosines)), 5),
+        "p01_cosine": round(float(np.percentile(cosines, 1)), 5),
+    }
+
+
+@app.command()
+def drift(
+    collection: str = typer.Option("Hybrid_Collection_CONVOLVE", help="Collection or alias holding torch vectors"),
+    sample: int = typer.Option(200, help="Points to re-encode"),
+    backends: List[str] = typer.Option(BACKENDS, "--backend", help="Backends to check"),
+    images: bool = typer.Option(True, help="Also check dense_image (fetches the images)"),
+    json_out: bool = typer.Option(False, "--json", help="Print rows as JSON"),
+):
+    """Cosine between each backend's vectors and the ones stored in Qdrant (encoded with torch)."""
+    from qdrant_client import QdrantClient
+    from src.ingestion.visual import ImageDownloader, decode_image
+
+    client = QdrantClient(url=os.getenv("QDRANT_CLUSTER_ENDPOINT"), api_key=os.getenv("QDRANT_API_KEY"))
+    points, _ = client.scroll(collection_name=collection, limit=sample, with_vectors=True, with_payload=True)
+    texts = [(p.payload.get("text_content"), p.vector.get("dense_text")) for p in points]
+    texts = [(t, v) for t, v in texts if t and v is not None]
+
+    rows = []
+    if texts:
+        stored = np.asarray([v for _, v in texts], dtype=np.float32)
+        for backend, encoder in _encoders(DENSE_TEXT_MODEL_NAME, backends).items():
+            encoded = encoder.encode([f"passage: {t}" for t, _ in texts], normalize_embeddings=True, batch_size=32)
+            rows.append(_drift_row(backend, "dense_text", _cosines(np.asarray(encoded), stored)))
+
+    visual = [(p.payload.get("image_url"), p.vector.get("dense_image")) for p in points]
+    visual = [(u, v) for u, v in visual if u and v is not None]
+    if images and visual:
+        downloader = ImageDownloader(os.path.join(".cache", "images"))
+        fetched = downloader.fetch_many([u for u, _ in visual])
+        pairs = [(decode_image(fetched[u]), v) for u, v in visual if not isinstance(fetched[u], Exception)]
+        if pairs:
+            stored = np.asarray([v for _, v in pairs], dtype=np.float32)
+            for backend, encoder in _encoders(DENSE_IMAGE_MODEL_NAME, backends).items():
+                encoded = encoder.encode([img for img, _ in pairs], normalize_embeddings=True, batch_size=32)
+                rows.append(_drift_row(backend, "dense_image", _cosines(np.asarray(encoded), stored)))
+
+    if json_out:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'backend':<10} {'vector':<12} {'n':>5} {'mean cos':>9} {'p01 cos':>9} {'min cos':>9}")
+    for r in rows:
+        print(f"{r['backend']:<10} {r['vector']:<12} {r['n']:>5} {r['mean_cosine']:>9} {r['p01_cosine']:>9} {r['min_cosine']:>9}")
+
+
+@app.command()
+def latency(
+    runs: int = typer.Option(50, help="Single-query encodes per backend"),
+    batch_size: int = typer.Option(32, help="Batch size for the throughput test"),
+    backends: List[str] = typer.Option(BACKENDS, "--backend", help="Backends to time"),
+    threads: Optional[int] = typer.Option(None, help="torch.set_num_threads (ONNX uses ONNX_THREADS)"),
+    json_out: bool = typer.Option(False, "--json", help="Print rows as JSON"),
+):
+    """p50/p95 single-query latency and batch throughput for the E5 and CLIP encoders."""
+    import torch
+    from PIL import Image
+
+    if threads:
+        torch.set_num_threads(threads)
+
+    rng = np.random.default_rng(0)
+    image_inputs = [
+        Image.fromarray(rng.integers(0, 255, size=(224, 224, 3), dtype=np.uint8)) for _ in range(batch_size)
+    ]
+    workloads = [
+        (DENSE_TEXT_MODEL_NAME, [f"query: {q}" for q in SAMPLE_QUERIES]),
+        (DENSE_IMAGE_MODEL_NAME, image_inputs),
+    ]
+
+    rows = []
+    for model_name, inputs in workloads:
+        batch = (inputs * (batch_size // len(inputs) + 1))[:batch_size]
+        for backend, encoder in _encoders(model_name, backends).items():
+            encoder.encode(inputs[0], normalize_embeddings=True)  # warm-up
+            timings = []
+            for i in range(runs):
+                start = time.perf_counter()
+                encoder.encode(inputs[i % len(inputs)], normalize_embeddings=True)
+                timings.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            encoder.encode(batch, normalize_embeddings=True, batch_size=batch_size)
+            batch_seconds = time.perf_counter() - start
+            timings.sort()
+            rows.append({
+                "model": model_name,
+                "backend": backend,
+                "p50_ms": round(statistics.median(timings), 2),
+                "p95_ms": round(timings[int(0.95 * (len(timings) - 1))], 2),
+                "batch_items_per_sec": round(batch_size / batch_seconds, 1),
+            })
+
+    if json_out:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'model':<32} {'backend':<10} {'p50 ms':>8} {'p95 ms':>8} {'batch/s':>9}")
+    for r in rows:
+        print(f"{r['model']:<32} {r['backend']:<10} {r['p50_ms']:>8} {r['p95_ms']:>8} {r['batch_items_per_sec']:>9}")
+
+
+if __name__ == "__main__":
+    app()
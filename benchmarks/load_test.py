@@ -0,0 +1,299 @@
+# benchmarks/load_test.py
+"""
+End-to-end load test: N simulated users replaying turns through build_graph(),
+with the stub LLM instead of Gemini and an in-process (or local) Qdrant.
+
+    python benchmarks/load_test.py --users 16 --turns 5                        # in-memory Qdrant, seeded from setup/
+    python benchmarks/load_test.py --users 16 --bundle dist/seed               # in-memory Qdrant, restored from an export
+    python benchmarks/load_test.py --users 32 --llm-latency 0.8 --think-time 2
+    python benchmarks/load_test.py --qdrant-url http://localhost:6333 --no-seed --out .cache/bench/load.json
+
+Every user has its own user_id / thread_id and sends golden-set claims
+(benchmarks/retrieval.py), optionally with an image from images/. The stub
+LLM answers with canned plans, profiles and verdicts after --llm-latency
+seconds. Reports end-to-end and per-node p50/p99, throughput and RSS.
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (project root) so 'src' is importable
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import typer
+
+SEED_FILES = [os.path.join(parent_dir, "setup", name) for name in ("clean_EVM.json", "clean_FAQ.json", "metadata.json")]
+
+app = typer.Typer(help="Concurrent-user load test of the agent graph.")
+
+
+def _percentile(ordered, q):
+    if not ordered: return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _latency(seconds):
+    ordered = sorted(seconds)
+    return {
+        "n": len(ordered),
+        "p50_ms": round(_percentile(ordered, 0.50) * 1000, 1),
+        "p99_ms": round(_percentile(ordered, 0.99) * 1000, 1),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 1) if ordered else 0.0,
+        "max_ms": round(ordered[-1] * 1000, 1) if ordered else 0.0,
+    }
+
+
+def rss_mb():
+    """Current resident set size (Linux /proc; falls back to the peak elsewhere)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 if sys.platform != "darwin" else peak / (1024 * 1024)  # KiB on Linux, bytes on macOS
+
+
+class RSSSampler:
+    """Highest RSS seen while the load runs (ru_maxrss alone would include model loading)."""
+
+    def __init__(self, interval=0.1):
+        self.interval = interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, rss_mb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, rss_mb())
+        return False
+
+
+def user_script(queries, user, turns, images=(), image_every=0):
+    """The (message, image_path) turns of one simulated user: deterministic, different per user."""
+    script = []
+    for turn in range(turns):
+        message = queries[(user * 7 + turn) % len(queries)]
+        image = None
+        if images and image_every and (user + turn) % image_every == 0:
+            image = images[(user + turn) % len(images)]
+        script.append((message, image))
+    return script
+
+
+def simulate(graph, scripts, think_time=0.0, ramp_up=0.0):
+    """
+    Runs every user's script on its own thread (users start spread over `ramp_up`
+    seconds). Returns (turn rows, wall seconds); a row holds the end-to-end time,
+    the node and call spans of that turn, and the error if it failed.
+    """
+    from src.runtime.metrics import turn_trace
+    from src.serving.session import new_thread_id, stream_turn
+
+    def run_user(user):
+        if ramp_up and len(scripts) > 1:
+            time.sleep(ramp_up * user / (len(scripts) - 1))
+        user_id, thread_id = f"loadtest_user_{user}", new_thread_id()
+        rows = []
+        for message, image in scripts[user]:
+            error = None
+            with turn_trace() as trace:
+                try:
+                    for _ in stream_turn(graph, message, user_id, thread_id, image):
+                        pass
+                except Exception as e:
+                    error = repr(e)
+            rows.append({"user": user, "seconds": trace.seconds, "spans": trace.spans, "error": error})
+            if think_time:
+                time.sleep(think_time)
+        return rows
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, len(scripts)), thread_name_prefix="user") as pool:
+        rows = [row for user_rows in pool.map(run_user, range(len(scripts))) for row in user_rows]
+    return rows, time.perf_counter() - started
+
+
+def load_report(rows, wall_seconds):
+    ok = [r for r in rows if not r["error"]]
+    nodes, calls = {}, {}
+    for r in ok:
+        for name, kind, _, seconds in r["spans"]:
+            target = nodes if kind == "node" else calls
+            target.setdefault(name if kind == "node" else f"{kind}:{name}", []).append(seconds)
+    return {
+        "turns": len(rows),
+        "errors": len(rows) - len(ok),
+        "error_samples": sorted({r["error"] for r in rows if r["error"]})[:5],
+        "wall_seconds": round(wall_seconds, 2),
+        "throughput_turns_per_sec": round(len(ok) / wall_seconds, 3) if wall_seconds else 0.0,
+        "end_to_end": _latency([r["seconds"] for r in ok]),
+        "nodes": {name: _latency(values) for name, values in nodes.items()},
+        "calls": {name: _latency(values) for name, values in sorted(calls.items())},
+    }
+
+
+def print_report(report):
+    e2e = report["end_to_end"]
+    print(f"\n📈 {report['turns']} turns ({report['errors']} failed) in {report['wall_seconds']}s "
+          f"-> {report['throughput_turns_per_sec']} turns/s")
+    print(f"   end-to-end  p50 {e2e['p50_ms']:>8} ms   p99 {e2e['p99_ms']:>8} ms   max {e2e['max_ms']:>8} ms")
+    for title, group in (("node", report["nodes"]), ("call", report["calls"])):
+        if not group: continue
+        print(f"   {title:<26} {'n':>5} {'p50 ms':>9} {'p99 ms':>9}")
+        for name, s in group.items():
+            print(f"   {name:<26} {s['n']:>5} {s['p50_ms']:>9} {s['p99_ms']:>9}")
+    rss = report.get("rss")
+    if rss:
+        print(f"   RSS: {rss['before_load_mb']} MB before load, peak {rss['peak_during_load_mb']} MB during it")
+    for error in report["error_samples"]:
+        print(f"   ❌ {error}")
+
+
+def seed_qdrant(bundle=None):
+    """
+    Fills a fresh (in-memory) Qdrant: the hybrid collection and an empty profile collection.
+    With a bundle, src.config already restored it into `client` (QDRANT_BOOTSTRAP_BUNDLE);
+    otherwise setup/ is ingested, which runs the models.
+    """
+    from qdrant_client import models
+    from src.config import client, dense_text_model, MEMORY_COLLECTION_NAME
+
+    if not client.collection_exists(MEMORY_COLLECTION_NAME):
+        client.create_collection(
+            collection_name=MEMORY_COLLECTION_NAME,
+            vectors_config={
+                "summary_vector": models.VectorParams(
+                    size=dense_text_model.get_sentence_embedding_dimension(), distance=models.Distance.COSINE,
+                )
+            },
+        )
+    if bundle:
+        return
+    from src.ingestion.pipeline import ingest
+    # Embedded Qdrant cannot be shared with upload processes; the manifest must start empty too
+    ingest(SEED_FILES, parallel=1, manifest_path=":memory:")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=parent_dir, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+@app.command()
+def run(
+    users: int = typer.Option(8, help="Concurrent simulated users"),
+    turns: int = typer.Option(3, help="Turns per user"),
+    think_time: float = typer.Option(0.0, help="Seconds a user waits between turns"),
+    ramp_up: float = typer.Option(0.0, help="Seconds over which the users start"),
+    image_every: int = typer.Option(0, help="Attach an image from images/ to every n-th turn (0: never)"),
+    llm_latency: float = typer.Option(0.5, help="Seconds the stub LLM takes per call"),
+    qdrant_url: str = typer.Option(":memory:", help="':memory:' (embedded) or a local Qdrant URL"),
+    seed: bool = typer.Option(True, help="Ingest setup/ into Qdrant first (needed for :memory:)"),
+    bundle: Optional[str] = typer.Option(None, help="Seed from a `setup/snapshot.py export` directory instead of ingesting"),
+    gateway_rate: float = typer.Option(1000.0, help="LLM gateway requests/s (production default is 5)"),
+    llm_cache: bool = typer.Option(False, "--llm-cache", help="Keep the LLM response cache (default: bypassed)"),
+    out: Optional[str] = typer.Option(None, help="Write the report JSON here"),
+    json_out: bool = typer.Option(False, "--json", help="Print the report as JSON"),
+):
+    """Replays concurrent users through the full graph and reports latency, throughput and RSS."""
+    from src.runtime.stub_llm import StubLLMServer
+
+    stub = StubLLMServer(latency=llm_latency).start()
+    # Everything src.config reads at import time
+    os.environ.update({
+        "LLM_BACKEND": "stub",
+        "STUB_LLM_URL": stub.url,
+        "QDRANT_CLUSTER_ENDPOINT": qdrant_url,
+        "LLM_RATE_PER_SECOND": str(gateway_rate),
+        "LLM_BURST": str(max(10, int(gateway_rate))),
+        "LLM_MAX_CONCURRENCY": str(max(16, users * 2)),
+        "LLM_CACHE_BYPASS": "0" if llm_cache else "1",
+    })
+    if seed and bundle:
+        os.environ["QDRANT_BOOTSTRAP_BUNDLE"] = bundle
+
+    from benchmarks.retrieval import build_golden
+    from src.graph.workflow import build_graph
+
+    if seed:
+        seed_qdrant(bundle)
+    graph = build_graph()
+
+    queries = [q["query"] for q in build_golden() if q["kind"] == "myth_question"]
+    images = sorted(
+        os.path.join(parent_dir, "images", name) for name in os.listdir(os.path.join(parent_dir, "images"))
+    ) if image_every else []
+    scripts = [user_script(queries, user, turns, images, image_every) for user in range(users)]
+
+    # One untimed turn: lazy model / client initialisation is not what we measure
+    simulate(graph, [scripts[0][:1]])
+
+    before = rss_mb()
+    with RSSSampler() as sampler:
+        rows, wall = simulate(graph, scripts, think_time, ramp_up)
+    stub.stop()
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "users": users,
+            "turns_per_user": turns,
+            "think_time": think_time,
+            "ramp_up": ramp_up,
+            "image_every": image_every,
+            "llm_latency": llm_latency,
+            "qdrant": qdrant_url,
+            "embedding_backend": os.getenv("EMBEDDING_BACKEND", "torch"),
+        },
+        **load_report(rows, wall),
+        "rss": {
+            "before_load_mb": round(before, 1),
+            "peak_during_load_mb": round(sampler.peak, 1),
+            "process_peak_mb": round(peak_rss_mb(), 1),
+        },
+        "stub_llm_requests": stub.requests_served,
+    }
+    if out:
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        with open(out, "w") as f:
+            json.dump(report, f, indent=2)
+    if json_out:
+        print(json.dumps(report, indent=2))
+        return
+    print_report(report)
+    if out:
+        print(f"\n✅ Report -> {out}")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,402 @@
+# benchmarks/retrieval.py
+"""
+Retrieval quality + latency benchmark on a golden query set built from the seed data.
+
+    python benchmarks/retrieval.py golden --out .cache/bench/golden.json    # inspect / pin the query set
+    python benchmarks/retrieval.py run --out .cache/bench/$(git rev-parse --short HEAD).json
+    python benchmarks/retrieval.py run --tool search_hybrid --k 1 --k 5 --repeat 3 --concurrency 4
+    python benchmarks/retrieval.py compare .cache/bench/base.json .cache/bench/head.json --max-recall-drop 0.02
+
+Golden queries (setup/clean_EVM.json, clean_FAQ.json, metadata.json):
+    myths    -> the myth as written, as a question, as bare keywords   (expect that myth record)
+    FAQs     -> the opening sentence, bare keywords                     (expect that FAQ record)
+    visuals  -> title and visual concepts as text, the image by URL and
+                by local copy under images/                             (expect that visual record)
+
+Each query has exactly one relevant record, so recall@k is the share of
+queries whose record shows up in the top k; MRR uses the first relevant hit.
+Runs go against QDRANT_CLUSTER_ENDPOINT (or --qdrant-url, e.g. a local
+`docker run qdrant/qdrant`) and the collection setup/ingest.py populated.
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (project root) so 'src' is importable
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import typer
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SETUP_DIR = os.path.join(parent_dir, "setup")
+IMAGES_DIR = os.path.join(parent_dir, "images")
+TEXT_TOOLS = ["search_dense", "search_sparse", "search_hybrid"]
+TOOLS = TEXT_TOOLS + ["search_image"]
+DEFAULT_K = [1, 3, 5, 10]
+
+# "A digital news channel claimed that ..." -> the claim itself
+_FRAMING = re.compile(
+    r"^.{0,80}?\b(?:claim(?:ed|ing)?|alleging|saying|mentioning|stating|circulated|reported)\s+that\s+", re.I
+)
+_STOPWORDS = set(
+    "a an the and or of to in on for with by from at as is are was were be been being that this those these "
+    "it its into about after before during over under not no can will would has have had which who what when "
+    "where how why all any some there their they them his her he she we you your our also being such than".split()
+)
+# How a myth was reported, not what it claims: left out of the keyword queries
+_REPORTING_WORDS = set(
+    "fake false misleading news video message post tweet shared sharing circulated circulating claimed claim "
+    "claiming social media channel digital article story".split()
+)
+
+app = typer.Typer(help="Retrieval recall / latency benchmark on golden queries.")
+
+
+# ------------------------------------------------------------------ golden set
+
+def _squash(text):
+    return " ".join(str(text or "").split()).lower()
+
+
+def _first_sentence(text, max_chars=200):
+    text = " ".join(text.split())
+    match = re.search(r"(?<=[.?!])\s", text)
+    return (text[:match.start()] if match else text)[:max_chars]
+
+
+def _keywords(text, n=8):
+    words = [
+        w for w in re.findall(r"\w+", text.lower())
+        if len(w) > 2 and w not in _STOPWORDS and w not in _REPORTING_WORDS and not w.isdigit()
+    ]
+    return " ".join(list(dict.fromkeys(words))[:n])
+
+
+def _as_question(claim):
+    core = _FRAMING.sub("", " ".join(claim.split()), count=1).rstrip(" .")
+    if not core: return ""
+    if not core[1:2].isupper():  # keep acronyms (VVPAT, EVM) as they are
+        core = core[0].lower() + core[1:]
+    return f"Is it true that {core}?"
+
+
+def _load(path):
+    with open(path, encoding="utf-8") as f:
+        return [r.get("payload", {}) for r in json.load(f)]
+
+
+def build_golden(setup_dir=SETUP_DIR, images_dir=IMAGES_DIR):
+    """
+    [{"id", "kind", "input": "text" | "image", "query", "expected": {"field", "value"}}, ...]
+    Deterministic: the same seed files always give the same queries.
+    """
+    queries = []
+
+    def add(source, i, kind, query, field, value, input="text"):
+        if query:
+            queries.append({
+                "id": f"{source}-{i:03d}-{kind}",
+                "kind": kind,
+                "input": input,
+                "query": query,
+                "expected": {"field": field, "value": value},
+            })
+
+    for i, p in enumerate(_load(os.path.join(setup_dir, "clean_EVM.json"))):
+        myth = (p.get("debunked_myth") or "").strip()
+        if not myth: continue
+        add("evm", i, "myth_exact", myth, "debunked_myth", myth)
+        add("evm", i, "myth_question", _as_question(myth), "debunked_myth", myth)
+        add("evm", i, "myth_keywords", _keywords(myth), "debunked_myth", myth)
+
+    for i, p in enumerate(_load(os.path.join(setup_dir, "clean_FAQ.json"))):
+        text = (p.get("text_content") or "").strip()
+        if not text: continue
+        add("faq", i, "faq_lead", _first_sentence(text), "text_content", text)
+        add("faq", i, "faq_keywords", _keywords(text[:600]), "text_content", text)
+
+    for i, p in enumerate(_load(os.path.join(setup_dir, "metadata.json"))):
+        title = (p.get("title") or "").strip()
+        if not title: continue
+        add("visual", i, "visual_title", title.capitalize() if title.isupper() else title, "title", title)
+        add("visual", i, "visual_concepts", ", ".join(p.get("visual_concepts") or []), "title", title)
+        url = p.get("image_url")
+        add("visual", i, "image_url", url, "title", title, input="image")
+        if url and os.path.exists(os.path.join(images_dir, os.path.basename(url))):
+            # Repo-relative, resolved at run time
+            add("visual", i, "image_local", f"images/{os.path.basename(url)}", "title", title, input="image")
+    return queries
+
+
+def is_relevant(payload, expected):
+    """A hit matches when it belongs to the expected record (any chunk of it for long texts)."""
+    if not payload: return False
+    field, value = expected["field"], _squash(expected["value"])
+    got = _squash(payload.get(field))
+    if not got: return False
+    if field == "text_content":
+        return got == value or got[:200] in value
+    return got == value
+
+
+def first_relevant_rank(hits, expected):
+    for rank, hit in enumerate(hits, 1):
+        if is_relevant(getattr(hit, "payload", None), expected):
+            return rank
+    return None
+
+
+# ------------------------------------------------------------------ evaluation
+
+def _percentile(ordered, q):
+    if not ordered: return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summarize(rows, ks, seconds=None):
+    """rows: [{"rank", "ms", "error"}] -> recall@k, MRR, latency percentiles, QPS."""
+    n = len(rows)
+    ranks = [r["rank"] for r in rows]
+    latencies = sorted(r["ms"] for r in rows)
+    out = {"n": n, "errors": sum(1 for r in rows if r["error"])}
+    for k in ks:
+        out[f"recall@{k}"] = round(sum(1 for rank in ranks if rank and rank <= k) / n, 4) if n else 0.0
+    out["mrr"] = round(sum(1 / rank for rank in ranks if rank) / n, 4) if n else 0.0
+    out["p50_ms"] = round(_percentile(latencies, 0.50), 2)
+    out["p95_ms"] = round(_percentile(latencies, 0.95), 2)
+    out["p99_ms"] = round(_percentile(latencies, 0.99), 2)
+    out["mean_ms"] = round(statistics.fmean(latencies), 2) if latencies else 0.0
+    if seconds:
+        out["qps"] = round(n / seconds, 2)
+    return out
+
+
+def run_queries(search, queries, limit, repeat=1, concurrency=1):
+    """
+    Times `search(query, limit)` over the queries (`repeat` passes, `concurrency` at once).
+    Returns (rows, wall seconds); ranks come from the first pass.
+    """
+    def one(q):
+        start = time.perf_counter()
+        try:
+            hits, error = search(q["query"], limit), None
+        except Exception as e:
+            hits, error = [], repr(e)
+        ms = (time.perf_counter() - start) * 1000
+        return {"id": q["id"], "kind": q["kind"], "rank": first_relevant_rank(hits, q["expected"]), "ms": ms, "error": error}
+
+    work = [q for _ in range(repeat) for q in queries]
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            rows = list(pool.map(one, work))
+    else:
+        rows = [one(q) for q in work]
+    seconds = time.perf_counter() - started
+
+    first_rank = {r["id"]: r["rank"] for r in rows[:len(queries)]}
+    for r in rows:
+        r["rank"] = first_rank[r["id"]]
+    return rows, seconds
+
+
+def evaluate(queries, searches, ks=DEFAULT_K, limit=None, repeat=1, concurrency=1, warm_up=True):
+    """
+    searches: {tool: search(query, limit) -> hits}. Text tools get the text
+    queries, search_image the image ones. Returns {tool: {"overall", "by_kind", "misses"}}.
+    """
+    limit = limit or max(ks)
+    results = {}
+    for tool, search in searches.items():
+        wanted = "image" if tool == "search_image" else "text"
+        subset = [q for q in queries if q["input"] == wanted]
+        if not subset: continue
+        if warm_up:
+            try:
+                search(subset[0]["query"], limit)  # model / connection warm-up, not timed
+            except Exception:
+                pass
+        rows, seconds = run_queries(search, subset, limit, repeat, concurrency)
+        by_kind = {}
+        for r in rows:
+            by_kind.setdefault(r["kind"], []).append(r)
+        results[tool] = {
+            "overall": summarize(rows, ks, seconds),
+            "by_kind": {kind: summarize(kind_rows, ks) for kind, kind_rows in sorted(by_kind.items())},
+            "misses": sorted({r["id"] for r in rows if not r["rank"]}),
+        }
+    return results
+
+
+def _real_searches(tools):
+    """The production search functions (imports src.config: models + Qdrant client)."""
+    from src.tools import qdrant_search
+
+    def image(query, limit):
+        if not query.startswith(("http://", "https://")) and not os.path.isabs(query):
+            query = os.path.join(parent_dir, query)
+        return qdrant_search.search_image(image_source=query, limit=limit)
+
+    def text(fn):
+        return lambda query, limit: fn(query_text=query, limit=limit)
+
+    available = {
+        "search_dense": text(qdrant_search.search_dense),
+        "search_sparse": text(qdrant_search.search_sparse),
+        "search_hybrid": text(qdrant_search.search_hybrid),
+        "search_image": image,
+    }
+    return {tool: available[tool] for tool in tools}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=parent_dir, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _print_table(results, ks):
+    columns = [f"recall@{k}" for k in ks] + ["mrr", "p50_ms", "p95_ms", "p99_ms", "qps"]
+    print(f"{'tool':<14} {'kind':<16} {'n':>4} " + " ".join(f"{c:>9}" for c in columns))
+    for tool, result in results.items():
+        for kind, s in [("ALL", result["overall"])] + list(result["by_kind"].items()):
+            cells = " ".join(f"{s.get(c, ''):>9}" for c in columns)
+            print(f"{tool:<14} {kind:<16} {s['n']:>4} {cells}")
+
+
+# ------------------------------------------------------------------ commands
+
+@app.command()
+def golden(
+    out: Optional[str] = typer.Option(None, help="Write the query set here (default: print)"),
+):
+    """Builds the golden query set from the seed data."""
+    queries = build_golden()
+    text = json.dumps(queries, indent=2, ensure_ascii=False)
+    if out is None:
+        print(text)
+        return
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        f.write(text)
+    print(f"✅ {len(queries)} golden queries -> {out}")
+
+
+@app.command()
+def run(
+    tools: List[str] = typer.Option(TOOLS, "--tool", help="Search functions to benchmark"),
+    k: List[int] = typer.Option(DEFAULT_K, "--k", help="Cut-offs for recall@k"),
+    limit: Optional[int] = typer.Option(None, help="Hits requested per query (default: largest k)"),
+    repeat: int = typer.Option(1, help="Timed passes over the query set"),
+    concurrency: int = typer.Option(1, help="Queries in flight (QPS under load)"),
+    golden_path: Optional[str] = typer.Option(None, "--golden", help="Query set JSON (default: built from setup/)"),
+    qdrant_url: Optional[str] = typer.Option(None, help="Qdrant to query (default: QDRANT_CLUSTER_ENDPOINT)"),
+    collection: Optional[str] = typer.Option(None, help="Collection or alias (default: DATA_COLLECTION_NAME)"),
+    label: Optional[str] = typer.Option(None, help="Name of this run in the output (default: git commit)"),
+    out: Optional[str] = typer.Option(None, help="Write the results JSON here"),
+    json_out: bool = typer.Option(False, "--json", help="Print the results JSON instead of a table"),
+):
+    """recall@k, MRR, p50/p95/p99 and QPS per search function."""
+    unknown = set(tools) - set(TOOLS)
+    if unknown:
+        raise typer.BadParameter(f"unknown tool(s): {', '.join(sorted(unknown))}")
+    if qdrant_url:
+        # Before src.config builds the client
+        os.environ["QDRANT_CLUSTER_ENDPOINT"] = qdrant_url
+    if golden_path:
+        with open(golden_path, encoding="utf-8") as f:
+            queries = json.load(f)
+    else:
+        queries = build_golden()
+
+    from src.tools import qdrant_search
+    if collection:
+        qdrant_search.COLLECTION_NAME = collection
+
+    ks = sorted(set(k))
+    results = evaluate(queries, _real_searches(tools), ks, limit, repeat, concurrency)
+    report = {
+        "meta": {
+            "label": label or _git_commit(),
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "collection": qdrant_search.COLLECTION_NAME,
+            "qdrant_url": os.getenv("QDRANT_CLUSTER_ENDPOINT"),
+            "embedding_backend": os.getenv("EMBEDDING_BACKEND", "torch"),
+            "queries": len(queries),
+            "k": ks,
+            "limit": limit or max(ks),
+            "repeat": repeat,
+            "concurrency": concurrency,
+        },
+        "results": results,
+    }
+    if out:
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if json_out:
+        print(json.dumps(report, indent=2))
+        return
+    _print_table(results, ks)
+    if out:
+        print(f"\n✅ Results -> {out}")
+
+
+def compare_reports(base, head, max_recall_drop=0.0, max_p95_increase=None):
+    """Per tool: (metric, base, head, delta) rows, and the regressions beyond the thresholds."""
+    rows, regressions = [], []
+    for tool, result in head["results"].items():
+        before = base["results"].get(tool)
+        if before is None: continue
+        for metric, value in result["overall"].items():
+            if metric in ("n", "errors") or metric not in before["overall"]: continue
+            old = before["overall"][metric]
+            rows.append((tool, metric, old, value, round(value - old, 4)))
+            if (metric.startswith("recall@") or metric == "mrr") and old - value > max_recall_drop:
+                regressions.append(f"{tool} {metric} {old} -> {value}")
+            if metric == "p95_ms" and max_p95_increase is not None and old and value > old * (1 + max_p95_increase):
+                regressions.append(f"{tool} p95_ms {old} -> {value}")
+    return rows, regressions
+
+
+@app.command()
+def compare(
+    base_path: str = typer.Argument(..., help="Results JSON of the baseline run"),
+    head_path: str = typer.Argument(..., help="Results JSON of the run to check"),
+    max_recall_drop: float = typer.Option(0.0, help="Allowed drop in recall@k / MRR before failing"),
+    max_p95_increase: Optional[float] = typer.Option(None, help="Allowed relative p95 increase (0.2 = +20%) before failing"),
+):
+    """Side-by-side deltas of two runs; exits 1 on a regression beyond the thresholds."""
+    with open(base_path) as f:
+        base = json.load(f)
+    with open(head_path) as f:
+        head = json.load(f)
+    rows, regressions = compare_reports(base, head, max_recall_drop, max_p95_increase)
+
+    print(f"{'tool':<14} {'metric':<10} {base['meta'].get('label') or 'base':>12} {head['meta'].get('label') or 'head':>12} {'Δ':>9}")
+    for tool, metric, old, new, delta in rows:
+        print(f"{tool:<14} {metric:<10} {old:>12} {new:>12} {delta:>+9}")
+    if regressions:
+        print("\n❌ Regressions:")
+        for line in regressions:
+            print(f"   {line}")
+        raise typer.Exit(1)
+    print("\n✅ No regression.")
+
+
+if __name__ == "__main__":
+    app()
@@ -9,6 +9,12 @@ from rich.panel import Panel
 from rich.prompt import Prompt
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from src.graph.workflow import build_graph
+from src.runtime.singleflight import singleflight_metrics
+from src.runtime.batching import batcher_metrics
+from src.runtime.logs import configure_logging, flush_logs, log_context
+from src.runtime.metrics import format_trace, metrics_json, turn_trace
+from src.runtime.profiling import KINDS as PROFILERS, maybe_profile
+from src.config import llm_cache, llm_gateway
 
 # --- SETUP ---
 app = typer.Typer()
@@ -53,7 +59,7 @@ def run_clean_mode(input_payload, config):
 def run_raw_mode(input_payload, config):
     """
     Runs the graph WITHOUT any UI wrappers. 
-    This allows the raw 'print()' statements from the nodes to appear directly.
+    The nodes' INFO logs appear directly, as they happen.
     """
     print("\n" + "="*40)
     print(f"🚀 STARTING PIPELINE for Thread: {config['configurable']['thread_id']}")
@@ -61,15 +67,17 @@ def run_raw_mode(input_payload, config):
     
     response_text = ""
     try:
-        # Just run the stream! The nodes will print their own logs.
+        # Just run the stream! The nodes log their own progress.
         for event in state["graph"].stream(input_payload, config=config):
             for k, v in event.items():
                 if k == "write_answer":
                     response_text = v['messages'][-1].content
     except Exception as e:
+        flush_logs()
         print(f"❌ CRITICAL ERROR: {e}")
         return None
         
+    flush_logs()
     print("\n" + "="*40)
     print("✅ PIPELINE FINISHED")
     print("="*40 + "\n")
@@ -80,10 +88,18 @@ def run_raw_mode(input_payload, config):
 def chat(
     user: Optional[str] = typer.Option(None, "--user", "-u", help="Initial user ID. If empty, asks interactively."),
     logs: bool = typer.Option(False, "--logs", "-l", help="Show RAW execution logs (No UI wrappers)"),
+    metrics: bool = typer.Option(False, "--metrics", "-m", help="Print a latency breakdown after every turn"),
+    log_format: str = typer.Option(os.getenv("LOG_FORMAT", "console"), "--log-format", help="console | json (one object per line, with user_id / thread_id)"),
+    profile: Optional[str] = typer.Option(None, "--profile", "-p", help="Profile every turn: sample (all threads) | cprofile"),
+    profile_memory: bool = typer.Option(False, "--profile-memory", help="tracemalloc per turn, by model / search / prompt stage"),
 ):
     """
     Starts the Election Agent CLI.
     """
+    if profile is not None and profile not in PROFILERS:
+        raise typer.BadParameter(f"--profile must be one of: {', '.join(PROFILERS)}")
+    # --logs shows the nodes' progress (INFO); otherwise only warnings and errors
+    configure_logging(level="INFO" if logs else None, fmt=log_format)
     console.print(Panel.fit("[bold blue]🗳️  MISINFORMATION DETECTION SYSTEM[/bold blue]", subtitle="v4.0 (Raw Logs)"))
 
     # 1. HANDLE LOGIN
@@ -116,6 +132,8 @@ def chat(
             /new           - Start a fresh conversation
             /login <name>  - Switch user
             /image <path>  - Attach image
+            /stats         - Show coalescing, cache & batching stats
+            /metrics       - Latency percentiles per node / call (whole session)
             quit / exit    - Close app
             """, title="Help Menu", border_style="green"))
             continue
@@ -124,6 +142,39 @@ def chat(
             console.print("[bold red]👋 Exiting...[/bold red]")
             break
             
+        elif user_input.lower() == "/stats":
+            for name, m in singleflight_metrics().items():
+                console.print(
+                    f"[dim]{name}: {m['calls']} calls, {m['executions']} executed, "
+                    f"{m['coalesced']} coalesced[/dim]"
+                )
+            c = llm_cache.stats()
+            console.print(
+                f"[dim]llm_cache: {c['hits']} hits / {c['misses']} misses "
+                f"(hit rate {c['hit_rate']:.0%}), {c['entries']} entries[/dim]"
+            )
+            g = llm_gateway.metrics()
+            console.print(
+                f"[dim]llm_gateway: breaker {g['breaker_state']}, limit {g['concurrency_limit']}, "
+                f"{g['succeeded']} ok / {g['failed']} failed / "
+                f"{g['rejected_open'] + g['rejected_rate'] + g['rejected_concurrency']} shed[/dim]"
+            )
+            for name, b in batcher_metrics().items():
+                console.print(
+                    f"[dim]embed/{name}: {b['items']} items in {b['batches']} batches "
+                    f"(mean {b['mean_batch_size']}, max {b['max_batch_size']}), "
+                    f"queue {b['queue_depth']} (peak {b['peak_queue_depth']})[/dim]"
+                )
+            continue
+
+        elif user_input.lower() == "/metrics":
+            for s in metrics_json().get("agent_span_seconds", {}).get("series", []):
+                console.print(
+                    f"[dim]{s['labels']['kind']}:{s['labels']['span']}: n={s['count']} "
+                    f"p50 {s['p50'] * 1000:.0f} ms, p95 {s['p95'] * 1000:.0f} ms, max {s['max'] * 1000:.0f} ms[/dim]"
+                )
+            continue
+
         elif user_input.lower() == "/new":
             state["thread_id"] = get_new_thread_id()
             console.print(f"[yellow]✨ New Session Started (ID: {state['thread_id']})[/yellow]")
@@ -174,17 +225,24 @@ def chat(
         }
 
         # EXECUTE BASED ON MODE
-        if logs:
-            # RAW MODE: Just run it. The nodes will print to the console.
-            response = run_raw_mode(payload, config)
-        else:
-            # CLEAN MODE: Hide logs behind spinner
-            response = run_clean_mode(payload, config)
+        turn_name = f"turn-{time.strftime('%Y%m%d-%H%M%S')}-{state['thread_id'][:8]}"
+        with maybe_profile(profile, profile_memory, name=turn_name) as session, \
+                turn_trace() as trace, log_context(user_id=state["user_id"], thread_id=state["thread_id"]):
+            if logs:
+                # RAW MODE: Just run it. The nodes will print to the console.
+                response = run_raw_mode(payload, config)
+            else:
+                # CLEAN MODE: Hide logs behind spinner
+                response = run_clean_mode(payload, config)
         
         if response:
             console.print("\n[bold purple]🤖 Agent Verdict:[/bold purple]")
             console.print(Panel(Markdown(response), border_style="purple"))
             console.print("\n")
+        if metrics:
+            console.print(Panel(format_trace(trace), title="Turn latency", border_style="cyan"))
+        if session is not None:
+            console.print(f"[dim]🔬 Profile: {', '.join(session.paths)}[/dim]")
 
 if __name__ == "__main__":
     app()
\ No newline at end of file
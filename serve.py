@@ -0,0 +1,71 @@
+"""
+HTTP serving with the models loaded once and shared by every worker.
+
+    python serve.py --workers 4                      # 4 forked workers, cores split between them
+    python serve.py --workers 1 --port 9000          # single process, no fork
+    curl -s localhost:8080/chat -d '{"message": "Can EVMs be hacked?", "user_id": "demo"}'
+    curl -N localhost:8080/chat/stream -d '{"message": "Can EVMs be hacked?"}'     # Server-Sent Events
+    curl -s localhost:8080/chat -F message="Is this seal valid?" -F image=@seal.jpg
+
+Each request carries its own thread_id, so any worker can serve any session.
+SIGTERM drains: /ready turns 503, running turns get --shutdown-timeout seconds.
+With --profile, SIGUSR1 writes a flamegraph of the next --profile-seconds to .cache/profiles/.
+"""
+import functools
+import os
+from typing import Optional
+
+import typer
+from aiohttp import web
+
+app = typer.Typer(help="Serve the agent over HTTP.")
+
+
+@app.command()
+def serve(
+    host: str = typer.Option("0.0.0.0", help="Interface to bind"),
+    port: int = typer.Option(8080, help="Port to bind"),
+    workers: int = typer.Option(os.cpu_count() or 1, help="Worker processes (forked after the models load)"),
+    threads_per_worker: Optional[int] = typer.Option(None, help="torch/onnxruntime threads per worker (default: cores / workers)"),
+    shutdown_timeout: float = typer.Option(float(os.getenv("SERVE_SHUTDOWN_TIMEOUT", 30)), help="Seconds running turns get after SIGTERM"),
+    log_level: str = typer.Option(os.getenv("LOG_LEVEL", "WARNING"), help="INFO shows every node of every turn"),
+    log_format: str = typer.Option(os.getenv("LOG_FORMAT", "json"), help="json (one object per line, with thread_id / user_id) | console"),
+    profile: bool = typer.Option(False, "--profile", help="kill -USR1 <pid> samples every thread for --profile-seconds"),
+    profile_memory: bool = typer.Option(False, "--profile-memory", help="Add tracemalloc (by model / search / prompt stage) to the window"),
+    profile_seconds: float = typer.Option(30.0, help="Length of a profile window"),
+):
+    from src.runtime.logs import configure_logging
+    from src.runtime.profiling import install_profile_signal
+
+    configure_logging(level=log_level, fmt=log_format)
+
+    def arm_profiler():
+        # Per process: a pre-forked parent forwards the signal to its workers
+        if profile or profile_memory:
+            install_profile_signal("sample" if profile else None, profile_memory, profile_seconds, prefix="serve")
+
+    from src.graph.workflow import build_graph
+    from src.serving.api import create_app
+    from src.serving.prefork import PreforkServer, configure_worker, threads_per_worker as split_cores, warm_up
+
+    # Imports src.config: every model is loaded here, in the parent
+    graph = build_graph()
+    threads = threads_per_worker or split_cores(workers)
+
+    if workers <= 1:
+        # Nothing to fork: start listening at once, /ready reports the warm-up
+        configure_worker(threads)
+        arm_profiler()
+        web_app = create_app(graph, warm_up=functools.partial(warm_up, threads))
+        web.run_app(web_app, host=host, port=port, shutdown_timeout=shutdown_timeout)
+        return
+
+    def run_worker(sock, worker_id):
+        arm_profiler()
+        web.run_app(create_app(graph, worker_id), sock=sock, print=None, shutdown_timeout=shutdown_timeout)
+
+    PreforkServer(run_worker, host=host, port=port, workers=workers, threads=threads).run()
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,219 @@
+# setup/ingest.py
+"""
+Streaming ingestion entry point.
+
+    python setup/ingest.py run setup/clean_EVM.json setup/clean_FAQ.json setup/metadata.json
+    python setup/ingest.py run big_dump.jsonl --batch-size 128 --workers 4
+    python setup/ingest.py run eci_myths.jsonl          # nightly refresh: only the diff is embedded
+    python setup/ingest.py run *.json --collection new_cluster --full   # re-point: vectors come from .cache/artifacts
+    python setup/ingest.py reindex setup/*.json        # blue/green rebuild, alias swapped when verified
+    python setup/ingest.py diff-spec [--apply]         # live collection vs DATA_COLLECTION_SPEC
+    python setup/ingest.py compaction-report           # what float16 / int8 / BM25 pruning would cost in recall
+"""
+import os
+import sys
+from typing import List, Optional
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (project root) so 'src' is importable
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import typer
+
+app = typer.Typer(help="Ingestion tools for the Hybrid collection.")
+
+
+@app.callback()
+def main():
+    """Streams JSON/JSONL corpora into Qdrant."""
+
+
+@app.command()
+def run(
+    files: List[str] = typer.Argument(..., help="JSON array or JSONL files to ingest"),
+    collection: Optional[str] = typer.Option(None, help="Target collection (default: DATA_COLLECTION_NAME)"),
+    batch_size: int = typer.Option(64, help="Records embedded per micro-batch"),
+    upload_batch_size: int = typer.Option(256, help="Points per upload request"),
+    workers: int = typer.Option(2, help="Parallel upload workers"),
+    retries: int = typer.Option(3, help="Retries per failed upload batch"),
+    manifest: Optional[str] = typer.Option(None, help="Manifest path (default: .cache/manifests/<collection>.sqlite)"),
+    full: bool = typer.Option(False, "--full", help="Re-upload every record, ignoring the manifest"),
+    no_artifacts: bool = typer.Option(False, "--no-artifacts", help="Always run the models (skip the embedding artifact store)"),
+    image_workers: int = typer.Option(8, help="Concurrent image downloads"),
+    decode_workers: Optional[int] = typer.Option(None, help="Image decode processes (default: half the CPUs)"),
+    image_batch_size: int = typer.Option(32, help="Images per CLIP encode call"),
+):
+    """Stream, embed and upload one or more files (only new/changed records are re-embedded)."""
+    from src.config import DATA_COLLECTION_NAME
+    from src.ingestion.pipeline import ingest
+
+    missing = [f for f in files if not os.path.exists(f)]
+    if missing:
+        raise typer.BadParameter(f"File(s) not found: {', '.join(missing)}")
+
+    ingest(
+        files,
+        collection_name=collection or DATA_COLLECTION_NAME,
+        batch_size=batch_size,
+        upload_batch_size=upload_batch_size,
+        parallel=workers,
+        max_retries=retries,
+        manifest_path=manifest,
+        full=full,
+        use_artifacts=not no_artifacts,
+        image_workers=image_workers,
+        decode_workers=decode_workers,
+        image_batch_size=image_batch_size,
+    )
+
+
+@app.command()
+def reindex(
+    files: List[str] = typer.Argument(..., help="JSON array or JSONL files making up the FULL corpus"),
+    alias: Optional[str] = typer.Option(None, help="Alias search reads (default: DATA_COLLECTION_NAME)"),
+    batch_size: int = typer.Option(64, help="Records embedded per micro-batch"),
+    workers: int = typer.Option(2, help="Parallel upload workers"),
+    keep: int = typer.Option(2, help="Versions kept after the swap (live one included)"),
+    min_recall: float = typer.Option(0.9, help="Smoke self-retrieval recall required before the swap"),
+    replace_legacy: bool = typer.Option(False, "--replace-legacy", help="Drop a plain collection squatting on the alias name"),
+):
+    """Blue/green rebuild into a new versioned collection, verified, then an atomic alias swap."""
+    from src.config import DATA_COLLECTION_NAME
+    from src.ingestion.aliases import ReindexVerificationError
+    from src.ingestion.pipeline import reindex as run_reindex
+
+    missing = [f for f in files if not os.path.exists(f)]
+    if missing:
+        raise typer.BadParameter(f"File(s) not found: {', '.join(missing)}")
+
+    try:
+        run_reindex(
+            files,
+            alias=alias or DATA_COLLECTION_NAME,
+            keep=keep,
+            min_recall=min_recall,
+            replace_legacy=replace_legacy,
+            batch_size=batch_size,
+            parallel=workers,
+        )
+    except ReindexVerificationError as e:
+        print(f"❌ Reindex aborted, alias unchanged: {e}")
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def versions(alias: Optional[str] = typer.Option(None, help="Alias (default: DATA_COLLECTION_NAME)")):
+    """List the versioned collections of an alias and which one is live."""
+    from src.config import DATA_COLLECTION_NAME, client
+    from src.ingestion.aliases import list_versions, resolve_alias
+
+    alias = alias or DATA_COLLECTION_NAME
+    live = resolve_alias(client, alias)
+    for name in list_versions(client, alias):
+        print(f"{'🟢' if name == live else '  '} {name}")
+    if live is None:
+        print(f"'{alias}' is not an alias yet (run `reindex` once to migrate).")
+
+
+@app.command("diff-spec")
+def diff_spec(
+    collection: Optional[str] = typer.Option(None, help="Collection or alias (default: DATA_COLLECTION_NAME)"),
+    apply: bool = typer.Option(False, "--apply", help="Converge the collection to the spec after printing the diff"),
+):
+    """Compare the live collection with DATA_COLLECTION_SPEC (indexes, HNSW, storage, optimizer)."""
+    from src.config import DATA_COLLECTION_NAME, client
+    from src.ingestion.aliases import resolve_alias
+    from src.ingestion.collection_spec import diff_spec as compute_diff
+    from src.ingestion.pipeline import data_collection_spec, ensure_collection
+
+    name = collection or DATA_COLLECTION_NAME
+    name = resolve_alias(client, name) or name
+    changes = compute_diff(client, name, data_collection_spec())
+    if not changes:
+        print(f"✅ '{name}' matches the spec.")
+        return
+    for key, live, wanted, mutable in changes:
+        print(f"{'~' if mutable else '!'} {key:<40} live={live!r:<12} spec={wanted!r}")
+    print("(~ applied in place, ! needs a reindex)")
+    if apply:
+        ensure_collection(name)
+
+
+@app.command("compaction-report")
+def compaction_report(
+    collection: Optional[str] = typer.Option(None, help="Collection or alias (default: DATA_COLLECTION_NAME)"),
+    sample: int = typer.Option(2000, help="Points sampled (with vectors) from the collection"),
+    queries: int = typer.Option(50, help="Held-out sample points used as queries"),
+    k: int = typer.Option(10, help="Recall cut-off"),
+    sparse_top_k: List[int] = typer.Option([64, 32, 16], help="BM25 top-k options to evaluate"),
+    min_weight: float = typer.Option(0.0, help="BM25 weight floor evaluated with each top-k"),
+    json_out: bool = typer.Option(False, "--json", help="Print the rows as JSON"),
+):
+    """Size / RAM / recall deltas of float16, int8 and pruned BM25 vs the current float32 vectors."""
+    import json
+
+    import numpy as np
+
+    from src.config import DATA_COLLECTION_NAME, client
+    from src.ingestion.compaction import compaction_report as build_report, print_report
+
+    name = collection or DATA_COLLECTION_NAME
+    dense, sparse, offset = {"dense_text": [], "dense_image": []}, [], None
+    while len(sparse) < sample:
+        points, offset = client.scroll(
+            collection_name=name, limit=min(256, sample - len(sparse)), offset=offset,
+            with_vectors=True, with_payload=False,
+        )
+        for point in points:
+            for vector_name in dense:
+                if point.vector.get(vector_name) is not None:
+                    dense[vector_name].append(point.vector[vector_name])
+            s = point.vector.get("sparse_text")
+            sparse.append((np.asarray(s.indices), np.asarray(s.values)) if s is not None else (np.array([], int), np.array([])))
+        if offset is None: break
+
+    rows = build_report(
+        {n: np.asarray(v, dtype=np.float32) for n, v in dense.items() if v},
+        [s for s in sparse if len(s[0])],
+        n_points=client.count(collection_name=name, exact=True).count,
+        n_queries=queries,
+        k=k,
+        sparse_options=[(top_k, min_weight) for top_k in sparse_top_k],
+    )
+    if json_out:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_report(rows)
+
+
+@app.command("check-tokens")
+def check_tokens(
+    files: List[str] = typer.Argument(..., help="JSON array or JSONL files to analyse"),
+    batch_size: int = typer.Option(1024, help="Texts tokenized per batch call"),
+):
+    """Token-length histogram of a corpus (no embedding, no upload)."""
+    from src.ingestion.readers import iter_batches, iter_records
+    from src.ingestion.records import (
+        TokenHistogram,
+        construct_text_from_visual_payload,
+        get_token_counts,
+        record_text,
+    )
+
+    histogram = TokenHistogram()
+    for path in files:
+        for batch in iter_batches(iter_records(path), batch_size):
+            texts = []
+            for record in batch:
+                payload = record.get("payload", {})
+                if payload.get("record_type") == "official_visual_truth":
+                    texts.append(construct_text_from_visual_payload(payload))
+                else:
+                    texts.append(record_text(payload))
+            histogram.add(get_token_counts([t for t in texts if t]))
+    histogram.report()
+
+
+if __name__ == "__main__":
+    app()
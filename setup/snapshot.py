@@ -0,0 +1,89 @@
+# setup/snapshot.py
+"""
+Bootstrap a Qdrant environment in seconds from an export, without loading any model.
+
+    python setup/snapshot.py export dist/seed                        # portable bundle of both collections
+    python setup/snapshot.py export dist/seed --format snapshot      # native .snapshot files (remote only)
+    python setup/snapshot.py restore dist/seed                       # into QDRANT_CLUSTER_ENDPOINT
+    python setup/snapshot.py restore dist/seed --target ./qdrant_local
+    python setup/snapshot.py restore dist/seed --target :memory:     # smoke-test a bundle
+"""
+import os
+import sys
+from typing import List, Optional
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (project root) so 'src' is importable
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+
+import typer
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Same names as src/config.py (not imported here: that would load every model)
+COLLECTIONS = ["Hybrid_Collection_CONVOLVE", "user_profiles"]
+
+app = typer.Typer(help="Export / restore collections as snapshots or portable bundles.")
+
+
+def _source(target):
+    from src.ingestion.snapshots import open_client
+    url = target or os.getenv("QDRANT_CLUSTER_ENDPOINT")
+    if not url:
+        raise typer.BadParameter("No Qdrant target: pass --target or set QDRANT_CLUSTER_ENDPOINT.")
+    return url, open_client(url, api_key=os.getenv("QDRANT_API_KEY"))
+
+
+@app.command()
+def export(
+    out_dir: str = typer.Argument(..., help="Directory to write the export into"),
+    collections: List[str] = typer.Option(COLLECTIONS, "--collection", help="Collections (or aliases) to export"),
+    format: str = typer.Option("bundle", help="bundle | snapshot"),
+    source: Optional[str] = typer.Option(None, help="Qdrant URL or local path (default: QDRANT_CLUSTER_ENDPOINT)"),
+):
+    """Export collections from a running Qdrant."""
+    from src.ingestion.snapshots import export_bundle, export_snapshot
+
+    url, client = _source(source)
+    for name in collections:
+        if format == "snapshot":
+            if not url.startswith(("http://", "https://")):
+                raise typer.BadParameter("Native snapshots need a Qdrant server; use --format bundle.")
+            path = export_snapshot(client, url, name, out_dir, api_key=os.getenv("QDRANT_API_KEY"))
+            print(f"📦 {name} -> {path}")
+        else:
+            manifest = export_bundle(client, name, out_dir)
+            print(f"📦 {name}: {manifest['points']} points in {manifest['parts']} parts -> {out_dir}/{name}")
+
+
+@app.command()
+def restore(
+    in_dir: str = typer.Argument(..., help="Directory written by `export`"),
+    target: Optional[str] = typer.Option(None, help="Qdrant URL, local path or :memory: (default: QDRANT_CLUSTER_ENDPOINT)"),
+):
+    """Restore every bundle / snapshot found in a directory."""
+    from src.ingestion.snapshots import restore_bundle, restore_snapshot
+
+    url, client = _source(target)
+    restored = 0
+    for entry in sorted(os.listdir(in_dir)):
+        path = os.path.join(in_dir, entry)
+        if os.path.isdir(path) and os.path.exists(os.path.join(path, "manifest.json")):
+            result = restore_bundle(client, path)
+        elif entry.endswith(".snapshot"):
+            if not url.startswith(("http://", "https://")):
+                print(f"⚠️ Skipping {entry}: native snapshots can only be restored into a Qdrant server.")
+                continue
+            result = restore_snapshot(client, url, path, api_key=os.getenv("QDRANT_API_KEY"))
+        else:
+            continue
+        restored += 1
+        print(f"✅ {entry} -> '{result['collection']}' ({result['points']} points)")
+    if not restored:
+        print(f"Nothing to restore in {in_dir}.")
+
+
+if __name__ == "__main__":
+    app()
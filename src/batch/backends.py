@@ -0,0 +1,118 @@
+# src/batch/backends.py
+"""
+The Qdrant + Gemini side of bulk verification (see src/batch/claims.py).
+
+Claims arrive in chunks, so the encoders are called directly with whole
+batches (the MicroBatcher only helps single concurrent requests) and every
+claim's dense, sparse and image searches go to Qdrant in a few
+query_batch_points round trips instead of one query_points call each.
+"""
+import numpy as np
+from qdrant_client import models
+
+from src.config import (
+    client,
+    dense_text_model,
+    sparse_text_model,
+    DATA_COLLECTION_NAME,
+    SPARSE_MIN_WEIGHT,
+    SPARSE_TOP_K,
+)
+from src.ingestion.records import get_image_embeddings
+from src.nodes.researcher import degraded_answer, evidence_block, responder_chain
+from src.runtime.logs import get_logger
+from src.tools.qdrant_search import rrf_fuse
+from src.tools.vector_codec import prune_sparse
+
+log = get_logger(__name__)
+
+# No user profile in a bulk run: the responder should show every source
+BATCH_USER_CONTEXT = (
+    "Bulk verification run (no individual user). "
+    'content_preference: {"show_twitter": true, "show_urls": true, "show_actions": true}'
+)
+
+
+class QdrantLLMBackend:
+    def __init__(self, collection_name=DATA_COLLECTION_NAME, limit=5, embed_batch_size=64, requests_per_call=64):
+        self.collection_name = collection_name
+        self.limit = limit
+        self.embed_batch_size = embed_batch_size
+        self.requests_per_call = requests_per_call
+        self.dim = dense_text_model.get_sentence_embedding_dimension()
+
+    def embed(self, texts):
+        return dense_text_model.encode(
+            [f"query: {t}" for t in texts],
+            batch_size=self.embed_batch_size,
+            normalize_embeddings=True,
+        )
+
+    def _sparse(self, texts):
+        vectors = []
+        for vector in sparse_text_model.embed(texts, batch_size=self.embed_batch_size):
+            indices, values = prune_sparse(vector.indices, vector.values, SPARSE_TOP_K, SPARSE_MIN_WEIGHT)
+            if len(indices) == 0:
+                indices, values = vector.indices, vector.values
+            vectors.append(models.SparseVector(indices=indices.tolist(), values=values.tolist()))
+        return vectors
+
+    def _query_batch(self, requests):
+        responses = []
+        for start in range(0, len(requests), self.requests_per_call):
+            responses += client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=requests[start:start + self.requests_per_call],
+            )
+        return [r.points for r in responses]
+
+    def retrieve(self, claims, vectors):
+        texts = [c["claim"] for c in claims]
+        sparse = self._sparse(texts)
+        image_vectors = get_image_embeddings([c["image_path"] for c in claims if c["image_path"]])
+
+        requests, slots = [], []  # slots[i] = (dense, sparse, image) positions in `requests`
+        for claim, dense_vector, sparse_vector in zip(claims, vectors, sparse):
+            slot = [len(requests), len(requests) + 1, None]
+            requests.append(models.QueryRequest(
+                query=np.asarray(dense_vector).tolist(), using="dense_text", limit=self.limit * 2, with_payload=True,
+            ))
+            requests.append(models.QueryRequest(
+                query=sparse_vector, using="sparse_text", limit=self.limit * 2, with_payload=True,
+            ))
+            image_vector = image_vectors.get(claim["image_path"]) if claim["image_path"] else None
+            if image_vector is not None:
+                slot[2] = len(requests)
+                requests.append(models.QueryRequest(
+                    query=image_vector, using="dense_image", limit=self.limit, with_payload=True,
+                ))
+            slots.append(slot)
+
+        results = self._query_batch(requests)
+        found = []
+        for claim, (dense_at, sparse_at, image_at) in zip(claims, slots):
+            hybrid = rrf_fuse([results[dense_at], results[sparse_at]], self.limit)
+            blocks = [evidence_block(1, "search_hybrid", "Claim text", hybrid)]
+            hits = list(hybrid)
+            if image_at is not None:
+                blocks.append(evidence_block(2, "search_image", "Visual match", results[image_at]))
+                hits += results[image_at]
+            elif claim["image_path"]:
+                blocks.append(evidence_block(2, "search_image", "Visual match", "Image could not be loaded."))
+            sources = [h.payload.get("source_url") for h in hits if h.payload and h.payload.get("source_url")]
+            found.append({"evidence": "\n".join(blocks), "sources": list(dict.fromkeys(sources))})
+        return found
+
+    def verdict(self, claim, evidence):
+        inputs = {
+            "user_query": claim,
+            "retrieved_docs": evidence,
+            "user_context": BATCH_USER_CONTEXT,
+            "dropped_evidence": "None",
+        }
+        try:
+            return responder_chain.invoke(inputs).content, False
+        except Exception as e:
+            # Same fallback as the responder node: the evidence alone, no verdict
+            log.warning("   ⚠️ Verdict degraded: %s", e)
+            return degraded_answer(evidence, []).content, True
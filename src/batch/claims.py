@@ -0,0 +1,395 @@
+# src/batch/claims.py
+"""
+Bulk claim verification: claims JSONL in -> verdicts JSONL out, resumable.
+
+Input lines look like {"id"?, "claim" | "text" | "message", "image_path" | "image"?}.
+Per chunk of input lines:
+
+    normalize + exact dedupe -> embed the new claims (one batch) -> near-duplicate
+    merge (cosine) -> batched retrieval -> LLM verdicts (bounded concurrency)
+    -> append results in input order -> checkpoint
+
+While chunk N waits for its LLM verdicts, chunk N+1 is already being embedded
+and retrieved. The per-user parts of the graph (memory loader / writer,
+planner) are skipped: a bulk run has no user and no conversation.
+
+Kept free of model imports; the Qdrant/LLM side lives in src/batch/backends.py.
+"""
+import hashlib
+import itertools
+import json
+import os
+import re
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from src.ingestion.visual import StageStats
+from src.runtime.logs import get_logger, log_context
+
+RESULT_FIELDS = ("id", "verdict", "answer", "sources", "degraded")
+VERDICT_PATTERN = re.compile(r"\b(VERIFIED|MISINFORMATION|MISLEADING|UNVERIFIED)\b")
+_FORWARD_PREFIX = re.compile(r"^((fwd|fw|forwarded( as received| many times)?)\s*:?\s*)+")
+
+log = get_logger(__name__)
+
+
+def normalize_claim(text):
+    """Case, accents, punctuation, emoji and "Forwarded:" prefixes do not make a new claim."""
+    text = unicodedata.normalize("NFKC", text or "").lower().strip()
+    text = _FORWARD_PREFIX.sub("", text)
+    text = re.sub(r"[^\w\s]", " ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def claim_key(text, image=None):
+    return hashlib.sha1(f"{normalize_claim(text)}\x00{image or ''}".encode("utf-8")).hexdigest()
+
+
+def parse_verdict(answer):
+    """First verdict label in the answer (the responder is asked to lead with it)."""
+    match = VERDICT_PATTERN.search(answer or "")
+    return match.group(1) if match else "UNVERIFIED"
+
+
+def read_claims(path, skip=0):
+    """Yields (line_number, claim dict) from line `skip` on. Blank lines count, so resuming stays aligned."""
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f):
+            if number < skip: continue
+            line = line.strip()
+            if not line:
+                yield number, None
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = {"claim": line}  # plain-text dumps work too
+            if isinstance(record, str):
+                record = {"claim": record}
+            yield number, {
+                "id": str(record.get("id", number)),
+                "claim": (record.get("claim") or record.get("text") or record.get("message") or "").strip(),
+                "image_path": record.get("image_path") or record.get("image"),
+            }
+
+
+class ClaimIndex:
+    """
+    Canonical (first seen) claims: exact match on the normalized key, then
+    cosine >= threshold on the claim embedding among claims with the same image.
+    Vectors live in one preallocated float32 matrix, grown by doubling.
+    """
+
+    def __init__(self, dim, threshold=0.97):
+        self.threshold = threshold
+        self.by_key = {}
+        self.ids = []
+        self.images = []
+        self._vectors = np.zeros((1024, dim), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def vectors(self):
+        return self._vectors[:len(self.ids)]
+
+    def add(self, key, claim_id, vector, image=None):
+        n = len(self.ids)
+        if n == len(self._vectors):
+            grown = np.zeros((2 * n, self._vectors.shape[1]), dtype=np.float32)
+            grown[:n] = self._vectors
+            self._vectors = grown
+        self._vectors[n] = vector
+        self.by_key[key] = claim_id
+        self.ids.append(claim_id)
+        self.images.append(image)
+
+    def near_duplicates(self, vectors, images, ids):
+        """
+        For each row of a batch (in order): the id of the closest canonical claim
+        with the same image above the threshold, or None if the row is new. Rows
+        may match earlier *new* rows of the same batch; nothing is added here.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        against_index = self.vectors @ vectors.T  # (canonicals, batch)
+        within = vectors @ vectors.T
+        matches, new_rows = [], set()
+        for i, image in enumerate(images):
+            best, best_score = None, self.threshold
+            for j in np.flatnonzero(against_index[:, i] >= self.threshold):  # usually empty or tiny
+                if self.images[j] == image and against_index[j, i] >= best_score:
+                    best, best_score = self.ids[j], against_index[j, i]
+            for j in np.flatnonzero(within[:i, i] >= self.threshold):
+                if j in new_rows and images[j] == image and within[j, i] >= best_score:
+                    best, best_score = ids[j], within[j, i]
+            matches.append(best)
+            if best is None:
+                new_rows.add(i)
+        return matches
+
+
+class Checkpoint:
+    """
+    <output>.ckpt.json    lines of input consumed, bytes of output written, canonical count, stats
+    <output>.vectors      canonical claim vectors (float32 rows, same order as in the output)
+    Both only ever describe whole chunks; a crash mid-chunk is cut back on resume.
+    """
+
+    def __init__(self, output_path):
+        self.path = f"{output_path}.ckpt.json"
+        self.vectors_path = f"{output_path}.vectors"
+
+    def load(self):
+        if not os.path.exists(self.path): return None
+        with open(self.path) as f:
+            return json.load(f)
+
+    def save(self, state):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def append_vectors(self, vectors):
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read_vectors(self, count, dim):
+        if not count: return np.zeros((0, dim), dtype=np.float32)
+        with open(self.vectors_path, "rb") as f:
+            data = f.read(count * dim * 4)
+        return np.frombuffer(data, dtype=np.float32).reshape(count, dim)
+
+    def truncate_vectors(self, count, dim):
+        if os.path.exists(self.vectors_path):
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(count * dim * 4)
+
+    def clear(self):
+        for path in (self.path, self.vectors_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+class BatchVerifier:
+    """
+    Drives a backend through a claims file. The backend provides:
+        dim                                  embedding size
+        embed(texts) -> (n, dim) array       normalized claim vectors
+        retrieve(claims, vectors) -> [{"evidence": str, "sources": [...]}, ...]
+        verdict(claim, evidence) -> (answer, degraded)
+    """
+
+    def __init__(self, backend, chunk_size=256, llm_concurrency=8, near_threshold=0.97):
+        self.backend = backend
+        self.chunk_size = chunk_size
+        self.llm_concurrency = llm_concurrency
+        self.near_threshold = near_threshold
+        self.stats = StageStats("embed", "retrieve", "llm", "write")
+        self.counts = {"claims": 0, "unique": 0, "exact_duplicates": 0, "near_duplicates": 0, "invalid": 0, "degraded": 0}
+
+    # ---------------------------------------------------------------- resume
+
+    def _restore(self, output_path, checkpoint, resume):
+        dim = self.backend.dim
+        self.index = ClaimIndex(dim, self.near_threshold)
+        self.results = {}  # canonical line -> verdict fields, reused by its duplicates
+        state = checkpoint.load() if resume else None
+        if state is None:
+            checkpoint.clear()
+            open(output_path, "w").close()
+            return {"input_lines": 0, "output_bytes": 0, "canonicals": 0, "seconds": 0.0}
+
+        with open(output_path, "r+b") as f:
+            f.truncate(state["output_bytes"])
+        checkpoint.truncate_vectors(state["canonicals"], dim)
+        vectors = checkpoint.read_vectors(state["canonicals"], dim)
+        row = 0
+        with open(output_path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if record.get("verdict") is None: continue
+                key = claim_key(record["claim"], record.get("image_path"))
+                if record["canonical_line"] != record["line"]:
+                    self.index.by_key.setdefault(key, record["canonical_line"])
+                    continue
+                self.index.add(key, record["line"], vectors[row], record.get("image_path"))
+                self.results[record["line"]] = {k: record[k] for k in RESULT_FIELDS}
+                row += 1
+        self.counts.update(state.get("counts", {}))
+        for name, values in state.get("stages", {}).items():
+            self.stats.add(name, items=values["items"], failed=values["failed"], seconds=values["seconds"])
+        log.info("↩️ Resuming after %d lines (%d verified claims restored).", state["input_lines"], row)
+        return state
+
+    # ---------------------------------------------------------------- stages
+
+    def _prepare(self, lines):
+        """Dedupe, embed and retrieve one chunk. Returns the chunk ready for the LLM."""
+        # Counts and timings join the totals when the chunk is written (and checkpointed)
+        counts = dict.fromkeys(self.counts, 0)
+        timings = {}
+        rows, fresh, seen_in_chunk = [], [], {}
+        for number, claim in lines:
+            counts["claims"] += 1
+            if claim is None or not claim["claim"]:
+                counts["invalid"] += 1
+                rows.append({"line": number, "claim": claim, "error": "empty claim"})
+                continue
+            key = claim_key(claim["claim"], claim["image_path"])
+            canonical = self.index.by_key.get(key, seen_in_chunk.get(key))
+            if canonical is not None:
+                counts["exact_duplicates"] += 1
+                rows.append({"line": number, "claim": claim, "canonical": canonical, "match": "exact"})
+                continue
+            seen_in_chunk[key] = number
+            row = {"line": number, "claim": claim, "key": key, "canonical": number}
+            rows.append(row)
+            fresh.append(row)
+
+        canonicals, vectors, redirect = [], [], {}
+        if fresh:
+            start = time.perf_counter()
+            embedded = np.asarray(self.backend.embed([r["claim"]["claim"] for r in fresh]), dtype=np.float32)
+            timings["embed"] = (len(fresh), time.perf_counter() - start)
+
+            matches = self.index.near_duplicates(
+                embedded, [r["claim"]["image_path"] for r in fresh], [r["line"] for r in fresh]
+            )
+            for row, vector, match in zip(fresh, embedded, matches):
+                if match is None:
+                    self.index.add(row["key"], row["line"], vector, row["claim"]["image_path"])
+                    canonicals.append(row)
+                    vectors.append(vector)
+                else:
+                    counts["near_duplicates"] += 1
+                    self.index.by_key[row["key"]] = match  # later exact repeats skip the embedding
+                    redirect[row["line"]] = match
+                    row.update(canonical=match, match="near")
+            for row in rows:  # exact repeats of a near-duplicate point at its canonical claim
+                if row.get("match") == "exact" and row["canonical"] in redirect:
+                    row["canonical"] = redirect[row["canonical"]]
+
+        if canonicals:
+            start = time.perf_counter()
+            retrieved = self.backend.retrieve([r["claim"] for r in canonicals], np.asarray(vectors))
+            for row, found in zip(canonicals, retrieved):
+                row.update(found)
+            timings["retrieve"] = (len(canonicals), time.perf_counter() - start)
+        counts["unique"] = len(canonicals)
+        return {
+            "rows": rows,
+            "canonicals": canonicals,
+            "vectors": vectors,
+            "end": lines[-1][0] + 1,
+            "counts": counts,
+            "timings": timings,
+        }
+
+    def _verdict(self, row):
+        start = time.perf_counter()
+        with log_context(claim_id=row["claim"]["id"], line=row["line"]):
+            answer, degraded = self.backend.verdict(row["claim"]["claim"], row["evidence"])
+        self.stats.add("llm", items=1, failed=int(degraded), seconds=time.perf_counter() - start)
+        return answer, degraded
+
+    def _finish(self, chunk, futures):
+        """Waits for the chunk's verdicts, writes it in input order and checkpoints."""
+        for name, value in chunk["counts"].items():
+            self.counts[name] += value
+        for stage, (items, seconds) in chunk["timings"].items():
+            self.stats.add(stage, items=items, seconds=seconds)
+        for row, future in zip(chunk["canonicals"], futures):
+            answer, degraded = future.result()
+            self.counts["degraded"] += int(degraded)
+            self.results[row["line"]] = {
+                "id": row["claim"]["id"],
+                "verdict": parse_verdict(answer),
+                "answer": answer,
+                "sources": row.get("sources", []),
+                "degraded": degraded,
+            }
+
+        start = time.perf_counter()
+        for row in chunk["rows"]:
+            claim = row["claim"] or {"id": str(row["line"]), "claim": "", "image_path": None}
+            record = {"id": claim["id"], "line": row["line"], "claim": claim["claim"], "image_path": claim["image_path"]}
+            if "error" in row:
+                record.update(verdict=None, duplicate_of=None, canonical_line=None, error=row["error"])
+            else:
+                result = self.results[row["canonical"]]
+                record.update({k: result[k] for k in RESULT_FIELDS if k != "id"})
+                record.update(
+                    duplicate_of=result["id"] if row["canonical"] != row["line"] else None,
+                    canonical_line=row["canonical"],
+                    match=row.get("match"),
+                )
+            self._out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._out.flush()
+        os.fsync(self._out.fileno())
+        if chunk["vectors"]:
+            self._checkpoint.append_vectors(np.asarray(chunk["vectors"]))
+        self.stats.add("write", items=len(chunk["rows"]), seconds=time.perf_counter() - start)
+
+        self._state.update(
+            input_lines=chunk["end"],
+            output_bytes=self._out.tell(),
+            canonicals=self._state["canonicals"] + len(chunk["vectors"]),
+            seconds=self._elapsed(),
+            counts=self.counts,
+            stages={name: {k: s[k] for k in ("items", "failed", "seconds")} for name, s in self.stats.summary().items()},
+        )
+        self._checkpoint.save(self._state)
+
+    # ---------------------------------------------------------------- run
+
+    def _elapsed(self):
+        return self._previous_seconds + time.perf_counter() - self._started
+
+    def run(self, input_path, output_path, resume=True, limit=None, on_chunk=None):
+        """
+        Verifies the claims in `input_path` (at most `limit` more lines) and
+        returns the summary. `on_chunk(summary)` is called after every checkpoint.
+        """
+        self._checkpoint = Checkpoint(output_path)
+        self._state = self._restore(output_path, self._checkpoint, resume)
+        self._previous_seconds = self._state.get("seconds", 0.0)
+        self._started = time.perf_counter()
+
+        claims = read_claims(input_path, skip=self._state["input_lines"])
+        if limit is not None:
+            claims = itertools.islice(claims, limit)
+
+        pending = None
+        with ThreadPoolExecutor(max_workers=self.llm_concurrency, thread_name_prefix="verdict") as pool, \
+                open(output_path, "a", encoding="utf-8") as self._out:
+            while True:
+                lines = list(itertools.islice(claims, self.chunk_size))
+                if not lines: break
+                chunk = self._prepare(lines)  # overlaps with the previous chunk's LLM calls
+                futures = [pool.submit(self._verdict, row) for row in chunk["canonicals"]]
+                if pending is not None:
+                    self._finish(*pending)
+                    if on_chunk: on_chunk(self.summary(self._elapsed()))
+                pending = chunk, futures
+            if pending is not None:
+                self._finish(*pending)
+                if on_chunk: on_chunk(self.summary(self._elapsed()))
+        return self.summary(self._elapsed())
+
+    def summary(self, seconds):
+        return {
+            **self.counts,
+            "seconds": round(seconds, 2),
+            "claims_per_sec": round(self.counts["claims"] / seconds, 2) if seconds else 0.0,
+            "llm_calls_saved": self.counts["exact_duplicates"] + self.counts["near_duplicates"],
+            "stages": self.stats.summary(),
+        }
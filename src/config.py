@@ -3,6 +3,10 @@ from dotenv import load_dotenv
 from qdrant_client import QdrantClient
 from sentence_transformers import SentenceTransformer
 from fastembed import SparseTextEmbedding
+from src.runtime.llm_cache import SQLiteLLMCache
+from src.runtime.llm_gateway import LLMGateway
+from src.runtime.batching import MicroBatcher
+from src.runtime.metrics import register_collector
 
 load_dotenv()
 
@@ -12,19 +16,163 @@ print("⏳ [SYSTEM] Initializing AI Models & Database Connection...")
 QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")
 QDRANT_URL = os.getenv("QDRANT_CLUSTER_ENDPOINT")
 
-client = QdrantClient(
-    url=QDRANT_URL,
-    api_key=QDRANT_API_KEY,
-)
+if QDRANT_URL == ":memory:":
+    # Embedded, in-process Qdrant (load tests, offline runs): empty unless bootstrapped below
+    client = QdrantClient(location=":memory:")
+else:
+    client = QdrantClient(
+        url=QDRANT_URL,
+        api_key=QDRANT_API_KEY,
+    )
+
+# Optional: load a `setup/snapshot.py export` directory (or a single bundle) into this
+# client before anything uses it. The only way to seed ':memory:' without the models.
+QDRANT_BOOTSTRAP_BUNDLE = os.getenv("QDRANT_BOOTSTRAP_BUNDLE")
+if QDRANT_BOOTSTRAP_BUNDLE:
+    from src.ingestion.snapshots import restore_bundles
+    for restored in restore_bundles(client, QDRANT_BOOTSTRAP_BUNDLE):
+        print(f"📦 [SYSTEM] Bootstrapped '{restored['collection']}' ({restored['points']} points)")
 
 # 2. AI Models (Slow - Loads only once on import)
 # We use a global variable pattern to ensure they persist
-dense_text_model = SentenceTransformer("intfloat/multilingual-e5-base")
-dense_image_model = SentenceTransformer("clip-ViT-B-32")
-sparse_text_model = SparseTextEmbedding(model_name="Qdrant/bm25")
+DENSE_TEXT_MODEL_NAME = "intfloat/multilingual-e5-base"
+DENSE_IMAGE_MODEL_NAME = "clip-ViT-B-32"
+SPARSE_TEXT_MODEL_NAME = "Qdrant/bm25"
+
+# Dense encoder inference: "torch" | "onnx" | "onnx-int8" (dynamic int8 quantization).
+# ONNX graphs are exported once per model into ONNX_CACHE_DIR.
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+ONNX_CACHE_DIR = os.getenv("ONNX_CACHE_DIR", ".cache/onnx")
+ONNX_THREADS = int(os.getenv("ONNX_THREADS", 0))  # 0 = onnxruntime default
+
+
+def build_encoder(model_name, backend=None):
+    """SentenceTransformer on the selected backend (ONNX wrappers keep the same .encode API)."""
+    backend = backend or EMBEDDING_BACKEND
+    model = SentenceTransformer(model_name)
+    if backend == "torch":
+        return model
+    if backend not in ("onnx", "onnx-int8"):
+        raise ValueError(f"Unknown EMBEDDING_BACKEND '{backend}' (torch | onnx | onnx-int8)")
+    from src.runtime.onnx_encoders import onnx_encoder
+    return onnx_encoder(model, model_name, ONNX_CACHE_DIR, quantize=backend == "onnx-int8", threads=ONNX_THREADS)
+
+
+def model_version(model_name, backend=None):
+    """Identifies the vectors a model produces (artifact stores key on it)."""
+    backend = backend or EMBEDDING_BACKEND
+    return model_name if backend == "torch" else f"{model_name}@{backend}"
+
+
+dense_text_model = build_encoder(DENSE_TEXT_MODEL_NAME)
+dense_image_model = build_encoder(DENSE_IMAGE_MODEL_NAME)
+sparse_text_model = SparseTextEmbedding(model_name=SPARSE_TEXT_MODEL_NAME)
+
+# Embedding service: single encodes from every session (search tools, memory writer)
+# are queued and run as one batch per model call. Results are normalized vectors.
+EMBED_MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", 32))
+EMBED_MAX_WAIT_MS = float(os.getenv("EMBED_MAX_WAIT_MS", 5))
+EMBED_MAX_QUEUE = int(os.getenv("EMBED_MAX_QUEUE", 1024))
+EMBED_TIMEOUT = float(os.getenv("EMBED_TIMEOUT", 10))  # callers without a Deadline (memory writer)
+
+text_embedder = MicroBatcher(
+    "dense_text",
+    lambda texts: dense_text_model.encode(texts, normalize_embeddings=True, batch_size=len(texts)),
+    max_batch_size=EMBED_MAX_BATCH,
+    max_wait_ms=EMBED_MAX_WAIT_MS,
+    max_queue=EMBED_MAX_QUEUE,
+)
+image_embedder = MicroBatcher(
+    "dense_image",
+    lambda images: dense_image_model.encode(images, normalize_embeddings=True, batch_size=len(images)),
+    max_batch_size=EMBED_MAX_BATCH,
+    max_wait_ms=EMBED_MAX_WAIT_MS,
+    max_queue=EMBED_MAX_QUEUE,
+)
+
+# Ingestion keeps computed vectors here (keyed by content hash + model version)
+EMBEDDING_ARTIFACT_DIR = os.getenv("EMBEDDING_ARTIFACT_DIR", ".cache/artifacts")
 
+# Vector footprint: dense storage ("float32" | "float16" | "uint8") and BM25 term
+# pruning (keep the top-k weights / drop weights below a floor; 0 = off).
+# Pruning is applied identically at ingestion and in search_sparse.
+DENSE_VECTOR_STORAGE = os.getenv("DENSE_VECTOR_STORAGE", "float32")
+SPARSE_TOP_K = int(os.getenv("SPARSE_TOP_K", 0))
+SPARSE_MIN_WEIGHT = float(os.getenv("SPARSE_MIN_WEIGHT", 0))
+
+# An alias: `setup/ingest.py reindex` builds versioned collections and swaps it
 DATA_COLLECTION_NAME = "Hybrid_Collection_CONVOLVE"
 MEMORY_COLLECTION_NAME = "user_profiles"
 
+# Payload fields that have a Qdrant index (field -> index type).
+# The planner may only filter on these.
+INDEXED_PAYLOAD_FIELDS = {
+    "category": "keyword",
+    "topic_tags": "keyword",
+    "trust_score": "float",
+}
+MAX_SEARCH_PLANS = int(os.getenv("MAX_SEARCH_PLANS", 4))
+
+# Latency budget for the retrieval stage of one turn, and per-tool slices of it (seconds)
+SEARCH_BUDGET_SECONDS = float(os.getenv("SEARCH_BUDGET_SECONDS", 6))
+TOOL_DEADLINES = {
+    "search_hybrid": 4.0,
+    "search_dense": 4.0,
+    "search_sparse": 3.0,
+    "search_image": 5.0,
+}
+
+# 3. LLM Response Cache (Planner + Memory chains run at temperature=0)
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite")
+llm_cache = SQLiteLLMCache(
+    LLM_CACHE_PATH,
+    ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600)),
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", 10000)),
+    bypass=os.getenv("LLM_CACHE_BYPASS", "0") == "1",
+)
+
+# 4. LLM Backend + Shared Gateway (every LLM call in the process goes through it)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")  # "gemini" | "stub"
+STUB_LLM_URL = os.getenv("STUB_LLM_URL", "http://127.0.0.1:8089/v1/chat")
+
+llm_gateway = LLMGateway(
+    rate=float(os.getenv("LLM_RATE_PER_SECOND", 5)),
+    burst=int(os.getenv("LLM_BURST", 10)),
+    initial_concurrency=int(os.getenv("LLM_INITIAL_CONCURRENCY", 4)),
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", 16)),
+    failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", 5)),
+    reset_timeout=float(os.getenv("LLM_BREAKER_RESET_SECONDS", 30)),
+)
+
+register_collector("agent_llm_cache", llm_cache.stats)
+register_collector("agent_llm_gateway", llm_gateway.metrics)
+
+# Safety settings to prevent blocking legitimate election queries
+SAFETY_SETTINGS = {
+    "HARM_CATEGORY_HARASSMENT": "BLOCK_NONE",
+    "HARM_CATEGORY_HATE_SPEECH": "BLOCK_NONE",
+    "HARM_CATEGORY_SEXUALLY_EXPLICIT": "BLOCK_NONE",
+    "HARM_CATEGORY_DANGEROUS_CONTENT": "BLOCK_NONE",
+}
+
+
+def build_chat_model(api_key):
+    """
+    Creates the chat model for a node. Retries are kept low on purpose:
+    backoff and shedding are the gateway's job, not each client's.
+    """
+    if LLM_BACKEND == "stub":
+        from src.runtime.stub_llm import StubChatModel
+        return StubChatModel(url=STUB_LLM_URL)
+
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        model="gemini-2.5-flash",
+        google_api_key=api_key,
+        temperature=0,
+        max_retries=int(os.getenv("LLM_MAX_RETRIES", 1)),
+        safety_settings=SAFETY_SETTINGS,
+    )
+
 
 print("✅ [SYSTEM] Models Loaded Successfully.")
\ No newline at end of file
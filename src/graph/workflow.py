@@ -10,17 +10,19 @@ from src.nodes.researcher import (              # (The Researcher Parts)
     responder_node
 )
 from src.nodes.memory import memory_update_node
+from src.runtime.metrics import traced_node
 
 def build_graph():
     # 1. Initialize Graph
     workflow = StateGraph(AgentState)
 
     # 2. Add Nodes
-    workflow.add_node("load_memory", load_memory_node)
-    workflow.add_node("generate_query", query_gen_node)
-    workflow.add_node("execute_search", search_execution_node)
-    workflow.add_node("write_answer", responder_node)
-    workflow.add_node("memory_writer", memory_update_node)
+    # Every node is timed (agent_span_seconds{kind="node"}, and the per-turn trace)
+    workflow.add_node("load_memory", traced_node("load_memory", load_memory_node))
+    workflow.add_node("generate_query", traced_node("generate_query", query_gen_node))
+    workflow.add_node("execute_search", traced_node("execute_search", search_execution_node))
+    workflow.add_node("write_answer", traced_node("write_answer", responder_node))
+    workflow.add_node("memory_writer", traced_node("memory_writer", memory_update_node))
 
     # 3. Define Edges (The Flow)
     # Start -> Load Memory -> Gen Query -> Search -> Write Answer -> End
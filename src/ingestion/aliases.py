@@ -0,0 +1,105 @@
+# src/ingestion/aliases.py
+"""
+Blue/green collections: every rebuild goes into "<alias>__v<timestamp>" and
+the alias (the name search reads) is swapped atomically once it is verified.
+"""
+import random
+import time
+
+from qdrant_client import models
+
+VERSION_SEPARATOR = "__v"
+
+
+class ReindexVerificationError(RuntimeError):
+    """The freshly built collection is not fit to go live."""
+
+
+def versioned_name(alias, version=None):
+    return f"{alias}{VERSION_SEPARATOR}{version or time.strftime('%Y%m%d%H%M%S')}"
+
+
+def resolve_alias(client, alias):
+    """Collection the alias points at, or None."""
+    for description in client.get_aliases().aliases:
+        if description.alias_name == alias:
+            return description.collection_name
+    return None
+
+
+def is_legacy_collection(client, alias):
+    """A real collection (not an alias) still occupies the alias name."""
+    return any(c.name == alias for c in client.get_collections().collections)
+
+
+def list_versions(client, alias):
+    """Versioned collections of `alias`, oldest first."""
+    prefix = f"{alias}{VERSION_SEPARATOR}"
+    return sorted(c.name for c in client.get_collections().collections if c.name.startswith(prefix))
+
+
+def swap_alias(client, alias, collection_name):
+    """Points `alias` at `collection_name` in ONE request (delete + create are applied atomically)."""
+    operations = []
+    if resolve_alias(client, alias) is not None:
+        operations.append(models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=alias)))
+    operations.append(
+        models.CreateAliasOperation(
+            create_alias=models.CreateAlias(collection_name=collection_name, alias_name=alias)
+        )
+    )
+    client.update_collection_aliases(change_aliases_operations=operations)
+
+
+def smoke_recall(client, collection_name, vector_name="dense_text", samples=20, k=5, seed=0):
+    """
+    Self-retrieval check: sampled points queried by their own vector
+    must come back in the top-k. Catches empty/misconfigured vectors and
+    a broken index without needing golden queries.
+    """
+    points, _ = client.scroll(
+        collection_name=collection_name,
+        limit=max(samples * 5, samples),
+        with_vectors=[vector_name],
+        with_payload=False,
+    )
+    points = [p for p in points if p.vector and vector_name in p.vector]
+    if not points: return 0.0
+    sample = random.Random(seed).sample(points, min(samples, len(points)))
+
+    hits = 0
+    for point in sample:
+        result = client.query_points(
+            collection_name=collection_name,
+            query=point.vector[vector_name],
+            using=vector_name,
+            limit=k,
+            with_payload=False,
+        ).points
+        hits += any(r.id == point.id for r in result)
+    return hits / len(sample)
+
+
+def verify_collection(client, collection_name, expected_points, min_recall=0.9, **smoke_kwargs):
+    """Exact point count + smoke recall. Raises ReindexVerificationError, returns the report."""
+    count = client.count(collection_name=collection_name, exact=True).count
+    if count != expected_points:
+        raise ReindexVerificationError(
+            f"'{collection_name}' holds {count} points, ingestion uploaded {expected_points}."
+        )
+    recall = smoke_recall(client, collection_name, **smoke_kwargs)
+    if count and recall < min_recall:
+        raise ReindexVerificationError(
+            f"'{collection_name}' smoke recall {recall:.2f} is below {min_recall:.2f}."
+        )
+    return {"collection": collection_name, "points": count, "smoke_recall": round(recall, 3)}
+
+
+def gc_versions(client, alias, keep=2):
+    """Drops all but the newest `keep` versions. The live one is never dropped."""
+    live = resolve_alias(client, alias)
+    versions = list_versions(client, alias)
+    doomed = [name for name in versions[:max(len(versions) - keep, 0)] if name != live]
+    for name in doomed:
+        client.delete_collection(collection_name=name)
+    return doomed
@@ -0,0 +1,158 @@
+# src/ingestion/artifacts.py
+"""
+On-disk store of computed embeddings, so re-indexing never re-runs the models.
+
+<root>/<model version>/seg-00000/keys.npy     (S64 hex sha256 of the model input; of the image bytes for CLIP)
+                                 vectors.npy  (dense: float16 [n, dim])
+                                 indptr.npy / indices.npy / values.npy  (sparse: CSR)
+
+Segments are immutable and loaded with mmap, so opening a store costs only
+the key index; vectors are paged in on demand.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+
+import numpy as np
+
+
+def artifact_key(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _safe_name(name):
+    return re.sub(r"[^A-Za-z0-9_.@+-]+", "__", name)
+
+
+class VectorArtifactStore:
+    """Append-only, segment-based vector store keyed by content hash."""
+
+    def __init__(self, root, model_version, sparse=False, segment_rows=16384):
+        self.dir = os.path.join(root, _safe_name(model_version))
+        self.sparse = sparse
+        self.segment_rows = segment_rows
+        self._segments = []
+        self._index = {}
+        self._pending_keys = []
+        self._pending = []
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.dir, exist_ok=True)
+        for name in sorted(os.listdir(self.dir)):
+            if name.startswith("seg-"):
+                self._load_segment(os.path.join(self.dir, name))
+
+    def _load_segment(self, path):
+        seg = {name[:-4]: np.load(os.path.join(path, name), mmap_mode="r")
+               for name in os.listdir(path) if name.endswith(".npy")}
+        seg_no = len(self._segments)
+        self._segments.append(seg)
+        for row, key in enumerate(seg["keys"]):
+            self._index[key.decode("ascii")] = (seg_no, row)
+
+    def __len__(self):
+        # Pending keys are indexed as soon as they are put: the index is the union
+        return len(self._index)
+
+    def get(self, key):
+        """Dense: float32 vector. Sparse: (indices, values). None when missing."""
+        location = self._index.get(key)
+        if location is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        seg_no, row = location
+        if seg_no == "pending":
+            vector = self._pending[row]
+            return vector if self.sparse else np.asarray(vector, dtype=np.float32)
+        seg = self._segments[seg_no]
+        if self.sparse:
+            start, end = seg["indptr"][row], seg["indptr"][row + 1]
+            return np.asarray(seg["indices"][start:end]), np.asarray(seg["values"][start:end])
+        return np.asarray(seg["vectors"][row], dtype=np.float32)
+
+    def put(self, key, vector):
+        if key in self._index: return
+        self._pending_keys.append(key)
+        self._pending.append(vector)
+        # Make it visible to get() right away (kept in memory until flushed)
+        self._index[key] = ("pending", len(self._pending) - 1)
+        if len(self._pending) >= self.segment_rows:
+            self.flush()
+
+    def flush(self):
+        """Writes pending vectors as a new immutable segment (atomic rename)."""
+        if not self._pending: return
+        seg_name = f"seg-{len(self._segments):05d}"
+        tmp = os.path.join(self.dir, f".tmp-{seg_name}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+
+        np.save(os.path.join(tmp, "keys.npy"), np.array(self._pending_keys, dtype="S64"))
+        if self.sparse:
+            lengths = [len(indices) for indices, _ in self._pending]
+            np.save(os.path.join(tmp, "indptr.npy"), np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64))
+            np.save(os.path.join(tmp, "indices.npy"), np.concatenate([np.asarray(i, dtype=np.int32) for i, _ in self._pending]))
+            np.save(os.path.join(tmp, "values.npy"), np.concatenate([np.asarray(v, dtype=np.float32) for _, v in self._pending]))
+        else:
+            np.save(os.path.join(tmp, "vectors.npy"), np.asarray(self._pending, dtype=np.float16))
+
+        final = os.path.join(self.dir, seg_name)
+        os.rename(tmp, final)
+        for key in self._pending_keys:
+            del self._index[key]
+        self._pending_keys, self._pending = [], []
+        self._load_segment(final)
+
+    def get_many(self, keys):
+        """List aligned with keys: vector/tuple or None."""
+        return [self.get(key) for key in keys]
+
+
+class ChunkCache:
+    """Chunk boundaries per source text, so semantic splitting is not redone either."""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS chunks (key TEXT PRIMARY KEY, chunks TEXT NOT NULL)")
+        self._conn.commit()
+
+    def get(self, key):
+        row = self._conn.execute("SELECT chunks FROM chunks WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, chunks):
+        self._conn.execute("INSERT OR REPLACE INTO chunks VALUES (?, ?)", (key, json.dumps(chunks, ensure_ascii=False)))
+
+    def flush(self):
+        self._conn.commit()
+
+
+class EmbeddingArtifacts:
+    """The three vector stores + chunk cache used by one ingestion run."""
+
+    def __init__(self, root, dense_text_version, sparse_text_version, dense_image_version, chunker_version):
+        os.makedirs(root, exist_ok=True)
+        self.dense_text = VectorArtifactStore(root, dense_text_version)
+        self.sparse_text = VectorArtifactStore(root, sparse_text_version, sparse=True)
+        self.dense_image = VectorArtifactStore(root, dense_image_version)
+        self.chunks = ChunkCache(os.path.join(root, f"chunks-{_safe_name(chunker_version)}.sqlite"))
+
+    def flush(self):
+        self.dense_text.flush()
+        self.sparse_text.flush()
+        self.dense_image.flush()
+        self.chunks.flush()
+
+    def stats(self):
+        return {
+            name: {"stored": len(store), "hits": store.hits, "misses": store.misses}
+            for name, store in (
+                ("dense_text", self.dense_text),
+                ("sparse_text", self.sparse_text),
+                ("dense_image", self.dense_image),
+            )
+        }
@@ -0,0 +1,79 @@
+# src/ingestion/chunking.py
+import re
+
+import numpy as np
+
+# Sentence ends: Latin punctuation and the Devanagari danda
+_SENTENCE_END = re.compile(r"(?<=[.!?।])\s+")
+
+
+def split_sentences(text):
+    return [s.strip() for s in _SENTENCE_END.split(text) if s.strip()]
+
+
+def combine_with_buffer(sentences, buffer_size):
+    """Each sentence plus `buffer_size` neighbours on both sides (smooths the embeddings)."""
+    combined = []
+    for i in range(len(sentences)):
+        start = max(0, i - buffer_size)
+        combined.append(" ".join(sentences[start:i + buffer_size + 1]))
+    return combined
+
+
+class SemanticSplitter:
+    """
+    Semantic chunking (same algorithm as LlamaIndex's SemanticSplitterNodeParser)
+    on top of an ALREADY LOADED SentenceTransformer:
+    1. Split into sentences, add a buffer of neighbours.
+    2. Embed every sentence group of every document in ONE encode call.
+    3. Cosine distance between consecutive groups (NumPy).
+    4. Break where the distance is above the document's Nth percentile.
+    """
+
+    def __init__(self, model, buffer_size=1, breakpoint_percentile_threshold=90, prefix="passage: ", batch_size=64):
+        self.model = model
+        self.buffer_size = buffer_size
+        self.breakpoint_percentile_threshold = breakpoint_percentile_threshold
+        self.prefix = prefix
+        self.batch_size = batch_size
+
+    def split(self, text):
+        return self.split_many([text])[0]
+
+    def split_many(self, texts):
+        """Returns one list of chunks per input text."""
+        sentence_lists = [split_sentences(t) for t in texts]
+        groups, spans = [], []
+        for sentences in sentence_lists:
+            start = len(groups)
+            groups.extend(combine_with_buffer(sentences, self.buffer_size))
+            spans.append((start, len(groups)))
+
+        if not groups:
+            return [[t] if t.strip() else [] for t in texts]
+
+        embeddings = self.model.encode(
+            [f"{self.prefix}{g}" for g in groups],
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        )
+
+        results = []
+        for text, sentences, (start, end) in zip(texts, sentence_lists, spans):
+            if len(sentences) < 2:
+                results.append([text.strip()] if text.strip() else [])
+                continue
+            doc = embeddings[start:end]
+            # Embeddings are normalized, so the dot product is the cosine similarity
+            distances = 1.0 - np.einsum("ij,ij->i", doc[:-1], doc[1:])
+            threshold = np.percentile(distances, self.breakpoint_percentile_threshold)
+            breakpoints = np.flatnonzero(distances > threshold)
+
+            chunks, begin = [], 0
+            for b in breakpoints:
+                chunks.append(" ".join(sentences[begin:b + 1]))
+                begin = b + 1
+            chunks.append(" ".join(sentences[begin:]))
+            results.append(chunks)
+        return results
@@ -0,0 +1,261 @@
+# src/ingestion/collection_spec.py
+"""
+Declarative layout of the data collection: named vectors, HNSW, storage,
+optimizer and payload indexes. `apply_spec` creates or converges a live
+collection to it (safe to run on every ingestion); `diff_spec` shows drift.
+"""
+import copy
+
+from qdrant_client import models
+
+DATA_COLLECTION_SPEC = {
+    "vectors": {
+        # Originals on disk (memmap), HNSW graph in RAM: search stays fast past RAM size
+        "dense_text": {"size": 768, "distance": "Cosine", "datatype": "float32", "on_disk": True, "hnsw": {"m": 16, "ef_construct": 128}},
+        # size is taken from the loaded CLIP model at creation time
+        "dense_image": {"size": None, "distance": "Cosine", "datatype": "float32", "on_disk": True, "hnsw": {"m": 16, "ef_construct": 128}},
+    },
+    "sparse_vectors": {
+        "sparse_text": {"modifier": "idf", "on_disk": True},
+    },
+    "hnsw": {"m": 16, "ef_construct": 128, "payload_m": 16, "on_disk": False},
+    "optimizers": {"memmap_threshold": 20000, "indexing_threshold": 20000, "default_segment_number": 2},
+    "on_disk_payload": True,
+    # Every field a filter may touch. The planner's INDEXED_PAYLOAD_FIELDS must be a subset.
+    "payload_indexes": {
+        "category": "keyword",
+        "topic_tags": "keyword",
+        "trust_score": "float",
+        "record_type": "keyword",
+        "source_name": "keyword",
+        "actionable_intent": "keyword",
+    },
+}
+
+# Changing these means rebuilding the collection (see `setup/ingest.py reindex`)
+IMMUTABLE_KEYS = ("size", "distance", "datatype", "modifier")
+
+# int8 copy of every dense vector kept in RAM, float originals on disk for rescoring
+INT8_QUANTIZATION = {"type": "int8", "quantile": 0.99, "always_ram": True}
+DENSE_STORAGE_OPTIONS = ("float32", "float16", "uint8")
+
+
+def with_vector_sizes(spec, **sizes):
+    """Copy of `spec` with missing vector sizes filled in (e.g. dense_image=512)."""
+    spec = copy.deepcopy(spec)
+    for name, size in sizes.items():
+        if spec["vectors"].get(name, {}).get("size") is None:
+            spec["vectors"][name]["size"] = size
+    return spec
+
+
+def with_dense_storage(spec, storage):
+    """
+    Copy of `spec` storing dense vectors as float32, float16 or 8 bits.
+    "uint8" is done with int8 scalar quantization rather than the raw uint8
+    datatype: E5/CLIP emit signed, normalized floats that do not survive a
+    cast to 0..255, while quantization keeps cosine ranking (with rescoring).
+    """
+    if storage not in DENSE_STORAGE_OPTIONS:
+        raise ValueError(f"Unknown dense storage '{storage}', expected one of {DENSE_STORAGE_OPTIONS}")
+    spec = copy.deepcopy(spec)
+    # Explicitly none otherwise, so switching back from uint8 removes the quantization
+    spec["quantization"] = dict(INT8_QUANTIZATION) if storage == "uint8" else {}
+    if storage == "float16":
+        for vector in spec["vectors"].values():
+            vector["datatype"] = "float16"
+    return spec
+
+
+def _quantization_config(spec):
+    quantization = spec.get("quantization")
+    if not quantization: return None
+    return models.ScalarQuantization(
+        scalar=models.ScalarQuantizationConfig(
+            type=models.ScalarType(quantization["type"]),
+            quantile=quantization.get("quantile"),
+            always_ram=quantization.get("always_ram"),
+        )
+    )
+
+
+def _fields(model, keys):
+    return {k: getattr(model, k, None) for k in keys} if model is not None else dict.fromkeys(keys)
+
+
+def describe_collection(info, spec):
+    """Live collection info in the shape of `spec` (only the keys the spec sets)."""
+    config = info.config
+    params = config.params
+    hnsw = _fields(config.hnsw_config, spec.get("hnsw", {}))
+
+    vectors = {}
+    for name, vector in (params.vectors if isinstance(params.vectors, dict) else {}).items():
+        wanted_hnsw = spec.get("vectors", {}).get(name, {}).get("hnsw", {})
+        own = _fields(vector.hnsw_config, wanted_hnsw)
+        vectors[name] = {
+            "size": vector.size,
+            "distance": getattr(vector.distance, "value", vector.distance),
+            "datatype": getattr(vector.datatype, "value", vector.datatype) or "float32",
+            "on_disk": bool(vector.on_disk),
+            # A vector without its own HNSW value inherits the collection's
+            "hnsw": {k: v if v is not None else getattr(config.hnsw_config, k, None) for k, v in own.items()},
+        }
+
+    sparse = {}
+    for name, vector in (params.sparse_vectors or {}).items():
+        sparse[name] = {
+            "modifier": getattr(vector.modifier, "value", vector.modifier),
+            "on_disk": bool(vector.index and vector.index.on_disk),
+        }
+
+    scalar = getattr(config.quantization_config, "scalar", None)
+    quantization = {}
+    if scalar is not None:
+        quantization = {
+            "type": getattr(scalar.type, "value", scalar.type),
+            "quantile": scalar.quantile,
+            "always_ram": scalar.always_ram,
+        }
+
+    return {
+        "vectors": vectors,
+        "quantization": quantization,
+        "sparse_vectors": sparse,
+        "hnsw": hnsw,
+        "optimizers": _fields(config.optimizer_config, spec.get("optimizers", {})),
+        "on_disk_payload": bool(params.on_disk_payload),
+        "payload_indexes": {
+            field: getattr(schema.data_type, "value", schema.data_type)
+            for field, schema in (info.payload_schema or {}).items()
+        },
+    }
+
+
+def _flatten(tree, prefix=""):
+    flat = {}
+    for key, value in tree.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            flat.update(_flatten(value, f"{path}."))
+        else:
+            flat[path] = value
+    return flat
+
+
+def diff_spec(client, collection_name, spec):
+    """
+    [(key, live, wanted, mutable)] for every spec value the live collection
+    does not have. An empty list means the collection matches the spec.
+    """
+    described = describe_collection(client.get_collection(collection_name), spec)
+    live = _flatten(described)
+    changes = []
+    for key, wanted in _flatten(spec).items():
+        current = bool(live.get(key)) if isinstance(wanted, bool) else live.get(key)
+        if wanted == {}:
+            # An empty section means "none": e.g. no quantization while the live collection has one
+            current = described
+            for part in key.split("."):
+                current = current.get(part) if isinstance(current, dict) else None
+            current = current or {}
+        if wanted is None or current == wanted:
+            continue
+        parts = key.split(".")
+        # A named vector that does not exist yet cannot be added in place
+        missing_vector = parts[0] in ("vectors", "sparse_vectors") and parts[1] not in described[parts[0]]
+        mutable = parts[-1] not in IMMUTABLE_KEYS and not missing_vector
+        changes.append((key, current if wanted == {} else live.get(key), wanted, mutable))
+    return changes
+
+
+def create_from_spec(client, collection_name, spec):
+    client.create_collection(
+        collection_name=collection_name,
+        vectors_config={
+            name: models.VectorParams(
+                size=v["size"],
+                distance=models.Distance(v["distance"]),
+                datatype=models.Datatype(v.get("datatype", "float32")),
+                on_disk=v.get("on_disk"),
+                hnsw_config=models.HnswConfigDiff(**v.get("hnsw", {})),
+            )
+            for name, v in spec["vectors"].items()
+        },
+        sparse_vectors_config={
+            name: models.SparseVectorParams(
+                modifier=models.Modifier(v["modifier"]) if v.get("modifier") else None,
+                index=models.SparseIndexParams(on_disk=v.get("on_disk")),
+            )
+            for name, v in spec.get("sparse_vectors", {}).items()
+        },
+        hnsw_config=models.HnswConfigDiff(**spec.get("hnsw", {})),
+        optimizers_config=models.OptimizersConfigDiff(**spec.get("optimizers", {})),
+        on_disk_payload=spec.get("on_disk_payload"),
+        quantization_config=_quantization_config(spec),
+    )
+
+
+def apply_spec(client, collection_name, spec):
+    """
+    Idempotent: creates the collection if needed, otherwise updates only the
+    settings that drifted and creates missing payload indexes.
+    Returns the changes that still need a rebuild (immutable settings).
+    """
+    if not client.collection_exists(collection_name):
+        create_from_spec(client, collection_name, spec)
+        print(f"Collection '{collection_name}' created.")
+        changes = [
+            (f"payload_indexes.{field}", None, kind, True)
+            for field, kind in spec.get("payload_indexes", {}).items()
+        ]
+    else:
+        changes = diff_spec(client, collection_name, spec)
+
+    mutable = [key for key, _, _, is_mutable in changes if is_mutable]
+    sections = {key.split(".")[0] for key in mutable}
+    touched_vectors = {key.split(".")[1] for key in mutable if key.startswith("vectors.")}
+    touched_sparse = {key.split(".")[1] for key in mutable if key.startswith("sparse_vectors.")}
+
+    update = {}
+    if touched_vectors:
+        update["vectors_config"] = {
+            name: models.VectorParamsDiff(
+                on_disk=spec["vectors"][name].get("on_disk"),
+                hnsw_config=models.HnswConfigDiff(**spec["vectors"][name].get("hnsw", {})),
+            )
+            for name in touched_vectors
+        }
+    if touched_sparse:
+        update["sparse_vectors_config"] = {
+            name: models.SparseVectorParams(
+                index=models.SparseIndexParams(on_disk=spec["sparse_vectors"][name].get("on_disk")),
+            )
+            for name in touched_sparse
+        }
+    if "hnsw" in sections:
+        update["hnsw_config"] = models.HnswConfigDiff(**spec["hnsw"])
+    if "optimizers" in sections:
+        update["optimizers_config"] = models.OptimizersConfigDiff(**spec["optimizers"])
+    if "quantization" in sections:
+        # None would mean "leave as is" to update_collection
+        update["quantization_config"] = _quantization_config(spec) or models.Disabled.DISABLED
+    if "on_disk_payload" in sections:
+        update["collection_params"] = models.CollectionParamsDiff(on_disk_payload=spec["on_disk_payload"])
+    if update:
+        client.update_collection(collection_name=collection_name, **update)
+
+    for key, live, kind, _ in changes:
+        if not key.startswith("payload_indexes."):
+            continue
+        field = key.split(".", 1)[1]
+        if live is not None:
+            # Index type changed: drop the old one first
+            client.delete_payload_index(collection_name=collection_name, field_name=field)
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field,
+            field_schema=models.PayloadSchemaType(kind),
+        )
+
+    return [change for change in changes if not change[3]]
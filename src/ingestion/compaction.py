@@ -0,0 +1,156 @@
+# src/ingestion/compaction.py
+"""
+What-if report for compact vector storage: size, RAM and recall of
+float16 / int8 dense vectors and pruned BM25 vectors, measured on a sample
+of real points with exact (brute force) search against the float32 baseline.
+"""
+import math
+from collections import Counter
+
+import numpy as np
+
+from src.tools.vector_codec import prune_sparse
+
+MB = 1024 * 1024
+
+
+def float16_roundtrip(matrix):
+    return matrix.astype(np.float16).astype(np.float32)
+
+
+def int8_roundtrip(matrix, quantile=0.99):
+    """Qdrant-style scalar quantization: clip to the central `quantile` of values, 256 levels."""
+    tail = (1 - quantile) / 2
+    low, high = np.quantile(matrix, [tail, 1 - tail])
+    scale = max(float(high - low), 1e-12) / 255
+    codes = np.round((np.clip(matrix, low, high) - low) / scale)
+    return (codes * scale + low).astype(np.float32)
+
+
+DENSE_VARIANTS = {
+    "float32": lambda m: m,
+    "float16": float16_roundtrip,
+    "uint8": int8_roundtrip,
+}
+
+
+def _top_k(queries, corpus, k):
+    scores = queries @ corpus.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def dense_recall(matrix, variant, n_queries, k):
+    """recall@k of `variant` vs float32: held-out rows as (uncompressed) queries."""
+    queries, corpus = matrix[:n_queries], matrix[n_queries:]
+    truth = _top_k(queries, corpus, k)
+    found = _top_k(queries, DENSE_VARIANTS[variant](corpus), k)
+    return float(np.mean([len(set(t) & set(f)) / k for t, f in zip(truth, found)]))
+
+
+def dense_footprint(n_points, dim, variant, m=16):
+    """
+    (disk MB, RAM MB) for n_points. RAM is the working set for fast search:
+    HNSW links (~2m per point on level 0) + the vectors the graph walk reads
+    (the memmapped originals, or only the int8 copy for "uint8").
+    """
+    graph = n_points * 2 * m * 4
+    if variant == "uint8":
+        return n_points * dim * 5 / MB, (graph + n_points * dim) / MB
+    width = 2 if variant == "float16" else 4
+    return n_points * dim * width / MB, (graph + n_points * dim * width) / MB
+
+
+def _idf(docs):
+    df = Counter(int(i) for indices, _ in docs for i in indices)
+    n = len(docs)
+    return {term: math.log((n - d + 0.5) / (d + 0.5) + 1) for term, d in df.items()}
+
+
+def _sparse_top_k(queries, docs, idf, k):
+    results = []
+    for q_indices in queries:
+        wanted = set(int(i) for i in q_indices)
+        scores = []
+        for d, (indices, values) in enumerate(docs):
+            score = sum(idf.get(int(i), 0.0) * float(v) for i, v in zip(indices, values) if int(i) in wanted)
+            if score:
+                scores.append((score, d))
+        results.append([d for _, d in sorted(scores, reverse=True)[:k]])
+    return results
+
+
+def sparse_recall(docs, n_queries, k, top_k=0, min_weight=0.0, query_terms=8):
+    """
+    recall@k of pruned BM25 vs full BM25 (IDF from the sample, like the
+    collection's IDF modifier). Queries are the heaviest terms of held-out docs.
+    """
+    queries = [
+        indices[np.argsort(-values)[:query_terms]] for indices, values in docs[:n_queries]
+    ]
+    corpus = docs[n_queries:]
+    idf = _idf(corpus)
+    truth = _sparse_top_k(queries, corpus, idf, k)
+    pruned = [prune_sparse(indices, values, top_k, min_weight) for indices, values in corpus]
+    found = _sparse_top_k(queries, pruned, idf, k)
+    scored = [(t, f) for t, f in zip(truth, found) if t]
+    if not scored: return 1.0
+    return float(np.mean([len(set(t) & set(f)) / len(t) for t, f in scored]))
+
+
+def sparse_footprint(docs, n_points, top_k=0, min_weight=0.0):
+    """MB for n_points, extrapolated from the sample's mean non-zeros (u32 index + f32 weight)."""
+    nnz = [len(prune_sparse(i, v, top_k, min_weight)[0]) for i, v in docs]
+    return n_points * float(np.mean(nnz)) * 8 / MB, float(np.mean(nnz))
+
+
+def compaction_report(dense, sparse, n_points, n_queries=50, k=10, sparse_options=((0, 0.0),)):
+    """
+    dense: {vector name: (sample, dim) float32 matrix}, sparse: [(indices, values)].
+    Sizes are projected to `n_points`. Returns a list of report rows.
+    """
+    rows = []
+    for name, matrix in dense.items():
+        if len(matrix) <= n_queries: continue
+        baseline_disk, baseline_ram = dense_footprint(n_points, matrix.shape[1], "float32")
+        for variant in DENSE_VARIANTS:
+            disk, ram = dense_footprint(n_points, matrix.shape[1], variant)
+            rows.append({
+                "vector": name,
+                "variant": variant,
+                "disk_mb": round(disk, 1),
+                "ram_mb": round(ram, 1),
+                "disk_delta": round(disk / baseline_disk - 1, 3),
+                "ram_delta": round(ram / baseline_ram - 1, 3),
+                f"recall@{k}": round(dense_recall(matrix, variant, n_queries, k), 4),
+            })
+
+    if len(sparse) > n_queries:
+        baseline_mb, _ = sparse_footprint(sparse, n_points)
+        for top_k, min_weight in ((0, 0.0), *[o for o in sparse_options if o != (0, 0.0)]):
+            size, nnz = sparse_footprint(sparse, n_points, top_k, min_weight)
+            rows.append({
+                "vector": "sparse_text",
+                "variant": f"top_k={top_k or '-'} min_weight={min_weight or '-'}",
+                "disk_mb": round(size, 1),
+                "ram_mb": None,
+                "disk_delta": round(size / baseline_mb - 1, 3) if baseline_mb else 0.0,
+                "ram_delta": None,
+                f"recall@{k}": round(sparse_recall(sparse, n_queries, k, top_k, min_weight), 4),
+                "mean_terms": round(nnz, 1),
+            })
+    return rows
+
+
+def print_report(rows):
+    if not rows:
+        print("Nothing to report (sample too small).")
+        return
+    recall_key = next(key for key in rows[0] if key.startswith("recall@"))
+    print(f"{'vector':<12} {'variant':<32} {'disk MB':>9} {'Δdisk':>7} {'RAM MB':>8} {'ΔRAM':>7} {recall_key:>10}")
+    for row in rows:
+        ram = f"{row['ram_mb']:>8}" if row["ram_mb"] is not None else f"{'-':>8}"
+        ram_delta = f"{row['ram_delta']:>+7.1%}" if row["ram_delta"] is not None else f"{'-':>7}"
+        print(
+            f"{row['vector']:<12} {row['variant']:<32} {row['disk_mb']:>9} {row['disk_delta']:>+7.1%} "
+            f"{ram} {ram_delta} {row[recall_key]:>10}"
+        )
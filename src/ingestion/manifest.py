@@ -0,0 +1,139 @@
+# src/ingestion/manifest.py
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+# Fixed namespace so the same record + chunk always maps to the same point id
+POINT_NAMESPACE = uuid.UUID("1b671a64-40d5-491e-99b0-da01ff1f3341")
+
+# Fields that identify a record when it carries no explicit id (first one present wins)
+IDENTITY_FIELDS = ("title", "debunked_myth", "text_content")
+
+
+def record_identity(record, source):
+    """
+    Stable identity of a source record: explicit id if present, otherwise
+    source file + record type + its natural key field.
+    """
+    payload = record.get("payload", {})
+    explicit = record.get("id") or payload.get("record_id")
+    if explicit is not None:
+        return f"{source}::{explicit}"
+    natural = next((payload[f] for f in IDENTITY_FIELDS if payload.get(f)), "")
+    digest = hashlib.sha1(str(natural).strip().encode("utf-8")).hexdigest()
+    return f"{source}::{payload.get('record_type', 'record')}::{digest}"
+
+
+def content_hash(record):
+    """Hash of the full record; any edit to text or metadata changes it."""
+    raw = json.dumps(record, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def point_id(record_key, chunk_index):
+    return str(uuid.uuid5(POINT_NAMESPACE, f"{record_key}#{chunk_index}"))
+
+
+class IngestionManifest:
+    """
+    SQLite ledger of what is in a collection:
+    record_key -> content hash + number of chunks (point ids are derived).
+    Updates are staged as 'pending' and only committed once the upload succeeded,
+    so a crashed run simply redoes its (idempotent) upserts next time.
+    """
+
+    def __init__(self, path):
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            " record_key TEXT PRIMARY KEY,"
+            " source TEXT NOT NULL,"
+            " content_hash TEXT,"
+            " chunk_count INTEGER NOT NULL DEFAULT 0,"
+            " pending_hash TEXT,"
+            " pending_chunks INTEGER,"
+            " seen_run TEXT,"
+            " updated_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_records_source ON records(source)")
+        # A previous run died between upload and commit: its records may be half
+        # written, so forget their committed hash and let this run re-embed them.
+        self._conn.execute(
+            "UPDATE records SET content_hash = NULL, pending_hash = NULL, pending_chunks = NULL "
+            "WHERE pending_hash IS NOT NULL"
+        )
+        self._conn.commit()
+        self.run_id = uuid.uuid4().hex
+
+    def claim_key(self, record_key, source):
+        """
+        Marks a key as seen in this run. Two records with the same identity in one
+        run get distinct keys (…~1, …~2) instead of overwriting each other.
+        """
+        key, n = record_key, 0
+        while True:
+            row = self._conn.execute(
+                "SELECT seen_run FROM records WHERE record_key = ?", (key,)
+            ).fetchone()
+            if row is None or row[0] != self.run_id:
+                break
+            n += 1
+            key = f"{record_key}~{n}"
+        self._conn.execute(
+            "INSERT INTO records (record_key, source, seen_run) VALUES (?, ?, ?) "
+            "ON CONFLICT(record_key) DO UPDATE SET seen_run = excluded.seen_run",
+            (key, source, self.run_id),
+        )
+        return key
+
+    def lookup(self, record_key):
+        """Returns (content_hash, chunk_count) of the committed state, or (None, 0)."""
+        row = self._conn.execute(
+            "SELECT content_hash, chunk_count FROM records WHERE record_key = ?", (record_key,)
+        ).fetchone()
+        return (row[0], row[1]) if row else (None, 0)
+
+    def stage(self, record_key, new_hash, new_chunks):
+        self._conn.execute(
+            "UPDATE records SET pending_hash = ?, pending_chunks = ? WHERE record_key = ?",
+            (new_hash, new_chunks, record_key),
+        )
+
+    def stale_point_ids(self):
+        """Point ids left over when a changed record now has FEWER chunks than before."""
+        rows = self._conn.execute(
+            "SELECT record_key, chunk_count, pending_chunks FROM records "
+            "WHERE pending_hash IS NOT NULL AND chunk_count > pending_chunks"
+        ).fetchall()
+        return [point_id(key, i) for key, old, new in rows for i in range(new, old)]
+
+    def removed(self, sources):
+        """Records of the given sources that were not seen in this run."""
+        placeholders = ",".join("?" for _ in sources)
+        rows = self._conn.execute(
+            f"SELECT record_key, chunk_count FROM records WHERE source IN ({placeholders}) "
+            "AND (seen_run IS NULL OR seen_run != ?)",
+            (*sources, self.run_id),
+        ).fetchall()
+        return rows
+
+    def commit_run(self, removed_keys=()):
+        """Upload succeeded: promote pending state, forget removed records."""
+        now = time.time()
+        self._conn.execute(
+            "UPDATE records SET content_hash = pending_hash, chunk_count = pending_chunks, "
+            "pending_hash = NULL, pending_chunks = NULL, updated_at = ? WHERE pending_hash IS NOT NULL",
+            (now,),
+        )
+        self._conn.executemany("DELETE FROM records WHERE record_key = ?", [(k,) for k in removed_keys])
+        # Rows claimed but never embedded (e.g. records with no text) carry no points
+        self._conn.execute("DELETE FROM records WHERE content_hash IS NULL AND pending_hash IS NULL")
+        self._conn.commit()
+
+    def flush(self):
+        self._conn.commit()
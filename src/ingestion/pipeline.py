@@ -0,0 +1,297 @@
+# src/ingestion/pipeline.py
+import os
+import time
+
+from qdrant_client import models
+
+from src.config import (
+    client,
+    dense_image_model,
+    DATA_COLLECTION_NAME,
+    DENSE_IMAGE_MODEL_NAME,
+    DENSE_VECTOR_STORAGE,
+    DENSE_TEXT_MODEL_NAME,
+    EMBEDDING_ARTIFACT_DIR,
+    INDEXED_PAYLOAD_FIELDS,
+    SPARSE_TEXT_MODEL_NAME,
+    model_version,
+)
+from src.ingestion.aliases import (
+    ReindexVerificationError,
+    gc_versions,
+    is_legacy_collection,
+    resolve_alias,
+    swap_alias,
+    verify_collection,
+    versioned_name,
+)
+from src.ingestion.artifacts import EmbeddingArtifacts
+from src.ingestion.collection_spec import DATA_COLLECTION_SPEC, apply_spec, with_dense_storage, with_vector_sizes
+from src.ingestion.manifest import IngestionManifest, content_hash, point_id, record_identity
+from src.ingestion.readers import iter_batches, iter_records
+from src.ingestion.records import (
+    IMAGE_CACHE_DIR,
+    MAX_TOKEN_LIMIT,
+    TokenHistogram,
+    encode_units,
+    prepare_batch,
+    semantic_splitter,
+)
+from src.ingestion.visual import VisualPipeline
+from src.runtime.logs import get_logger
+
+MANIFEST_DIR = os.getenv("INGEST_MANIFEST_DIR", ".cache/manifests")
+
+log = get_logger(__name__)
+
+
+class Throughput:
+    """Counts what went through the pipeline and how fast."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.records = 0
+        self.failed = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.points = 0
+        self.vectors = 0
+        self.tokens = TokenHistogram()
+
+    def add(self, records=0, failed=0, unchanged=0, deleted=0, points=0, vectors=0):
+        self.records += records
+        self.failed += failed
+        self.unchanged += unchanged
+        self.deleted += deleted
+        self.points += points
+        self.vectors += vectors
+
+    def summary(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return {
+            "records": self.records,
+            "failed_records": self.failed,
+            "unchanged_records": self.unchanged,
+            "deleted_points": self.deleted,
+            "points": self.points,
+            "vectors": self.vectors,
+            "seconds": round(elapsed, 2),
+            "records_per_sec": round(self.records / elapsed, 2),
+            "vectors_per_sec": round(self.vectors / elapsed, 2),
+            "token_overflows": self.tokens.overflows,
+        }
+
+    def report(self, prefix="📊"):
+        s = self.summary()
+        print(
+            f"{prefix} {s['records']} records ({s['unchanged_records']} unchanged, {s['failed_records']} failed) "
+            f"-> {s['points']} points upserted, {s['deleted_points']} deleted, "
+            f"{s['vectors']} vectors in {s['seconds']}s | "
+            f"{s['records_per_sec']} records/s, {s['vectors_per_sec']} vectors/s"
+        )
+
+
+def data_collection_spec():
+    """The declarative spec with model sizes, DENSE_VECTOR_STORAGE and every planner filter field indexed."""
+    spec = with_vector_sizes(
+        with_dense_storage(DATA_COLLECTION_SPEC, DENSE_VECTOR_STORAGE),
+        dense_image=len(dense_image_model.encode("test")),
+    )
+    spec["payload_indexes"] = {**spec["payload_indexes"], **INDEXED_PAYLOAD_FIELDS}
+    return spec
+
+
+def ensure_collection(collection_name=DATA_COLLECTION_NAME):
+    """Creates the hybrid collection or converges it to DATA_COLLECTION_SPEC (idempotent)."""
+    pending = apply_spec(client, collection_name, data_collection_spec())
+    for key, live, wanted, _ in pending:
+        log.warning("⚠️ '%s' %s is %s, spec wants %s: needs `setup/ingest.py reindex`.", collection_name, key, live, wanted)
+
+
+def open_artifacts(root=EMBEDDING_ARTIFACT_DIR):
+    """Artifact stores for the CURRENT model versions (a model change starts a fresh store)."""
+    return EmbeddingArtifacts(
+        root,
+        dense_text_version=model_version(DENSE_TEXT_MODEL_NAME),
+        sparse_text_version=SPARSE_TEXT_MODEL_NAME,
+        dense_image_version=model_version(DENSE_IMAGE_MODEL_NAME),
+        chunker_version=(
+            f"{DENSE_TEXT_MODEL_NAME}-b{semantic_splitter.buffer_size}"
+            f"-p{semantic_splitter.breakpoint_percentile_threshold}-t{MAX_TOKEN_LIMIT}"
+        ),
+    )
+
+
+def generate_points(paths, batch_size, stats, manifest, full=False, artifacts=None, visual=None, log_every=10):
+    """
+    Streams records from every file, embeds them in micro-batches of
+    `batch_size` records and yields PointStructs one by one.
+    Nothing larger than one micro-batch is ever held in memory.
+    Records whose content hash matches the manifest are skipped (unless `full`).
+    """
+    for path in paths:
+        source = os.path.basename(path)
+        print(f"\n🚀 Streaming records from {path}...")
+        for n, batch in enumerate(iter_batches(iter_records(path), batch_size), 1):
+            pending = []
+            failed = unchanged = 0
+            for record in batch:
+                key = manifest.claim_key(record_identity(record, source), source)
+                new_hash = content_hash(record)
+                if not full and manifest.lookup(key)[0] == new_hash:
+                    unchanged += 1
+                    continue
+                pending.append((record, key, new_hash))
+
+            units, ids = [], []
+            prepared = prepare_batch([record for record, _, _ in pending], stats.tokens, artifacts, visual)
+            for (record, key, new_hash), record_units in zip(pending, prepared):
+                if isinstance(record_units, Exception):
+                    # Not staged: the committed hash and points stay, the record is retried next run
+                    failed += 1
+                    log.warning("   ⚠️ Skipping record: %s", record_units)
+                    continue
+                units.extend(record_units)
+                ids.extend(point_id(key, i) for i in range(len(record_units)))
+                manifest.stage(key, new_hash, len(record_units))
+            manifest.flush()
+
+            points = encode_units(units, ids, artifacts)
+            stats.add(
+                records=len(batch),
+                failed=failed,
+                unchanged=unchanged,
+                points=len(points),
+                vectors=sum(len(p.vector) for p in points),
+            )
+            if n % log_every == 0:
+                stats.report(prefix="   ⏳")
+            yield from points
+
+
+def manifest_path_for(collection_name):
+    return os.path.join(MANIFEST_DIR, f"{collection_name}.sqlite")
+
+
+def delete_points(collection_name, ids, batch_size=1000):
+    for start in range(0, len(ids), batch_size):
+        client.delete(
+            collection_name=collection_name,
+            points_selector=models.PointIdsList(points=ids[start:start + batch_size]),
+            wait=True,
+        )
+
+
+def ingest(
+    paths,
+    collection_name=DATA_COLLECTION_NAME,
+    batch_size=64,
+    upload_batch_size=256,
+    parallel=2,
+    max_retries=3,
+    manifest_path=None,
+    full=False,
+    use_artifacts=True,
+    image_workers=8,
+    decode_workers=None,
+    image_batch_size=32,
+):
+    """
+    Streams JSON/JSONL files into Qdrant, incrementally:
+    read -> hash vs manifest -> chunk -> embed (micro-batches) -> upload_points
+    (parallel workers, retries) -> delete chunks of removed/shrunk records.
+    Point ids are uuid5(record identity + chunk index), so re-runs upsert in place.
+    Vectors are read from / written to the embedding artifact store, so a rebuild
+    into a new collection is a pure upload job.
+    Images are fetched by `image_workers` threads, decoded/downscaled by
+    `decode_workers` processes and CLIP-encoded `image_batch_size` at a time.
+    Returns the throughput summary.
+    """
+    stats = Throughput()
+    # Writing through an alias = incremental update of the live version
+    collection_name = resolve_alias(client, collection_name) or collection_name
+    ensure_collection(collection_name)
+    manifest = IngestionManifest(manifest_path or manifest_path_for(collection_name))
+    artifacts = open_artifacts() if use_artifacts else None
+    visual = VisualPipeline(
+        dense_image_model,
+        IMAGE_CACHE_DIR,
+        fetch_workers=image_workers,
+        decode_workers=decode_workers,
+        encode_batch_size=image_batch_size,
+    )
+
+    try:
+        client.upload_points(
+            collection_name=collection_name,
+            points=generate_points(paths, batch_size, stats, manifest, full=full, artifacts=artifacts, visual=visual),
+            batch_size=upload_batch_size,
+            parallel=parallel,
+            max_retries=max_retries,
+            wait=True,
+        )
+    finally:
+        visual.close()
+        # Vectors computed before a failure are still worth keeping
+        if artifacts is not None:
+            artifacts.flush()
+
+    # Clean up: chunks of records that shrank, and every chunk of records that disappeared
+    removed = manifest.removed([os.path.basename(p) for p in paths])
+    stale_ids = manifest.stale_point_ids()
+    stale_ids += [point_id(key, i) for key, chunks in removed for i in range(chunks)]
+    if stale_ids:
+        delete_points(collection_name, stale_ids)
+        stats.add(deleted=len(stale_ids))
+    manifest.commit_run(removed_keys=[key for key, _ in removed])
+
+    stats.tokens.report()
+    visual.stats.report()
+    if artifacts is not None:
+        print(f"🗄️ Artifact store: {artifacts.stats()}")
+    stats.report(prefix="✅ Done:")
+    return {**stats.summary(), "visual": visual.stats.summary()}
+
+
+def reindex(
+    paths,
+    alias=DATA_COLLECTION_NAME,
+    keep=2,
+    min_recall=0.9,
+    replace_legacy=False,
+    **ingest_kwargs,
+):
+    """
+    Blue/green rebuild: ingest everything into a NEW versioned collection,
+    verify it (exact point count + smoke recall), then swap `alias` onto it
+    atomically and garbage-collect old versions. Live search keeps reading
+    the previous version until the swap. A failed verification drops the
+    new collection and leaves the alias untouched.
+    """
+    if is_legacy_collection(client, alias) and not replace_legacy:
+        raise ReindexVerificationError(
+            f"'{alias}' is a plain collection, not an alias. Re-run with replace_legacy=True "
+            "to drop it right before the first swap (one short gap, then never again)."
+        )
+
+    new_collection = versioned_name(alias)
+    print(f"🔵 Building '{new_collection}' (live: {resolve_alias(client, alias) or alias})")
+    summary = ingest(paths, collection_name=new_collection, full=True, **ingest_kwargs)
+
+    try:
+        report = verify_collection(client, new_collection, summary["points"], min_recall=min_recall)
+    except ReindexVerificationError:
+        client.delete_collection(collection_name=new_collection)
+        raise
+    print(f"🔍 Verified: {report}")
+
+    if is_legacy_collection(client, alias):
+        client.delete_collection(collection_name=alias)
+    swap_alias(client, alias, new_collection)
+    print(f"🟢 Alias '{alias}' -> '{new_collection}'")
+
+    for name in gc_versions(client, alias, keep=keep):
+        print(f"🗑️ Dropped old version '{name}'")
+        if os.path.exists(manifest_path_for(name)):
+            os.remove(manifest_path_for(name))
+    return {**summary, "verification": report, "collection": new_collection}
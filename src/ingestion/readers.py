@@ -0,0 +1,83 @@
+# src/ingestion/readers.py
+import json
+
+_DECODER = json.JSONDecoder()
+
+
+def iter_json_array(path, chunk_size=1 << 16):
+    """
+    Streams the elements of a top-level JSON array WITHOUT loading the whole
+    file: reads fixed-size chunks and decodes one element at a time.
+    Memory stays ~ chunk_size + one record, whatever the file size.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = ""
+        pos = 0
+        started = False
+        eof = False
+
+        while True:
+            # Skip whitespace / separators between elements
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    break
+                buffer, pos = f.read(chunk_size), 0
+                eof = not buffer
+
+            if pos >= len(buffer):
+                return
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError(f"{path}: expected a JSON array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+
+            try:
+                record, end = _DECODER.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Element spans the chunk boundary: read more and retry
+                more = f.read(chunk_size)
+                if not more:
+                    raise
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+            yield record
+            pos = end
+            if pos > chunk_size:
+                buffer, pos = buffer[pos:], 0
+
+
+def iter_jsonl(path):
+    """One JSON record per line; blank lines are skipped."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line: continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: invalid JSON ({e})")
+
+
+def iter_records(path):
+    """Picks the reader from the extension: .jsonl/.ndjson -> lines, anything else -> JSON array."""
+    if path.endswith((".jsonl", ".ndjson")):
+        return iter_jsonl(path)
+    return iter_json_array(path)
+
+
+def iter_batches(iterable, size):
+    """Groups an iterator into lists of at most `size` items."""
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
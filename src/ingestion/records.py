@@ -0,0 +1,317 @@
+# src/ingestion/records.py
+import os
+
+from qdrant_client import models
+
+from src.config import (
+    dense_text_model,
+    dense_image_model,
+    sparse_text_model,
+    SPARSE_MIN_WEIGHT,
+    SPARSE_TOP_K,
+)
+from src.ingestion.artifacts import artifact_key
+from src.ingestion.chunking import SemanticSplitter
+from src.ingestion.visual import VisualPipeline
+from src.tools.vector_codec import prune_sparse
+
+# E5 context window (tokens, including the "passage: " prefix)
+MAX_TOKEN_LIMIT = 512
+
+# The E5 SentenceTransformer already carries its (fast) tokenizer
+tokenizer = dense_text_model.tokenizer
+
+
+def get_token_counts(texts):
+    """
+    Token counts for a whole batch via the fast (Rust) tokenizer's batch API.
+    len(Encoding) is read on the Rust side, so no Python token lists are built.
+    """
+    if not texts: return []
+    # E5 expects "passage: " prefix, so we count that too
+    inputs = [f"passage: {t}" for t in texts]
+    backend = getattr(tokenizer, "backend_tokenizer", None)
+    if backend is not None:
+        return [len(encoding) for encoding in backend.encode_batch(inputs, add_special_tokens=True)]
+    return [len(ids) for ids in tokenizer(inputs, add_special_tokens=True)["input_ids"]]
+
+
+def get_token_count(text):
+    if not text: return 0
+    return get_token_counts([text])[0]
+
+
+class TokenHistogram:
+    """Distribution of record lengths, printed once instead of one line per record."""
+
+    EDGES = (64, 128, 256, 384, MAX_TOKEN_LIMIT)
+
+    def __init__(self):
+        self.buckets = [0] * (len(self.EDGES) + 1)
+        self.total = 0
+        self.max_seen = 0
+
+    def add(self, counts):
+        for count in counts:
+            index = next((i for i, edge in enumerate(self.EDGES) if count <= edge), len(self.EDGES))
+            self.buckets[index] += 1
+            self.total += 1
+            self.max_seen = max(self.max_seen, count)
+
+    @property
+    def overflows(self):
+        return self.buckets[-1]
+
+    def report(self):
+        print(f"📏 Token counts for {self.total} texts (max {self.max_seen}, limit {MAX_TOKEN_LIMIT}):")
+        lower = 0
+        labels = []
+        for edge in self.EDGES:
+            labels.append(f"{lower + 1 if lower else 0}-{edge}")
+            lower = edge
+        labels.append(f">{MAX_TOKEN_LIMIT}")
+        width = max(self.buckets) or 1
+        for label, n in zip(labels, self.buckets):
+            print(f"   {label:>9} | {'█' * max(1 if n else 0, round(30 * n / width)):<30} {n}")
+        if self.overflows:
+            print(f"   -> {self.overflows} texts exceed the window and go to the semantic splitter.")
+
+
+# Semantic splitter on the SHARED E5 instance (no second model load per record)
+semantic_splitter = SemanticSplitter(
+    dense_text_model,
+    buffer_size=1,
+    breakpoint_percentile_threshold=90,
+)
+
+
+def chunk_texts(texts, token_stats=None, artifacts=None):
+    """
+    Fits in the window -> one chunk. Overflow -> semantic splitter.
+    Token counts come from one batch call, and all overflowing texts of the
+    batch are split in ONE batched pass (or read back from the artifact store).
+    """
+    chunk_lists = [[t] for t in texts]
+    counts = get_token_counts(texts)
+    if token_stats is not None:
+        token_stats.add(counts)
+    overflow = [i for i, count in enumerate(counts) if count > MAX_TOKEN_LIMIT]
+    if artifacts is not None:
+        misses = []
+        for i in overflow:
+            cached = artifacts.chunks.get(artifact_key(texts[i]))
+            if cached is None:
+                misses.append(i)
+            else:
+                chunk_lists[i] = cached
+        overflow = misses
+    if overflow:
+        for i, chunks in zip(overflow, semantic_splitter.split_many([texts[i] for i in overflow])):
+            chunk_lists[i] = chunks
+            if artifacts is not None:
+                artifacts.chunks.put(artifact_key(texts[i]), chunks)
+    return chunk_lists
+
+
+def chunk_text(text):
+    return chunk_texts([text])[0]
+
+
+def record_text(payload):
+    """Myth records carry 'debunked_myth', FAQ records carry 'text_content'."""
+    return payload.get("debunked_myth") or payload.get("text_content") or ""
+
+
+def construct_text_from_visual_payload(payload):
+    """
+    Combines Title + Concepts + Description into one searchable text block.
+    """
+    parts = []
+    if payload.get("title"): parts.append(payload["title"])
+    if payload.get("visual_concepts"): parts.append(", ".join(payload["visual_concepts"]))
+    if payload.get("description"): parts.append(payload["description"])
+    return ". ".join(parts)
+
+
+IMAGE_CACHE_DIR = os.getenv("INGEST_IMAGE_CACHE_DIR", ".cache/images")
+_visual_pipeline = None
+
+
+def default_visual_pipeline():
+    """Shared fetch/decode/encode pipeline on the already loaded CLIP model."""
+    global _visual_pipeline
+    if _visual_pipeline is None:
+        _visual_pipeline = VisualPipeline(dense_image_model, IMAGE_CACHE_DIR)
+    return _visual_pipeline
+
+
+def get_image_embeddings(image_sources, artifacts=None, visual=None):
+    """
+    {source: vector (list) | None} for a whole micro-batch of images.
+    Vectors are stored under the sha256 of the image bytes, so a changed image
+    behind the same URL is re-encoded and duplicate images at different URLs
+    are encoded once; only images never seen before reach decode and CLIP.
+    """
+    visual = visual or default_visual_pipeline()
+    paths = visual.fetch(image_sources)
+    vectors = {source: None for source in paths}
+    digests = {source: visual.downloader.digest(path) for source, path in paths.items() if path}
+
+    by_digest, misses = {}, {}
+    for digest in dict.fromkeys(digests.values()):
+        stored = artifacts.dense_image.get(digest) if artifacts is not None else None
+        if stored is None:
+            misses[digest] = next(paths[s] for s, d in digests.items() if d == digest)
+        else:
+            by_digest[digest] = stored.tolist()
+
+    if misses:
+        encoded = visual.encode(list(misses.values()))
+        for digest, path in misses.items():
+            vector = encoded.get(path)
+            if vector is None: continue
+            if artifacts is not None:
+                artifacts.dense_image.put(digest, vector)
+            by_digest[digest] = vector.tolist()
+
+    for source, digest in digests.items():
+        vectors[source] = by_digest.get(digest)
+    return vectors
+
+
+def get_image_embedding(image_source, artifacts=None):
+    if not image_source: return None
+    return get_image_embeddings([image_source], artifacts).get(image_source)
+
+
+def build_units(payload, text, chunks, image_vector=None):
+    """Chunk units (not yet embedded): [{"text", "payload", "image_vector"}, ...]"""
+    if image_vector is not None:
+        # Visual records: CLIP vector for the image + text lanes for the description
+        return [
+            {
+                "text": chunk,
+                "payload": {
+                    **payload,
+                    "text_content": chunk,
+                    "original_full_text": text if len(chunks) > 1 else None,
+                    "chunk_index": i,
+                },
+                "image_vector": image_vector,
+            }
+            for i, chunk in enumerate(chunks)
+        ]
+    return [
+        {"text": chunk, "payload": {**payload, "text_content": chunk}, "image_vector": None}
+        for chunk in chunks
+    ]
+
+
+def prepare_batch(records, token_stats=None, artifacts=None, visual=None):
+    """
+    Turns a micro-batch of source records into chunk units.
+    Returns a list aligned with `records`: the record's units, or the
+    Exception it raised (so one bad record does not sink the batch).
+    A visual record whose image could not be fetched or encoded is an Exception.
+    All images of the batch are fetched, decoded and encoded together.
+    """
+    results = [None] * len(records)
+    texts, owners, image_vectors = [], [], {}
+
+    image_urls = [
+        r.get("payload", {}).get("image_url")
+        for r in records
+        if r.get("payload", {}).get("record_type") == "official_visual_truth"
+    ]
+    batch_images = get_image_embeddings(image_urls, artifacts, visual) if image_urls else {}
+
+    for i, record in enumerate(records):
+        try:
+            payload = record.get("payload", {})
+            if payload.get("record_type") == "official_visual_truth":
+                image_url = payload.get("image_url")
+                if not image_url:
+                    results[i] = []
+                    continue
+                image_vector = batch_images.get(image_url)
+                if image_vector is None:
+                    # Usually a transient fetch error: fail the record, do not index it as empty
+                    raise RuntimeError(f"image could not be fetched or encoded: {image_url}")
+                image_vectors[i] = image_vector
+                text = construct_text_from_visual_payload(payload)
+            else:
+                text = record_text(payload)
+            if not text:
+                results[i] = []
+                continue
+            texts.append(text)
+            owners.append(i)
+        except Exception as e:
+            results[i] = e
+
+    for i, text, chunks in zip(owners, texts, chunk_texts(texts, token_stats, artifacts)):
+        results[i] = build_units(records[i].get("payload", {}), text, chunks, image_vectors.get(i))
+    return results
+
+
+def prepare_record(record):
+    result = prepare_batch([record])[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def encode_units(units, point_ids, artifacts=None):
+    """
+    Embeds a micro-batch of chunk units in ONE dense and ONE sparse call
+    and builds the PointStructs. With an artifact store, only chunks never
+    seen before (for this model version) reach the models.
+    """
+    if not units: return []
+
+    texts = [u["text"] for u in units]
+    dense_inputs = [f"passage: {t}" for t in texts]
+
+    if artifacts is not None:
+        dense_keys = [artifact_key(t) for t in dense_inputs]
+        sparse_keys = [artifact_key(t) for t in texts]
+        dense_vectors = artifacts.dense_text.get_many(dense_keys)
+        sparse_vectors = artifacts.sparse_text.get_many(sparse_keys)
+    else:
+        dense_vectors = [None] * len(texts)
+        sparse_vectors = [None] * len(texts)
+
+    dense_missing = [i for i, v in enumerate(dense_vectors) if v is None]
+    if dense_missing:
+        encoded = dense_text_model.encode(
+            [dense_inputs[i] for i in dense_missing],
+            normalize_embeddings=True,
+            batch_size=len(dense_missing),
+        )
+        for i, vector in zip(dense_missing, encoded):
+            dense_vectors[i] = vector
+            if artifacts is not None:
+                artifacts.dense_text.put(dense_keys[i], vector)
+
+    sparse_missing = [i for i, v in enumerate(sparse_vectors) if v is None]
+    if sparse_missing:
+        for i, sparse in zip(sparse_missing, sparse_text_model.embed([texts[i] for i in sparse_missing])):
+            sparse_vectors[i] = (sparse.indices, sparse.values)
+            if artifacts is not None:
+                artifacts.sparse_text.put(sparse_keys[i], sparse_vectors[i])
+
+    points = []
+    for unit, point_id, dense, (indices, values) in zip(units, point_ids, dense_vectors, sparse_vectors):
+        # The artifact store keeps full BM25 vectors; pruning is only applied on the way out
+        indices, values = prune_sparse(indices, values, SPARSE_TOP_K, SPARSE_MIN_WEIGHT)
+        vector = {
+            "dense_text": dense.tolist(),
+            "sparse_text": models.SparseVector(
+                indices=indices.tolist(),
+                values=values.tolist()
+            ),
+        }
+        if unit["image_vector"] is not None:
+            vector["dense_image"] = unit["image_vector"]
+        points.append(models.PointStruct(id=point_id, vector=vector, payload=unit["payload"]))
+    return points
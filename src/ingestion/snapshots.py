@@ -0,0 +1,257 @@
+# src/ingestion/snapshots.py
+"""
+Fast bootstrap: copy ready-made collections instead of re-running the models.
+
+Two formats:
+  * Qdrant snapshots (.snapshot files): server-to-server, exact copy incl. HNSW.
+  * Portable bundles (a directory): vectors (npz) + payloads (jsonl) + layout,
+    restorable into ANY client: remote, local (path=...) or in-memory.
+"""
+import json
+import os
+
+import numpy as np
+import requests
+from qdrant_client import QdrantClient, models
+
+from src.ingestion.aliases import resolve_alias, swap_alias, versioned_name
+from src.ingestion.collection_spec import apply_spec
+
+BUNDLE_FORMAT = 1
+PART_SIZE = 2048
+
+
+def open_client(target, api_key=None):
+    """':memory:' -> in-memory, http(s)://... -> remote, anything else -> local on-disk path."""
+    if target == ":memory:":
+        return QdrantClient(":memory:")
+    if target.startswith(("http://", "https://")):
+        return QdrantClient(url=target, api_key=api_key)
+    return QdrantClient(path=target)
+
+
+# --- Portable bundles ---
+
+def layout_from_collection(info):
+    """Enough of the live layout (in collection-spec form) to recreate the collection."""
+    params = info.config.params
+    vectors = {
+        name: {
+            "size": v.size,
+            "distance": getattr(v.distance, "value", v.distance),
+            "datatype": getattr(v.datatype, "value", v.datatype) or "float32",
+            "on_disk": bool(v.on_disk),
+        }
+        for name, v in (params.vectors if isinstance(params.vectors, dict) else {}).items()
+    }
+    sparse = {
+        name: {
+            "modifier": getattr(v.modifier, "value", v.modifier),
+            "on_disk": bool(v.index and v.index.on_disk),
+        }
+        for name, v in (params.sparse_vectors or {}).items()
+    }
+    return {
+        "vectors": vectors,
+        "sparse_vectors": sparse,
+        "payload_indexes": {
+            field: getattr(schema.data_type, "value", schema.data_type)
+            for field, schema in (info.payload_schema or {}).items()
+        },
+    }
+
+
+def _write_part(out_dir, part, points, layout):
+    arrays = {}
+    for name in layout["vectors"]:
+        rows = [i for i, p in enumerate(points) if p.vector.get(name) is not None]
+        arrays[f"{name}__rows"] = np.asarray(rows, dtype=np.int32)
+        arrays[name] = np.asarray([points[i].vector[name] for i in rows], dtype=np.float32)
+    for name in layout["sparse_vectors"]:
+        rows, indptr, indices, values = [], [0], [], []
+        for i, p in enumerate(points):
+            sparse = p.vector.get(name)
+            if sparse is None: continue
+            rows.append(i)
+            indices.extend(sparse.indices)
+            values.extend(sparse.values)
+            indptr.append(len(indices))
+        arrays[f"{name}__rows"] = np.asarray(rows, dtype=np.int32)
+        arrays[f"{name}__indptr"] = np.asarray(indptr, dtype=np.int64)
+        arrays[f"{name}__indices"] = np.asarray(indices, dtype=np.uint32)
+        arrays[f"{name}__values"] = np.asarray(values, dtype=np.float32)
+    np.savez(os.path.join(out_dir, f"part-{part:05d}.npz"), **arrays)
+    with open(os.path.join(out_dir, f"part-{part:05d}.jsonl"), "w", encoding="utf-8") as f:
+        for p in points:
+            f.write(json.dumps({"id": p.id, "payload": p.payload}, ensure_ascii=False) + "\n")
+
+
+def export_bundle(client, collection_name, out_dir, part_size=PART_SIZE):
+    """Streams every point (vectors + payload) to `out_dir/<collection>/`. Returns the manifest."""
+    live = resolve_alias(client, collection_name)
+    source = live or collection_name
+    layout = layout_from_collection(client.get_collection(source))
+    target = os.path.join(out_dir, collection_name)
+    os.makedirs(target, exist_ok=True)
+
+    offset, part, total = None, 0, 0
+    while True:
+        points, offset = client.scroll(
+            collection_name=source,
+            limit=part_size,
+            offset=offset,
+            with_vectors=True,
+            with_payload=True,
+        )
+        if points:
+            _write_part(target, part, points, layout)
+            part += 1
+            total += len(points)
+        if offset is None: break
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "collection": collection_name,
+        "alias": live is not None,
+        "points": total,
+        "parts": part,
+        "layout": layout,
+    }
+    with open(os.path.join(target, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def _read_part(bundle_dir, part, layout):
+    with open(os.path.join(bundle_dir, f"part-{part:05d}.jsonl"), encoding="utf-8") as f:
+        records = [json.loads(line) for line in f]
+    vectors = [{} for _ in records]
+    with np.load(os.path.join(bundle_dir, f"part-{part:05d}.npz")) as arrays:
+        for name in layout["vectors"]:
+            for row, vector in zip(arrays[f"{name}__rows"], arrays[name]):
+                vectors[row][name] = vector.tolist()
+        for name in layout["sparse_vectors"]:
+            indptr = arrays[f"{name}__indptr"]
+            indices, values = arrays[f"{name}__indices"], arrays[f"{name}__values"]
+            for n, row in enumerate(arrays[f"{name}__rows"]):
+                start, end = indptr[n], indptr[n + 1]
+                vectors[row][name] = models.SparseVector(
+                    indices=indices[start:end].tolist(),
+                    values=values[start:end].tolist(),
+                )
+    return [
+        models.PointStruct(id=record["id"], vector=vector, payload=record["payload"])
+        for record, vector in zip(records, vectors)
+    ]
+
+
+def restore_bundle(client, bundle_dir, collection_name=None, spec=None, batch_size=256):
+    """
+    Loads a bundle into `client`. Aliased collections come back the same way:
+    a fresh versioned collection, then an alias swap (so a live alias never
+    points at a half-loaded collection). `spec` overrides the stored layout
+    (e.g. the current DATA_COLLECTION_SPEC for HNSW/optimizer settings).
+    Returns {"collection", "points": bundle points restored}.
+    """
+    with open(os.path.join(bundle_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    if manifest["format"] != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported bundle format {manifest['format']}")
+
+    name = collection_name or manifest["collection"]
+    target = versioned_name(name) if manifest["alias"] else name
+    apply_spec(client, target, spec or manifest["layout"])
+
+    ids = []
+
+    def points():
+        for part in range(manifest["parts"]):
+            for point in _read_part(bundle_dir, part, manifest["layout"]):
+                ids.append(point.id)
+                yield point
+
+    client.upload_points(collection_name=target, points=points(), batch_size=batch_size, wait=True)
+    # The target may already hold other points: check the bundle's ids, not the total
+    missing = _missing_ids(client, target, ids)
+    if len(ids) != manifest["points"] or missing:
+        raise RuntimeError(
+            f"Restored {len(ids) - len(missing)} of {manifest['points']} bundle points into '{target}'"
+            + (f" (missing e.g. {missing[:5]})" if missing else "") + "."
+        )
+    if manifest["alias"]:
+        swap_alias(client, name, target)
+    return {"collection": target, "points": len(ids)}
+
+
+def restore_bundles(client, path):
+    """Restores one bundle, or every bundle in an `export` directory. Returns the restore results."""
+    if os.path.exists(os.path.join(path, "manifest.json")):
+        return [restore_bundle(client, path)]
+    return [
+        restore_bundle(client, os.path.join(path, entry))
+        for entry in sorted(os.listdir(path))
+        if os.path.exists(os.path.join(path, entry, "manifest.json"))
+    ]
+
+
+def _missing_ids(client, collection_name, ids, batch_size=1000):
+    missing = []
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start:start + batch_size]
+        found = {str(p.id) for p in client.retrieve(collection_name, ids=batch, with_payload=False, with_vectors=False)}
+        missing += [i for i in batch if str(i) not in found]
+    return missing
+
+
+# --- Native Qdrant snapshots (remote servers only) ---
+
+def _headers(api_key):
+    return {"api-key": api_key} if api_key else {}
+
+
+def export_snapshot(client, url, collection_name, out_dir, api_key=None, timeout=600):
+    """Creates a server-side snapshot and downloads it. Returns the local file path."""
+    live = resolve_alias(client, collection_name)
+    source = live or collection_name
+    snapshot = client.create_snapshot(collection_name=source, wait=True)
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{collection_name}.snapshot")
+    with requests.get(
+        f"{url.rstrip('/')}/collections/{source}/snapshots/{snapshot.name}",
+        headers=_headers(api_key),
+        stream=True,
+        timeout=timeout,
+    ) as response:
+        response.raise_for_status()
+        with open(path, "wb") as f:
+            for block in response.iter_content(chunk_size=1 << 20):
+                f.write(block)
+    with open(f"{path}.json", "w") as f:
+        json.dump({"collection": collection_name, "alias": live is not None}, f)
+    # Keep the server's snapshot storage from growing with every export
+    client.delete_snapshot(collection_name=source, snapshot_name=snapshot.name)
+    return path
+
+
+def restore_snapshot(client, url, path, collection_name=None, api_key=None, timeout=600):
+    """
+    Uploads a .snapshot file into a remote server. Like bundles, an aliased
+    collection is recovered into a new version and the alias swapped after.
+    Returns {"collection", "points"}.
+    """
+    with open(f"{path}.json") as f:
+        meta = json.load(f)
+    name = collection_name or meta["collection"]
+    target = versioned_name(name) if meta["alias"] else name
+    with open(path, "rb") as f:
+        response = requests.post(
+            f"{url.rstrip('/')}/collections/{target}/snapshots/upload",
+            params={"priority": "snapshot", "wait": "true"},
+            headers=_headers(api_key),
+            files={"snapshot": (os.path.basename(path), f)},
+            timeout=timeout,
+        )
+    response.raise_for_status()
+    if meta["alias"]:
+        swap_alias(client, name, target)
+    return {"collection": target, "points": client.count(collection_name=target, exact=True).count}
@@ -0,0 +1,224 @@
+# src/ingestion/visual.py
+"""
+Visual ingestion: fetch (thread pool) -> decode + downscale (process pool) -> CLIP (batched).
+Kept free of model imports so spawned decode workers start fast.
+
+Spawn also re-imports the entry script (as __mp_main__) in every worker, so
+scripts that ingest must keep src.config / pipeline imports inside functions
+or under `if __name__ == "__main__":`. tests/unit_testing_visual.py checks
+both the workers and the entry scripts.
+"""
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import requests
+from PIL import Image
+
+from src.runtime.logs import get_logger
+
+log = get_logger(__name__)
+
+
+class StageStats:
+    """Items, failures and busy time per pipeline stage."""
+
+    def __init__(self, *stages):
+        self._lock = threading.Lock()
+        self.stages = {name: {"items": 0, "failed": 0, "seconds": 0.0} for name in stages}
+
+    def add(self, stage, items=0, failed=0, seconds=0.0):
+        with self._lock:
+            s = self.stages[stage]
+            s["items"] += items
+            s["failed"] += failed
+            s["seconds"] += seconds
+
+    def summary(self):
+        with self._lock:
+            return {
+                name: {**s, "per_sec": round(s["items"] / s["seconds"], 2) if s["seconds"] else 0.0}
+                for name, s in self.stages.items()
+            }
+
+    def report(self):
+        for name, s in self.summary().items():
+            print(f"   🖼️ {name:<7} {s['items']:>6} ok, {s['failed']:>4} failed, {s['per_sec']:>8} items/s")
+
+
+class ImageDownloader:
+    """
+    Concurrent, retrying image fetcher with a content-addressed local cache:
+      <cache>/blobs/<sha256 of bytes>     the image itself (shared by duplicate URLs)
+      <cache>/urls/<sha256 of url>        pointer: which blob a URL resolved to
+    Local file paths are passed through untouched. With `refresh`, pointers
+    left by earlier processes are ignored (the image behind a URL may have
+    changed); each URL is still downloaded at most once per process.
+    """
+
+    def __init__(self, cache_dir, max_workers=8, retries=3, timeout=10, backoff=0.5):
+        self.blob_dir = os.path.join(cache_dir, "blobs")
+        self.url_dir = os.path.join(cache_dir, "urls")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.url_dir, exist_ok=True)
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self._fetched = set()  # URLs downloaded by this process
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="img-fetch")
+
+    def _cached_path(self, url, refresh=False):
+        pointer = os.path.join(self.url_dir, hashlib.sha256(url.encode("utf-8")).hexdigest())
+        if (not refresh or url in self._fetched) and os.path.exists(pointer):
+            with open(pointer) as f:
+                blob = os.path.join(self.blob_dir, f.read().strip())
+            if os.path.exists(blob):
+                return blob, pointer
+        return None, pointer
+
+    def fetch(self, source, refresh=False):
+        """Returns a local file path. Raises after `retries` failed attempts."""
+        if not source.startswith(("http://", "https://")):
+            if os.path.exists(source):
+                return source
+            raise FileNotFoundError(source)
+
+        cached, pointer = self._cached_path(source, refresh)
+        if cached:
+            return cached
+
+        last_error = None
+        for attempt in range(self.retries):
+            try:
+                response = requests.get(source, timeout=self.timeout)
+                response.raise_for_status()
+                digest = hashlib.sha256(response.content).hexdigest()
+                blob = os.path.join(self.blob_dir, digest)
+                if not os.path.exists(blob):
+                    tmp = f"{blob}.{threading.get_ident()}.tmp"
+                    with open(tmp, "wb") as f:
+                        f.write(response.content)
+                    os.replace(tmp, blob)
+                with open(pointer, "w") as f:
+                    f.write(digest)
+                self._fetched.add(source)
+                return blob
+            except Exception as e:
+                last_error = e
+                # Only this fetch sleeps; other images keep downloading. No sleep after the last attempt.
+                if attempt < self.retries - 1:
+                    time.sleep(self.backoff * (2 ** attempt))
+        raise last_error
+
+    def fetch_many(self, sources, refresh=False):
+        """{source: path | Exception}, fetched concurrently."""
+        futures = {source: self._pool.submit(self.fetch, source, refresh) for source in set(sources)}
+        results = {}
+        for source, future in futures.items():
+            try:
+                results[source] = future.result()
+            except Exception as e:
+                results[source] = e
+        return results
+
+    def digest(self, path):
+        """sha256 of the image bytes: free for cached blobs (their file name), hashed for local files."""
+        if os.path.dirname(path) == self.blob_dir:
+            return os.path.basename(path)
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+        return sha.hexdigest()
+
+
+def decode_image(path, max_side=448):
+    """Open, force RGB (fixes PNG/RGBA errors) and downscale. Runs in a worker process."""
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        img.thumbnail((max_side, max_side))
+        return img
+
+
+class VisualPipeline:
+    """Turns image sources into normalized CLIP vectors, stage by stage, per micro-batch."""
+
+    def __init__(self, image_model, cache_dir, fetch_workers=8, decode_workers=None, encode_batch_size=32, max_side=448):
+        self.image_model = image_model
+        self.downloader = ImageDownloader(cache_dir, max_workers=fetch_workers)
+        self.decode_workers = decode_workers or max(1, (os.cpu_count() or 2) // 2)
+        self.encode_batch_size = encode_batch_size
+        self.max_side = max_side
+        self.stats = StageStats("fetch", "decode", "encode")
+        self._decode_pool = None
+
+    def _pool(self):
+        if self._decode_pool is None:
+            # spawn: workers never inherit the parent's torch threads or model memory
+            self._decode_pool = ProcessPoolExecutor(
+                max_workers=self.decode_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._decode_pool
+
+    def fetch(self, sources):
+        """{source: local path | None}. URLs are re-downloaded once per run (refresh)."""
+        sources = [s for s in dict.fromkeys(sources) if s]
+        if not sources: return {}
+        start = time.perf_counter()
+        fetched = self.downloader.fetch_many(sources, refresh=True)
+        paths = {s: None for s in sources}
+        for s, p in fetched.items():
+            if isinstance(p, Exception):
+                log.warning("⚠️ Image fetch failed for '%s': %s", s, p)
+            else:
+                paths[s] = p
+        ok = sum(1 for p in paths.values() if p)
+        self.stats.add("fetch", items=ok, failed=len(sources) - ok, seconds=time.perf_counter() - start)
+        return paths
+
+    def encode(self, paths):
+        """{path: vector (np.ndarray) | None} for already fetched images: decode + CLIP."""
+        paths = [p for p in dict.fromkeys(paths) if p]
+        vectors = {p: None for p in paths}
+        if not paths: return vectors
+
+        # Decode + downscale (processes, CPU bound)
+        start = time.perf_counter()
+        futures = [self._pool().submit(decode_image, p, self.max_side) for p in paths]
+        images, decoded = [], []
+        for p, future in zip(paths, futures):
+            try:
+                images.append(future.result())
+                decoded.append(p)
+            except Exception as e:
+                log.warning("⚠️ Image decode failed for '%s': %s", p, e)
+        self.stats.add("decode", items=len(images), failed=len(paths) - len(images), seconds=time.perf_counter() - start)
+
+        # CLIP encode (batched)
+        if images:
+            start = time.perf_counter()
+            encoded = self.image_model.encode(
+                images,
+                batch_size=self.encode_batch_size,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+            )
+            for p, vector in zip(decoded, encoded):
+                vectors[p] = vector
+            self.stats.add("encode", items=len(images), seconds=time.perf_counter() - start)
+        return vectors
+
+    def embed(self, sources):
+        """{source: vector (np.ndarray) | None}. Failures are reported, never raised."""
+        paths = self.fetch(sources)
+        encoded = self.encode(list(paths.values()))
+        return {s: encoded.get(p) if p else None for s, p in paths.items()}
+
+    def close(self):
+        if self._decode_pool is not None:
+            self._decode_pool.shutdown()
+            self._decode_pool = None
@@ -5,6 +5,8 @@ from qdrant_client import models
 from src.config import client, MEMORY_COLLECTION_NAME
 from src.state import AgentState
 import uuid
+from src.runtime.logs import get_logger
+from src.runtime.metrics import span
 # # --- MOCK DATABASE (SIMULATION) ---
 # # In a real production app, this would be a Qdrant 'scroll()' call.
 # USER_PROFILES = {
@@ -29,6 +31,7 @@ import uuid
 # }
 
 COLLECTION_NAME=MEMORY_COLLECTION_NAME
+log = get_logger(__name__)
 
 def get_user_uuid(user_id: str) -> str:
     """
@@ -45,16 +48,17 @@ def load_memory_node(state: AgentState, config: RunnableConfig):
     user_id = configuration.get("user_id", "guest")
     point_id = get_user_uuid(user_id) 
     
-    print(f"📂 [LOADER] Fetching Profile for User: {user_id} (ID: {point_id})")
+    log.info("📂 [LOADER] Fetching Profile for User: %s (ID: %s)", user_id, point_id)
     
     # 2. DIRECT RETRIEVE (Not Search)
     # We ask Qdrant: "Give me the record with ID = X"
-    points = client.retrieve(
-        collection_name=COLLECTION_NAME,
-        ids=[point_id],
-        with_payload=True,
-        with_vectors=False # We don't need the vector numbers, just the text
-    )
+    with span("qdrant.retrieve_profile", "db"):
+        points = client.retrieve(
+            collection_name=COLLECTION_NAME,
+            ids=[point_id],
+            with_payload=True,
+            with_vectors=False # We don't need the vector numbers, just the text
+        )
     
     # 3. Handle Result
     if points:
@@ -70,10 +74,10 @@ def load_memory_node(state: AgentState, config: RunnableConfig):
             f"PREFERENCES: {payload.get('content_preferences', {})}\n"
             f"SUMMARY: {payload.get('summary', '')}"
         )
-        print("   -> ✅ Found existing profile.")
+        log.info("   -> ✅ Found existing profile.")
     else:
         # New User
         context_str = "PERSONA: New User\nSTYLE: Helpful & Clear"
-        print("   -> 🆕 New user created.")
+        log.info("   -> 🆕 New user created.")
 
     return {"user_context": context_str}
\ No newline at end of file
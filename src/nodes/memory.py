@@ -3,14 +3,16 @@ from langchain_core.messages import SystemMessage
 from qdrant_client import models
 from src.state import AgentState
 from src.config import client, MEMORY_COLLECTION_NAME 
-from langchain_google_genai import ChatGoogleGenerativeAI 
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnableConfig
 import uuid
 import os
 from dotenv import load_dotenv
-from src.config import dense_text_model
+from src.config import text_embedder, llm_cache, llm_gateway, build_chat_model, EMBED_TIMEOUT
+from src.runtime.logs import get_logger
+from src.runtime.metrics import span
 load_dotenv()
+log = get_logger(__name__)
 
 
 
@@ -24,19 +26,7 @@ def get_user_uuid(user_id: str) -> str:
 
 
 # --- LLM for Summarization ---
-llm_memory = llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    google_api_key=os.getenv("GOOGLE_API_KEY2"),
-    temperature=0,
-    max_retries=2,
-    # Safety settings to prevent blocking legitimate election queries
-    safety_settings={
-        "HARM_CATEGORY_HARASSMENT": "BLOCK_NONE",
-        "HARM_CATEGORY_HATE_SPEECH": "BLOCK_NONE",
-        "HARM_CATEGORY_SEXUALLY_EXPLICIT": "BLOCK_NONE",
-        "HARM_CATEGORY_DANGEROUS_CONTENT": "BLOCK_NONE",
-    }
-)
+llm_memory = llm = build_chat_model(os.getenv("GOOGLE_API_KEY2"))
 
 MEMORY_PROMPT = """You are an agent which handles ***long term memory*** of the user in Qdrant collection for Misinformation Detection System.
 Your role is to build high-fidelity psychological profile of the user based on their interaction,which can be used to personalized user interactions for misinformation detection.
@@ -103,6 +93,13 @@ memory_prompt = ChatPromptTemplate.from_messages([
     """)
 ])
 
+# Same profile + same interaction -> same update; served from the persistent cache
+memory_chain = llm_cache.wrap(
+    memory_prompt | llm_gateway.guard(llm_memory, kind="memory"),
+    model=llm_memory.model,
+    prompt=memory_prompt,
+)
+
 def memory_update_node(state: AgentState, config: RunnableConfig):
     """
     Node 4: The Scribe (Writes Structured LTM)
@@ -113,15 +110,16 @@ def memory_update_node(state: AgentState, config: RunnableConfig):
     if not user_id: return {}
     point_id = get_user_uuid(user_id)
     
-    print(f"💾 [MEMORY] Analyzing interaction for '{user_id}'...")
+    log.info("💾 [MEMORY] Analyzing interaction for '%s'...", user_id)
 
     # 2. Fetch Existing Profile (So we don't overwrite preferences)
     current_profile_str = "New User"
     try:
-        points = client.retrieve(
-            collection_name="user_profiles",
-            ids=[point_id]
-        )
+        with span("qdrant.retrieve_profile", "db"):
+            points = client.retrieve(
+                collection_name="user_profiles",
+                ids=[point_id]
+            )
         if points:
             # We feed the FULL existing payload so the LLM knows what to keep
             current_profile_str = json.dumps(points[0].payload)
@@ -132,16 +130,14 @@ def memory_update_node(state: AgentState, config: RunnableConfig):
     last_user = state["messages"][-2].content
     last_agent = state["messages"][-1].content
     
-    # Format the prompt
-    chain = memory_prompt | llm_memory
-    
     # 4. Generate & Parse
     try:
-        response = response_msg = chain.invoke({
-            "current_profile": current_profile_str,
-            "last_user_msg": last_user,
-            "last_agent_msg": last_agent
-        })
+        with span("llm.memory", "llm"):
+            response = response_msg = memory_chain.invoke({
+                "current_profile": current_profile_str,
+                "last_user_msg": last_user,
+                "last_agent_msg": last_agent
+            })
         # Clean Markdown if present
         clean_json = response.content.replace("```json", "").replace("```", "").strip()
         new_profile = json.loads(clean_json)
@@ -154,31 +150,33 @@ def memory_update_node(state: AgentState, config: RunnableConfig):
         e5_input = f"passage: {summary_text}"
         
         # 2. Encode
-        vector_list = dense_text_model.encode(e5_input).tolist()
-
-        client.upsert(
-            collection_name=MEMORY_COLLECTION_NAME,
-            points=[
-                models.PointStruct(
-                    id=point_id,
-                    vector={"summary_vector": vector_list},
-                    payload={
-                        "user_id": user_id,
-                        # Overwrite fields with new analysis
-                        "name": new_profile.get("name"),
-                        "location": new_profile.get("location"),
-                        "persona": new_profile.get("persona"),
-                        "interaction_style": new_profile.get("interaction_style"),
-                        "content_preferences": new_profile.get("content_preferences"),
-                        "summary": summary_text,
+        with span(f"encode.{text_embedder.name}", "model"):
+            vector_list = text_embedder(e5_input, timeout=EMBED_TIMEOUT).tolist()
+
+        with span("qdrant.upsert_profile", "db"):
+            client.upsert(
+                collection_name=MEMORY_COLLECTION_NAME,
+                points=[
+                    models.PointStruct(
+                        id=point_id,
+                        vector={"summary_vector": vector_list},
+                        payload={
+                            "user_id": user_id,
+                            # Overwrite fields with new analysis
+                            "name": new_profile.get("name"),
+                            "location": new_profile.get("location"),
+                            "persona": new_profile.get("persona"),
+                            "interaction_style": new_profile.get("interaction_style"),
+                            "content_preferences": new_profile.get("content_preferences"),
+                            "summary": summary_text,
                         
-                    }
-                )
-            ]
-        )
-        print(f"   -> ✅ Profile Updated: {new_profile['persona']} | {new_profile['interaction_style']}")
+                        }
+                    )
+                ]
+            )
+        log.info("   -> ✅ Profile Updated: %s | %s", new_profile["persona"], new_profile["interaction_style"])
         
     except Exception as e:
-        print(f"   -> ❌ Memory Update Failed: {e}")
+        log.error("   -> ❌ Memory Update Failed: %s", e)
 
     return {}
\ No newline at end of file
@@ -1,25 +1,46 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
 from src.state import AgentState
-import json
 from src.tools.qdrant_search import search_hybrid, search_image, search_sparse, search_dense
+from src.runtime.singleflight import SingleFlight, make_key
+from src.config import (
+    build_chat_model,
+    llm_cache,
+    llm_gateway,
+    INDEXED_PAYLOAD_FIELDS,
+    MAX_SEARCH_PLANS,
+    SEARCH_BUDGET_SECONDS,
+    TOOL_DEADLINES,
+)
+from src.runtime.batching import BatcherOverloaded
+from src.runtime.deadline import Deadline
+from src.runtime.logs import get_logger
+from src.runtime.metrics import counter, histogram, span
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from src.tools.search_plan import build_plan_models, optimize_plans
+from langchain_core.messages import AIMessage
 from dotenv import load_dotenv
+import contextvars
 import os
+import re
 load_dotenv()
-# Initialize LLM (Ensure you have OPENAI_API_KEY in .env)
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.5-flash",
-    google_api_key=os.getenv("GOOGLE_API_KEY"),
-    temperature=0,
-    max_retries=2,
-    # Safety settings to prevent blocking legitimate election queries
-    safety_settings={
-        "HARM_CATEGORY_HARASSMENT": "BLOCK_NONE",
-        "HARM_CATEGORY_HATE_SPEECH": "BLOCK_NONE",
-        "HARM_CATEGORY_SEXUALLY_EXPLICIT": "BLOCK_NONE",
-        "HARM_CATEGORY_DANGEROUS_CONTENT": "BLOCK_NONE",
-    }
+log = get_logger(__name__)
+# Initialize LLM (Ensure you have GOOGLE_API_KEY in .env)
+# Every call is routed through the shared gateway (rate limit + breaker + adaptive concurrency)
+llm = build_chat_model(os.getenv("GOOGLE_API_KEY"))
+
+# Identical prompts arriving at the same time (e.g. the same viral claim from
+# many users) share one Gemini call.
+llm_flight = SingleFlight("llm")
+
+# Search plans of one turn run side by side; shared across turns
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="search")
+
+PLANS_PER_TURN = histogram("agent_search_plans", "Search plans per turn (after optimisation)", buckets=(0, 1, 2, 3, 4, 6, 8))
+PLANS_BY_TOOL = counter("agent_search_plans_total", "Search plans executed, by tool")
+DROPPED_BY_TOOL = counter("agent_dropped_evidence_total", "Search plans that missed their deadline, by tool")
+EVIDENCE_CHARS = histogram(
+    "agent_evidence_chars", "Size of the evidence handed to the responder",
+    buckets=(500, 1000, 2500, 5000, 10000, 25000, 50000, 100000),
 )
 
 
@@ -59,7 +80,7 @@ In which each entry would be like:
 {{
     "tool": "search_hybrid" | "search_sparse" | "search_image" | "search_dense",
     "query": "The optimized search string",
-    "filters": {{ "field_name": "value", "field_name_2": ["value1", "value2"] }} or null,
+    "filters": {{ "field_name": ["value"], "field_name_2": ["value1", "value2"] }} or null,
     "purpose": "What is the purpose of this search?"
 }}
 
@@ -123,6 +144,19 @@ QUERY_GEN_PROMPT_TEMPLATE = ChatPromptTemplate.from_messages([
     ("user", "USER CONTEXT: {user_context}\n\nUSER INPUT: {last_message}\n\nIMAGE UPLOADED: {image_path}")
 ])
 
+# Planner output is bound to a Pydantic schema (no more string-cleaning + json.loads)
+SearchPlanList = build_plan_models(INDEXED_PAYLOAD_FIELDS)
+
+# Planner runs at temperature=0, so repeats are answered from the persistent cache
+query_gen_chain = llm_cache.wrap(
+    QUERY_GEN_PROMPT_TEMPLATE | llm_gateway.guard(llm.with_structured_output(SearchPlanList), kind="planner"),
+    model=llm.model,
+    prompt=QUERY_GEN_PROMPT_TEMPLATE,
+    namespace="structured_plans",
+    dump=lambda result: result.model_dump_json(),
+    load=SearchPlanList.model_validate_json,
+)
+
 # --- THE NODE FUNCTION ---
 def query_gen_node(state: AgentState):
     """
@@ -135,31 +169,35 @@ def query_gen_node(state: AgentState):
     # Check if an image path exists in state (passed from UI)
     image_path = state.get("current_image_path", "None") 
     
-    print(f"\n🧠 [GEN_QUERY] Analyzing: '{last_message[:30]}...' | Image: {image_path}")
+    log.info("🧠 [GEN_QUERY] Analyzing: '%s...' | Image: %s", last_message[:30], image_path)
     
     # 2. Invoke Chain
     # We pass the image_path so the LLM knows to trigger 'search_image'
-    chain = QUERY_GEN_PROMPT_TEMPLATE | llm | StrOutputParser()
-    
-    raw_response = chain.invoke({
+    inputs = {
         "last_message": last_message,
         "user_context": user_context,
         "image_path": image_path
-    })
-    
-    # 3. IMPROVEMENT: Robust JSON Parsing
+    }
     try:
-        # Strip markdown code blocks if the LLM adds them
-        clean_json = raw_response.replace("```json", "").replace("```", "").strip()
-        plans = json.loads(clean_json)
-        
-        # Safety check: Ensure it's a list
-        if isinstance(plans, dict): plans = [plans]
-            
-        print(f"   -> Generated {len(plans)} Search Plans.")
-        
-    except json.JSONDecodeError:
-        print("   ❌ JSON Error. Fallback to default hybrid search.")
+        with span("llm.planner", "llm"):
+            structured = llm_flight.do(make_key("query_gen", inputs, text_fields=("last_message",)), query_gen_chain.invoke, inputs)
+        raw_plans = structured.plans if structured else []
+    except Exception as e:
+        log.error("   ❌ Planner Error: %s", e)
+        raw_plans = []
+
+    # 3. Optimise: validate filters, merge duplicates, cap the count
+    plans = optimize_plans(
+        raw_plans,
+        INDEXED_PAYLOAD_FIELDS,
+        max_plans=MAX_SEARCH_PLANS,
+        image_path=image_path,
+    )
+
+    if plans:
+        log.info("   -> Generated %d Search Plans (%d after optimisation).", len(raw_plans), len(plans))
+    else:
+        log.warning("   ❌ No usable plan. Fallback to default hybrid search.")
         plans = [{
             "tool": "search_hybrid", 
             "query": last_message, 
@@ -167,55 +205,84 @@ def query_gen_node(state: AgentState):
             "purpose": "Fallback search"
         }]
     
+    PLANS_PER_TURN.observe(len(plans))
     # 4. Return the correct key 'search_plans'
     return {"search_plans": plans}
 
 
+def run_search_plan(plan, deadline):
+    """Runs ONE plan with its own deadline. Returns the raw hits."""
+    tool = plan.get("tool")
+    query = plan.get("query")
+    filters = plan.get("filters") # Capture the filters!
+
+    # --- IMPROVEMENT: Handle ALL tools defined in prompt ---
+    if tool == "search_image":
+        # Ensure your tool accepts 'filters' argument
+        return search_image(image_source=query, filters=filters, deadline=deadline)
+    elif tool == "search_sparse":
+        return search_sparse(query_text=query, filters=filters, deadline=deadline)
+    elif tool == "search_dense":
+        return search_hybrid(query_text=query, filters=filters, deadline=deadline)
+    else: # Default 'search_hybrid'
+        return search_hybrid(query_text=query, filters=filters, deadline=deadline)
+
+
+def evidence_block(step, tool, purpose, results):
+    """One labelled block of the evidence the responder reads."""
+    return (
+        f"=== STEP {step}: {purpose} ===\n"
+        f"TOOL: {tool}\n"
+        f"RESULTS:\n{results}\n"
+        f"=========================================\n"
+    )
+
+
 def search_execution_node(state: AgentState):
     plans = state.get("search_plans", [])
     combined_results = []
+    dropped = []
+
+    # The whole retrieval stage shares one budget; each tool gets its own slice of it
+    turn_deadline = Deadline(SEARCH_BUDGET_SECONDS)
     
-    print(f"🕵️ Executing {len(plans)} parallel searches...")
+    log.info("🕵️ Executing %d parallel searches (budget %.1fs)...", len(plans), SEARCH_BUDGET_SECONDS)
 
+    futures = []
     for i, plan in enumerate(plans):
         tool = plan.get("tool")
-        query = plan.get("query")
-        filters = plan.get("filters") # Capture the filters!
+        log.info("   [%d] Tool: %s | Filters: %s", i + 1, tool, plan.get("filters"))
+        tool_deadline = turn_deadline.child(TOOL_DEADLINES.get(tool, SEARCH_BUDGET_SECONDS))
+        PLANS_BY_TOOL.inc(tool=tool)
+        # Copy the context so the pool thread's spans land in this turn's trace
+        run = contextvars.copy_context().run
+        futures.append((plan, tool_deadline, _SEARCH_POOL.submit(run, run_search_plan, plan, tool_deadline)))
+
+    for i, (plan, tool_deadline, future) in enumerate(futures):
+        tool = plan.get("tool")
         purpose = plan.get("purpose", "General Search")
         
-        print(f"   [{i+1}] Tool: {tool} | Filters: {filters}")
-        
         results = ""
-        
-        # --- IMPROVEMENT: Handle ALL tools defined in prompt ---
         try:
-            if tool == "search_image":
-                # Ensure your tool accepts 'filters' argument
-                results = search_image(image_source=query, filters=filters)
-                
-            elif tool == "search_sparse":
-                results = search_sparse(query_text=query, filters=filters)
-                
-            elif tool == "search_dense":
-                results = search_hybrid(query_text=query, filters=filters)
-                
-            else: # Default 'search_hybrid'
-                results = search_hybrid(query_text=query, filters=filters)
-                
+            results = future.result(timeout=tool_deadline.remaining())
+        except (TimeoutError, FuturesTimeoutError):
+            # Partial results: keep what finished, tell the responder what is missing
+            log.warning("   ⏱️ [%d] %s missed its %.1fs deadline. Dropped.", i + 1, tool, tool_deadline.seconds)
+            dropped.append(f"STEP {i+1} ({tool}: {purpose}) timed out after {tool_deadline.seconds:.1f}s")
+            DROPPED_BY_TOOL.inc(tool=tool)
+            continue
+        except BatcherOverloaded:
+            raise  # the embedding service is saturated: shed the turn (503) rather than answer without evidence
         except Exception as e:
             results = f"Error executing {tool}: {str(e)}"
 
         # Label the results clearly
-        combined_results.append(
-            f"=== STEP {i+1}: {purpose} ===\n"
-            f"TOOL: {tool}\n"
-            f"RESULTS:\n{results}\n"
-            f"=========================================\n"
-        )
+        combined_results.append(evidence_block(i + 1, tool, purpose, results))
     
     # Join everything
-    final_docs = "\n".join(combined_results)
-    return {"retrieved_docs": final_docs}
+    final_docs = "\n".join(combined_results) or "No evidence found."
+    EVIDENCE_CHARS.observe(len(final_docs))
+    return {"retrieved_docs": final_docs, "dropped_evidence": dropped}
 
     ######################################################################################################
 
@@ -238,6 +305,7 @@ Analyze the User's Query and the Retrieved Evidence to provide a **Verdict**, **
 - **User Query:** {user_query}
 - **User Context:** {user_context}
 - **Evidence:** {retrieved_docs}
+- **Missing Evidence Streams:** {dropped_evidence}
 
 
 
@@ -275,12 +343,37 @@ Analyze the User's Query and the Retrieved Evidence to provide a **Verdict**, **
    - You can ask user about his small details for personalization because we have "persona" field in user_context.
    
     IF YOU DONT GET ANY PROPER EVIDENCE THEN RETURN "UNVERIFIED" DONT HALLUCINATE.
+    IF SOME EVIDENCE STREAMS ARE MISSING (timed out), SAY SO BRIEFLY AND DO NOT TREAT THEIR ABSENCE AS EVIDENCE.
 """
 
 responder_prompt = ChatPromptTemplate.from_messages([
     ("system", RESPONDER_SYSTEM_PROMPT),
     ("user", "Here is the data. Give me the verdict.")
 ])
+responder_chain = responder_prompt | llm_gateway.guard(llm, kind="responder")
+
+
+def degraded_answer(docs, dropped):
+    """
+    Extractive fallback used when the LLM cannot be reached.
+    No reasoning, just the evidence we found and where it came from.
+    """
+    sources = sorted(set(re.findall(r"'source_url': '([^']+)'", docs)))
+    excerpt = docs[:1500] + ("..." if len(docs) > 1500 else "")
+    lines = [
+        "⚪ **UNVERIFIED** — the reasoning model is temporarily unavailable, so no verdict could be produced.",
+        "",
+        "**Evidence retrieved so far:**",
+        excerpt or "No evidence found.",
+    ]
+    if sources:
+        lines += ["", "**Sources:**"] + [f"- {url}" for url in sources]
+    if dropped:
+        lines += ["", f"_Missing evidence streams: {'; '.join(dropped)}_"]
+    lines += ["", "Please try again in a minute for a full analysis."]
+    return AIMessage(content="\n".join(lines))
+
+
 def responder_node(state: AgentState):
     """
     Node 3: The Writer
@@ -290,17 +383,24 @@ def responder_node(state: AgentState):
     user_query = state["messages"][-1].content  # The User's original text
     docs = state.get("retrieved_docs", "No evidence found.")
     context = state.get("user_context", "General User")
+    dropped = state.get("dropped_evidence") or []
     
-    print(f"✍️ [RESPONDER] Synthesizing answer for query: '{user_query[:20]}...'")
+    log.info("✍️ [RESPONDER] Synthesizing answer for query: '%s...'", user_query[:20])
     
     # 2. Run the LLM Chain
-    chain = responder_prompt | llm
-    
-    response_msg = chain.invoke({
+    inputs = {
         "user_query": user_query,    # Pass query explicitly
         "retrieved_docs": docs,      # Pass evidence
-        "user_context": context      # Pass profile
-    })
+        "user_context": context,     # Pass profile
+        "dropped_evidence": "; ".join(dropped) or "None"
+    }
+    try:
+        with span("llm.responder", "llm"):
+            response_msg = llm_flight.do(make_key("responder", inputs, text_fields=("user_query",)), responder_chain.invoke, inputs)
+    except Exception as e:
+        # LLM unavailable (breaker open, rate limited, 429s): answer from the evidence alone
+        log.warning("   ⚠️ Responder degraded: %s", e)
+        response_msg = degraded_answer(docs, dropped)
     
     # 3. Return the Final Answer
     # LangGraph automatically appends this to the message history
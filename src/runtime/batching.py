@@ -0,0 +1,148 @@
+# src/runtime/batching.py
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from src.runtime.metrics import register_collector
+
+
+class BatcherOverloaded(RuntimeError):
+    """The batcher's queue stayed full for longer than the caller was willing to wait."""
+
+
+class MicroBatcher:
+    """
+    Dynamic micro-batching: callers submit single items and get a Future;
+    one worker thread drains the queue into batches of up to `max_batch_size`,
+    waiting at most `max_wait_ms` after the first item for company, and calls
+    `fn(items) -> results` once per batch. One worker also means one model
+    call at a time, instead of N sessions fighting over the same torch threads.
+    """
+
+    def __init__(self, name, fn, max_batch_size=32, max_wait_ms=5, max_queue=1024):
+        self.name = name
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue = max_queue
+        self.items = 0
+        self.batches = 0
+        self.rejected = 0
+        self.max_batch_seen = 0
+        self.peak_queue_depth = 0
+        self.busy_seconds = 0.0
+        self.queue_wait_seconds = 0.0
+        self._start()
+        _BATCHERS[name] = self
+
+    def _start(self):
+        # Also called in forked children: the parent's worker thread does not exist there
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name=f"batcher-{self.name}", daemon=True)
+        self._worker.start()
+
+    def submit(self, item, timeout=None):
+        """
+        Future for fn([item])[0]. When the queue is full, waits up to `timeout`
+        seconds for room (None: not at all) and then raises BatcherOverloaded.
+        """
+        future = Future()
+        entry = (item, future, time.perf_counter())
+        try:
+            if timeout is None:
+                self._queue.put_nowait(entry)
+            else:
+                self._queue.put(entry, timeout=max(0.0, timeout))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            raise BatcherOverloaded(f"{self.name}: {self._queue.maxsize} requests already queued")
+        with self._lock:
+            self.peak_queue_depth = max(self.peak_queue_depth, self._queue.qsize())
+        return future
+
+    def __call__(self, item, timeout=None):
+        """Synchronous convenience: submit and wait, `timeout` bounding both."""
+        started = time.perf_counter()
+        future = self.submit(item, timeout)
+        remaining = None if timeout is None else max(0.0, timeout - (time.perf_counter() - started))
+        return wait_result(future, remaining)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        closes_at = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = closes_at - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            live = [(item, future, queued) for item, future, queued in batch if future.set_running_or_notify_cancel()]
+            if not live: continue
+            try:
+                results = self.fn([item for item, _, _ in live])
+                for (_, future, _), result in zip(live, results):
+                    future.set_result(result)
+            except BaseException as e:
+                for _, future, _ in live:
+                    if not future.done():
+                        future.set_exception(e)
+            finished = time.perf_counter()
+            with self._lock:
+                self.batches += 1
+                self.items += len(live)
+                self.max_batch_seen = max(self.max_batch_seen, len(live))
+                self.busy_seconds += finished - started
+                self.queue_wait_seconds += sum(started - queued for _, _, queued in live)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "items": self.items,
+                "batches": self.batches,
+                "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+                "max_batch_size": self.max_batch_seen,
+                "queue_depth": self._queue.qsize(),
+                "peak_queue_depth": self.peak_queue_depth,
+                "rejected": self.rejected,
+                "mean_queue_wait_ms": round(1000 * self.queue_wait_seconds / self.items, 2) if self.items else 0.0,
+                "busy_seconds": round(self.busy_seconds, 3),
+            }
+
+
+def wait_result(future, timeout=None):
+    """future.result(timeout); a caller that gives up also takes its item out of the next batch."""
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeout:
+        future.cancel()
+        raise
+
+
+_BATCHERS = {}
+
+
+def batcher_metrics():
+    """Metrics of every MicroBatcher in the process, by name."""
+    return {name: b.metrics() for name, b in _BATCHERS.items()}
+
+
+register_collector("agent_batcher", batcher_metrics)
+
+
+def _restart_after_fork():
+    for batcher in _BATCHERS.values():
+        batcher._start()
+
+
+os.register_at_fork(after_in_child=_restart_after_fork)
@@ -0,0 +1,112 @@
+# src/runtime/deadline.py
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class Deadline:
+    """A point in time (monotonic clock) that a unit of work must finish by."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def child(self, seconds):
+        """A sub-deadline that never outlives its parent."""
+        return Deadline(min(seconds, self.remaining()))
+
+    def __repr__(self):
+        return f"Deadline(remaining={self.remaining():.2f}s)"
+
+
+class LatencyTracker:
+    """Rolling window of observed latencies, used to pick the hedge delay."""
+
+    def __init__(self, window=200, default_delay=0.5, min_samples=20):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p):
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < self.min_samples:
+            return self.default_delay
+        index = min(len(samples) - 1, int(round(p / 100 * (len(samples) - 1))))
+        return samples[index]
+
+
+# Shared pool for hedged reads; threads that lose the race finish in the background
+_HEDGE_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+
+hedge_stats = {"calls": 0, "hedged": 0, "hedges_skipped": 0, "hedge_wins": 0, "timeouts": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(key):
+    with _stats_lock:
+        hedge_stats[key] += 1
+
+
+def hedged_call(fn, tracker, deadline=None, percentile=95):
+    """
+    Runs an IDEMPOTENT read `fn()`. If it has not answered after the tracker's
+    p95 latency, a duplicate request is fired and whichever finishes first wins,
+    unless the deadline leaves less than a typical (p50) read: that duplicate
+    could not answer in time and would only add load to a slow backend.
+    Raises TimeoutError if `deadline` passes before any attempt answers.
+    """
+    _count("calls")
+
+    def timed():
+        start = time.perf_counter()
+        result = fn()
+        tracker.record(time.perf_counter() - start)
+        return result
+
+    budget = deadline.remaining() if deadline else None
+    primary = _HEDGE_POOL.submit(timed)
+    hedge_delay = tracker.percentile(percentile)
+    if budget is not None:
+        hedge_delay = min(hedge_delay, budget)
+
+    done, _ = wait([primary], timeout=hedge_delay)
+    if done:
+        return primary.result()
+
+    attempts = [primary]
+    if deadline is None or deadline.remaining() >= tracker.percentile(50):
+        _count("hedged")
+        attempts.append(_HEDGE_POOL.submit(timed))
+    else:
+        _count("hedges_skipped")
+
+    pending = set(attempts)
+    while pending:
+        timeout = deadline.remaining() if deadline else None
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            if future.exception() is None:
+                if future is not primary:
+                    _count("hedge_wins")
+                return future.result()
+        if not pending:
+            # Every attempt failed: surface the primary's error
+            return primary.result()
+
+    _count("timeouts")
+    raise TimeoutError(f"no response within {deadline.seconds:.1f}s deadline")
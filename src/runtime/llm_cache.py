@@ -0,0 +1,169 @@
+# src/runtime/llm_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+
+from langchain_core.load import dumps, loads
+from langchain_core.runnables import RunnableLambda
+
+
+def template_hash(prompt):
+    """Hash of the prompt TEMPLATE (not the rendered text), so editing a prompt invalidates its entries."""
+    return hashlib.sha256(prompt.pretty_repr().encode("utf-8")).hexdigest()[:16]
+
+
+class SQLiteLLMCache:
+    """
+    Persistent cache for deterministic (temperature=0) LLM chains.
+    Key = model + prompt-template hash + rendered inputs.
+    Entries expire after `ttl_seconds`; beyond `max_entries` the least
+    recently used rows are evicted.
+    """
+
+    def __init__(self, path, ttl_seconds=7 * 24 * 3600, max_entries=10000, bypass=False):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._connect()
+        _CACHES.add(self)
+
+    def _connect(self):
+        # Also called in forked children: an SQLite connection must not cross a fork
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " model TEXT,"
+            " template_hash TEXT,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model, prompt_hash, inputs):
+        raw = json.dumps([model, prompt_hash, inputs], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at = row
+            if self.ttl_seconds and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return value
+
+    def put(self, key, value, model="", prompt_hash=""):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, prompt_hash, value, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        # 1. TTL: drop everything expired
+        if self.ttl_seconds:
+            cur = self._conn.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            self.evictions += max(cur.rowcount, 0)
+        # 2. Size: drop least recently used rows above the cap
+        if self.max_entries:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            excess = count - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_cache WHERE key IN ("
+                    " SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += excess
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "evictions": self.evictions,
+                "entries": entries,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def wrap(self, chain, *, model, prompt, namespace="", dump=dumps, load=loads):
+        """
+        Returns a drop-in Runnable for `chain` (prompt | llm | ...) that
+        answers from the cache when it can. Pass
+        config={"configurable": {"llm_cache_bypass": True}} to force a live call.
+        `namespace` separates chains that share a prompt but differ in output type.
+        """
+        prompt_hash = template_hash(prompt) + (f":{namespace}" if namespace else "")
+
+        def invoke_cached(inputs, config):
+            configurable = (config or {}).get("configurable", {})
+            if self.bypass or configurable.get("llm_cache_bypass"):
+                with self._lock:
+                    self.bypassed += 1
+                return chain.invoke(inputs, config)
+
+            key = self.make_key(model, prompt_hash, inputs)
+            cached = self.get(key)
+            if cached is not None:
+                return load(cached)
+
+            result = chain.invoke(inputs, config)
+            if result is not None:
+                self.put(key, dump(result), model=model, prompt_hash=prompt_hash)
+            return result
+
+        return RunnableLambda(invoke_cached)
+
+
+_CACHES = weakref.WeakSet()
+
+
+def _reconnect_after_fork():
+    for cache in list(_CACHES):
+        cache._connect()
+
+
+os.register_at_fork(after_in_child=_reconnect_after_fork)
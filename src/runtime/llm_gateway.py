@@ -0,0 +1,275 @@
+# src/runtime/llm_gateway.py
+import threading
+import time
+from collections import deque
+
+from langchain_core.runnables import RunnableLambda
+
+from src.runtime.deadline import LatencyTracker
+
+
+class GatewayUnavailable(Exception):
+    """The gateway refused the call (circuit open or rate limit wait exceeded). Use the fallback path."""
+
+
+def is_overload_error(error):
+    """429 / quota / 503 style errors: the backend wants us to slow down."""
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in (
+        "429", "resource_exhausted", "resourceexhausted", "ratelimit",
+        "rate limit", "quota", "503", "unavailable", "overloaded",
+    ))
+
+
+def _status_code(error):
+    """HTTP status carried by the error (httpx / requests / google-api-core styles), if any."""
+    for holder in (error, getattr(error, "response", None)):
+        for attr in ("status_code", "code"):
+            value = getattr(holder, attr, None)
+            if isinstance(value, int) and 100 <= value < 600:
+                return value
+    return None
+
+
+def is_backend_error(error):
+    """
+    Transport failures, timeouts, 429 and 5xx: the backend (or the way to it) is
+    unhealthy. A parse / validation error on a reply that did arrive is not.
+    """
+    if isinstance(error, ValueError):  # pydantic ValidationError, OutputParserException, JSONDecodeError
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = _status_code(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    text = f"{type(error).__name__} {error}".lower()
+    return is_overload_error(error) or any(marker in text for marker in (
+        "timeout", "timed out", "deadline", "connect", "transport", "remoteprotocol",
+        "500", "502", "504", "internal server error", "bad gateway",
+    ))
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` calls per second on average, bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout):
+        end = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > end:
+                return False
+            time.sleep(wait)
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit driven by observed latency.
+    - Latency near the recent best for that kind of call -> limit grows by ~1 per window.
+    - Latency well above it (queueing upstream) -> limit shrinks by 10%.
+    - Overload error (429/503) -> limit halves.
+    The baseline is the minimum of the last `window` latencies per call kind
+    (planner, responder, ... differ by seconds), so it follows the backend
+    both ways instead of only ever getting faster.
+    """
+
+    def __init__(self, initial=4, min_limit=1, max_limit=16, tolerance=2.0, window=50):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.window = window
+        self.in_flight = 0
+        self._recent = {}
+        self._cond = threading.Condition()
+
+    def baseline(self, kind="default"):
+        """Best latency among the last `window` calls of this kind (None before the first)."""
+        with self._cond:
+            recent = self._recent.get(kind)
+            return min(recent) if recent else None
+
+    def acquire(self, timeout):
+        end = time.monotonic() + timeout
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            self.in_flight += 1
+            return True
+
+    def release(self, latency=None, overloaded=False, kind="default"):
+        with self._cond:
+            self.in_flight -= 1
+            if overloaded:
+                self.limit = max(self.min_limit, self.limit / 2)
+            elif latency is not None:
+                recent = self._recent.setdefault(kind, deque(maxlen=self.window))
+                recent.append(latency)
+                if latency <= min(recent) * self.tolerance:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                else:
+                    self.limit = max(self.min_limit, self.limit * 0.9)
+            self._cond.notify_all()
+
+
+class CircuitBreaker:
+    """
+    closed    -> calls flow; `failure_threshold` consecutive failures open it.
+    open      -> calls rejected for `reset_timeout` seconds.
+    half_open -> one trial call; success closes, failure re-opens.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = "half_open"
+            if self.state == "half_open":
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def release_trial(self):
+        """The allowed call never reached the backend; let another caller try."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class LLMGateway:
+    """
+    Single choke point for every LLM call in the process:
+    token bucket -> circuit breaker -> adaptive concurrency -> model.
+    When the gateway refuses a call it raises GatewayUnavailable so the
+    caller can take its fallback path instead of piling on retries.
+    """
+
+    def __init__(
+        self,
+        rate=5.0,
+        burst=10,
+        initial_concurrency=4,
+        min_concurrency=1,
+        max_concurrency=16,
+        failure_threshold=5,
+        reset_timeout=30,
+        acquire_timeout=10,
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.limiter = AdaptiveLimiter(initial_concurrency, min_concurrency, max_concurrency)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.acquire_timeout = acquire_timeout
+        self.latency = LatencyTracker(default_delay=0.0, min_samples=1)
+        self._lock = threading.Lock()
+        self.counters = {
+            "calls": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "overloaded": 0,
+            "rejected_open": 0,
+            "rejected_rate": 0,
+            "rejected_concurrency": 0,
+        }
+
+    def _count(self, key):
+        with self._lock:
+            self.counters[key] += 1
+
+    def call(self, fn, *args, kind="default", **kwargs):
+        """fn(*args, **kwargs) through the gateway; `kind` keys the latency baseline."""
+        self._count("calls")
+
+        if not self.breaker.allow():
+            self._count("rejected_open")
+            raise GatewayUnavailable("LLM circuit breaker is open")
+        if not self.bucket.acquire(self.acquire_timeout):
+            self._count("rejected_rate")
+            self.breaker.release_trial()
+            raise GatewayUnavailable("LLM rate limit wait exceeded")
+        if not self.limiter.acquire(self.acquire_timeout):
+            self._count("rejected_concurrency")
+            self.breaker.release_trial()
+            raise GatewayUnavailable("LLM concurrency limit wait exceeded")
+
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._count("failed")
+            if not is_backend_error(e):
+                # The backend answered; the reply just did not parse / validate
+                self.limiter.release(latency=time.perf_counter() - start, kind=kind)
+                self.breaker.record_success()
+                raise
+            overloaded = is_overload_error(e)
+            self.limiter.release(overloaded=overloaded, kind=kind)
+            self.breaker.record_failure()
+            if overloaded: self._count("overloaded")
+            raise
+        latency = time.perf_counter() - start
+        self.latency.record(latency)
+        self.limiter.release(latency=latency, kind=kind)
+        self.breaker.record_success()
+        self._count("succeeded")
+        return result
+
+    def guard(self, runnable, kind="default"):
+        """Wraps a Runnable (e.g. an LLM) so every invoke goes through the gateway."""
+        return RunnableLambda(lambda inputs, config: self.call(runnable.invoke, inputs, config, kind=kind))
+
+    def metrics(self):
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            **counters,
+            "breaker_state": self.breaker.state,
+            "breaker_opened": self.breaker.times_opened,
+            "concurrency_limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "latency_p50": round(self.latency.percentile(50), 3),
+            "latency_p95": round(self.latency.percentile(95), 3),
+        }
@@ -0,0 +1,164 @@
+# src/runtime/logs.py
+"""
+Leveled, structured logging for the agent, behind the standard `logging` API.
+
+    log = get_logger(__name__)
+    log.info("🔍 [DENSE] Searching for: '%s'", query)     # lazy: formatted only if emitted
+
+    configure_logging(level="INFO", fmt="json")          # entry points only
+    with log_context(thread_id=..., user_id=...):        # correlation ids for one turn
+        graph.stream(...)
+
+Records are handed to a QueueHandler and written by a background listener
+thread, so a slow terminal or pipe never blocks a search. Below the configured
+level a call costs one `isEnabledFor` check. The correlation ids live in a
+ContextVar, so they follow the turn into LangGraph nodes and into pool
+threads that copy the context.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+ROOT = "agent"
+_CONTEXT = contextvars.ContextVar("log_context", default={})
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_STANDARD = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "context"}
+
+
+def get_logger(name):
+    """Logger under the shared "agent" root: get_logger("src.tools.qdrant_search") -> agent.tools.qdrant_search."""
+    if name.startswith("src."):
+        name = name[len("src."):]
+    return logging.getLogger(f"{ROOT}.{name}")
+
+
+class log_context:
+    """Adds fields (thread_id, user_id, claim_id, ...) to every record logged inside the block."""
+
+    def __init__(self, **fields):
+        self.fields = {k: v for k, v in fields.items() if v is not None}
+
+    def __enter__(self):
+        self._token = _CONTEXT.set({**_CONTEXT.get(), **self.fields})
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            _CONTEXT.reset(self._token)
+        except ValueError:
+            pass  # a generator closed from another context: that context never saw the fields
+        return False
+
+
+def current_context():
+    return dict(_CONTEXT.get())
+
+
+class _ContextFilter(logging.Filter):
+    """Runs in the caller's thread (before the queue), where the context is still visible."""
+
+    def filter(self, record):
+        record.context = _CONTEXT.get()
+        return True
+
+
+class ConsoleFormatter(logging.Formatter):
+    """The message as the nodes always printed it; warnings and errors keep their traceback."""
+
+    def format(self, record):
+        message = record.getMessage()
+        if record.exc_info:
+            message = f"{message}\n{self.formatException(record.exc_info)}"
+        return message
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, correlation fields, extras."""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            **getattr(record, "context", {}),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in _STANDARD and not k.startswith("_")})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is at emit time (rich's Progress swaps it to keep its spinner intact)."""
+
+    def emit(self, record):
+        self.stream = sys.stdout
+        super().emit(record)
+
+
+class _Setup:
+    handler = None
+    listener = None
+    sink = None
+
+
+def _start_listener(fresh_queue=False):
+    if _Setup.handler is None:
+        _Setup.handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        _Setup.handler.addFilter(_ContextFilter())
+    elif fresh_queue:
+        _Setup.handler.queue = queue.SimpleQueue()
+    _Setup.listener = logging.handlers.QueueListener(_Setup.handler.queue, _Setup.sink)
+    _Setup.listener.start()
+
+
+def configure_logging(level=None, fmt=None, stream=None):
+    """
+    Sets up the "agent" logger (idempotent; a second call reconfigures).
+    level: DEBUG | INFO | WARNING | ... (default: LOG_LEVEL, else WARNING)
+    fmt:   console | json             (default: LOG_FORMAT, else console)
+    """
+    level = (level or os.getenv("LOG_LEVEL", "WARNING")).upper()
+    fmt = fmt or os.getenv("LOG_FORMAT", "console")
+    stop_logging()
+
+    _Setup.sink = logging.StreamHandler(stream) if stream else _StdoutHandler()
+    _Setup.sink.setFormatter(JsonFormatter() if fmt == "json" else ConsoleFormatter())
+    _start_listener()
+
+    root = logging.getLogger(ROOT)
+    root.handlers = [_Setup.handler]
+    root.setLevel(level)
+    root.propagate = False
+    return root
+
+
+def stop_logging():
+    """Flushes what is queued (the listener drains the queue before it stops)."""
+    if _Setup.listener is not None:
+        _Setup.listener.stop()
+        _Setup.listener = None
+
+
+def flush_logs():
+    """Blocks until everything logged so far is written (e.g. before printing a banner after it)."""
+    if _Setup.listener is not None:
+        stop_logging()
+        _start_listener()
+
+
+def _restart_after_fork():
+    # The listener thread stays behind in the parent; children get their own
+    if _Setup.listener is not None:
+        _Setup.listener = None
+        _start_listener(fresh_queue=True)
+
+
+atexit.register(stop_logging)
+os.register_at_fork(after_in_child=_restart_after_fork)
@@ -0,0 +1,283 @@
+# src/runtime/metrics.py
+"""
+In-process latency / counter metrics, exported as Prometheus text or JSON.
+
+    with span("qdrant.dense_text", "db"):         # -> agent_span_seconds{span=..., kind=...}
+        ...
+
+    with turn_trace() as trace:                     # everything timed inside this turn,
+        graph.invoke(...)                           # including pool threads that copy the context
+    print(format_trace(trace))
+
+Spans always feed the process-wide histograms; per-turn traces only exist
+while a `turn_trace()` is open, so the cost outside one is a perf_counter
+pair and a dict update.
+"""
+import bisect
+import contextvars
+import functools
+import json
+import threading
+import time
+from collections import deque
+
+# Seconds: 1 ms .. 60 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+RESERVOIR = 2048  # recent observations kept per series for the JSON percentiles
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(pairs, extra=()):
+    pairs = list(pairs) + list(extra)
+    if not pairs: return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _percentile(ordered, q):
+    if not ordered: return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Histogram:
+    """Cumulative buckets for Prometheus plus a bounded reservoir for p50/p95/p99."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    "counts": [0] * (len(self.buckets) + 1),
+                    "sum": 0.0,
+                    "count": 0,
+                    "recent": deque(maxlen=RESERVOIR),
+                }
+            series["counts"][bisect.bisect_left(self.buckets, value)] += 1
+            series["sum"] += value
+            series["count"] += 1
+            series["recent"].append(value)
+
+    def prometheus(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, s in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), s["counts"]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{self.name}_bucket{_format_labels(key, [('le', le)])} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {s['sum']:.6f}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {s['count']}")
+        return lines
+
+    def summary(self):
+        out = []
+        with self._lock:
+            for key, s in sorted(self._series.items()):
+                ordered = sorted(s["recent"])
+                out.append({
+                    "labels": dict(key),
+                    "count": s["count"],
+                    "sum": round(s["sum"], 6),
+                    "mean": round(s["sum"] / s["count"], 6) if s["count"] else 0.0,
+                    "p50": round(_percentile(ordered, 0.50), 6),
+                    "p95": round(_percentile(ordered, 0.95), 6),
+                    "p99": round(_percentile(ordered, 0.99), 6),
+                    "max": round(ordered[-1], 6) if ordered else 0.0,
+                })
+        return out
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def prometheus(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            lines += [f"{self.name}{_format_labels(key)} {value}" for key, value in sorted(self._values.items())]
+        return lines
+
+    def summary(self):
+        with self._lock:
+            return [{"labels": dict(key), "value": value} for key, value in sorted(self._values.items())]
+
+
+_METRICS = {}
+_COLLECTORS = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def _register(cls, name, *args):
+    with _REGISTRY_LOCK:
+        if name not in _METRICS:
+            _METRICS[name] = cls(name, *args)
+        return _METRICS[name]
+
+
+def histogram(name, help, buckets=LATENCY_BUCKETS):
+    """The process-wide histogram called `name` (created on first use)."""
+    return _register(Histogram, name, help, buckets)
+
+
+def counter(name, help):
+    """The process-wide counter called `name` (created on first use)."""
+    return _register(Counter, name, help)
+
+
+def register_collector(prefix, fn):
+    """
+    `fn()` -> {name: {key: number}} or {key: number}, read at export time.
+    Used for components that already keep their own stats (LLM cache,
+    gateway, batchers, singleflight); non-numeric values are skipped.
+    """
+    _COLLECTORS[prefix] = fn
+
+
+def _collected():
+    rows = []
+    for prefix, fn in list(_COLLECTORS.items()):
+        try:
+            values = fn()
+        except Exception:
+            continue
+        nested = values and all(isinstance(v, dict) for v in values.values())
+        for group, stats in (values.items() if nested else [(None, values)]):
+            for key, value in stats.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)): continue
+                labels = (("name", group),) if group is not None else ()
+                rows.append((f"{prefix}_{key}", labels, value))
+    return rows
+
+
+def prometheus_text():
+    """Every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in list(_METRICS.values()):
+        lines += metric.prometheus()
+    typed = set()
+    for name, labels, value in _collected():
+        if name not in typed:
+            lines.append(f"# TYPE {name} untyped")
+            typed.add(name)
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def metrics_json():
+    """JSON-able summary: histogram percentiles, counter values, collector stats."""
+    out = {name: {"type": m.kind, "series": m.summary()} for name, m in list(_METRICS.items())}
+    collected = {}
+    for name, labels, value in _collected():
+        collected.setdefault(name, []).append({"labels": dict(labels), "value": value})
+    out.update({name: {"type": "untyped", "series": series} for name, series in collected.items()})
+    return out
+
+
+def dump_json(path):
+    with open(path, "w") as f:
+        json.dump(metrics_json(), f, indent=2)
+
+
+# ------------------------------------------------------------------ spans
+
+SPANS = histogram("agent_span_seconds", "Wall time of graph nodes and of model / DB / LLM calls")
+_TRACE = contextvars.ContextVar("metrics_trace", default=None)
+
+
+class span:
+    """Context manager / decorator timing one operation into SPANS (and the open turn trace)."""
+
+    __slots__ = ("name", "kind", "_start")
+
+    def __init__(self, name, kind="call"):
+        self.name = name
+        self.kind = kind
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self._start
+        SPANS.observe(elapsed, span=self.name, kind=self.kind)
+        trace = _TRACE.get()
+        if trace is not None:
+            trace.append((self.name, self.kind, self._start, elapsed))
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(self.name, self.kind):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+class turn_trace:
+    """Collects the spans of one turn: [(name, kind, start, seconds), ...] in finishing order."""
+
+    def __enter__(self):
+        self.spans = []
+        self.started = time.perf_counter()
+        self._token = _TRACE.set(self.spans)
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.started
+        _TRACE.reset(self._token)
+        return False
+
+
+def format_trace(trace):
+    """Per-turn breakdown: nodes in order, then every call grouped by name."""
+    nodes = sorted((s for s in trace.spans if s[1] == "node"), key=lambda s: s[2])
+    calls = {}
+    for name, kind, _, seconds in trace.spans:
+        if kind == "node": continue
+        entry = calls.setdefault((kind, name), [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] = max(entry[2], seconds)
+
+    lines = [f"⏱️ Turn: {trace.seconds * 1000:.0f} ms"]
+    for name, _, _, seconds in nodes:
+        share = seconds / trace.seconds if trace.seconds else 0.0
+        lines.append(f"   {name:<18} {seconds * 1000:>8.0f} ms  {'█' * int(share * 30):<30} {share:>4.0%}")
+    if calls:
+        lines.append(f"   {'call':<26} {'n':>3} {'total ms':>9} {'max ms':>8}")
+        for (kind, name), (n, total, worst) in sorted(calls.items(), key=lambda c: -c[1][1]):
+            lines.append(f"   {kind + ':' + name:<26} {n:>3} {total * 1000:>9.0f} {worst * 1000:>8.0f}")
+    return "\n".join(lines)
+
+
+def traced_node(name, fn):
+    """Graph node wrapper: the node's wall time as a `node` span (signature preserved for LangGraph)."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with span(name, "node"):
+            return fn(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,231 @@
+# src/runtime/onnx_encoders.py
+"""
+ONNX Runtime backends for the SentenceTransformer encoders (E5 + CLIP).
+
+The torch model is exported once per model into a cache directory
+(optionally dynamic-int8 quantized) and then served by onnxruntime.
+The wrappers are drop-in for `.encode(...)`; every other attribute
+(tokenizer, max_seq_length, ...) is read from the wrapped torch model.
+"""
+import os
+import re
+import weakref
+
+import numpy as np
+
+ONNX_OPSET = 17
+
+
+def _safe_name(model_name):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+
+
+def _session(path, threads=0):
+    import onnxruntime as ort
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if threads:
+        options.intra_op_num_threads = threads
+    return ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+
+
+def _quantized(fp32_path):
+    """Dynamic int8 (weights quantized offline, activations at run time). Cached next to the fp32 graph."""
+    int8_path = fp32_path.replace(".onnx", ".int8.onnx")
+    if not os.path.exists(int8_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    return int8_path
+
+
+def _export(module, args, path, input_names, output_name, dynamic_axes):
+    import torch
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            module.eval(),
+            args,
+            tmp,
+            input_names=input_names,
+            output_names=[output_name],
+            dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET,
+        )
+    os.replace(tmp, path)
+
+
+def _finish(vectors, normalize, single):
+    if normalize:
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return vectors[0] if single else vectors
+
+
+class _Encoder:
+    def __init__(self, model):
+        self._model = model
+        _ENCODERS.add(self)
+
+    def __getattr__(self, name):
+        # tokenizer, max_seq_length, get_sentence_embedding_dimension, ...
+        return getattr(self._model, name)
+
+
+class OnnxTextEncoder(_Encoder):
+    """Transformer + mean pooling (+ Normalize if the pipeline has it), as in the E5 SentenceTransformer."""
+
+    def __init__(self, model, model_name, cache_dir, quantize=False, threads=0):
+        super().__init__(model)
+        path = os.path.join(cache_dir, _safe_name(model_name), "text.onnx")
+        if not os.path.exists(path):
+            self._export(path)
+        if quantize:
+            path = _quantized(path)
+        self.path = path
+        self.reopen(threads)
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.normalizes = any(type(m).__name__ == "Normalize" for m in model)
+
+    def reopen(self, threads=0):
+        self.session = _session(self.path, threads)
+
+    def _export(self, path):
+        import torch
+
+        class LastHiddenState(torch.nn.Module):
+            def __init__(self, transformer):
+                super().__init__()
+                self.transformer = transformer
+
+            def forward(self, input_ids, attention_mask):
+                return self.transformer(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state
+
+        sample = self._model.tokenizer(["passage: export"], return_tensors="pt")
+        _export(
+            LastHiddenState(self._model[0].auto_model),
+            (sample["input_ids"], sample["attention_mask"]),
+            path,
+            input_names=["input_ids", "attention_mask"],
+            output_name="last_hidden_state",
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+        )
+
+    def encode(self, sentences, batch_size=32, normalize_embeddings=False, **kwargs):
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+        if not sentences: return np.zeros((0, self._model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        outputs = []
+        for start in range(0, len(sentences), batch_size):
+            tokens = self._model.tokenizer(
+                sentences[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self._model.max_seq_length,
+                return_tensors="np",
+            )
+            feed = {name: tokens[name].astype(np.int64) for name in self.input_names}
+            hidden = self.session.run(None, feed)[0]
+            mask = tokens["attention_mask"][..., None].astype(np.float32)
+            outputs.append((hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9))
+        return _finish(np.concatenate(outputs), normalize_embeddings or self.normalizes, single)
+
+
+class OnnxClipEncoder(_Encoder):
+    """CLIP image and text towers (projected features), as in the CLIP SentenceTransformer."""
+
+    def __init__(self, model, model_name, cache_dir, quantize=False, threads=0):
+        super().__init__(model)
+        folder = os.path.join(cache_dir, _safe_name(model_name))
+        paths = {"image": os.path.join(folder, "image.onnx"), "text": os.path.join(folder, "text.onnx")}
+        if not all(os.path.exists(p) for p in paths.values()):
+            self._export(paths)
+        if quantize:
+            paths = {k: _quantized(p) for k, p in paths.items()}
+        self.paths = paths
+        self.reopen(threads)
+
+    def reopen(self, threads=0):
+        self.sessions = {k: _session(p, threads) for k, p in self.paths.items()}
+
+    def _export(self, paths):
+        import torch
+        from PIL import Image
+
+        clip = self._model[0].model
+        processor = self._model[0].processor
+
+        class ImageFeatures(torch.nn.Module):
+            def __init__(self):
+                super().__init__()
+                self.clip = clip
+
+            def forward(self, pixel_values):
+                return self.clip.get_image_features(pixel_values=pixel_values)
+
+        class TextFeatures(torch.nn.Module):
+            def __init__(self):
+                super().__init__()
+                self.clip = clip
+
+            def forward(self, input_ids, attention_mask):
+                return self.clip.get_text_features(input_ids=input_ids, attention_mask=attention_mask)
+
+        pixels = processor(images=[Image.new("RGB", (224, 224))], return_tensors="pt")["pixel_values"]
+        _export(
+            ImageFeatures(), (pixels,), paths["image"],
+            input_names=["pixel_values"], output_name="features",
+            dynamic_axes={"pixel_values": {0: "batch"}, "features": {0: "batch"}},
+        )
+        tokens = processor.tokenizer(["export"], return_tensors="pt")
+        _export(
+            TextFeatures(), (tokens["input_ids"], tokens["attention_mask"]), paths["text"],
+            input_names=["input_ids", "attention_mask"], output_name="features",
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "features": {0: "batch"},
+            },
+        )
+
+    def encode(self, inputs, batch_size=32, normalize_embeddings=False, **kwargs):
+        single = not isinstance(inputs, (list, tuple))
+        inputs = [inputs] if single else list(inputs)
+        processor = self._model[0].processor
+
+        outputs = []
+        for start in range(0, len(inputs), batch_size):
+            batch = inputs[start:start + batch_size]
+            if isinstance(batch[0], str):
+                tokens = processor.tokenizer(batch, padding=True, truncation=True, max_length=77, return_tensors="np")
+                feed = {"input_ids": tokens["input_ids"].astype(np.int64),
+                        "attention_mask": tokens["attention_mask"].astype(np.int64)}
+                outputs.append(self.sessions["text"].run(None, feed)[0])
+            else:
+                pixels = processor(images=batch, return_tensors="np")["pixel_values"].astype(np.float32)
+                outputs.append(self.sessions["image"].run(None, {"pixel_values": pixels})[0])
+        return _finish(np.concatenate(outputs), normalize_embeddings, single)
+
+
+_ENCODERS = weakref.WeakSet()
+
+
+def reopen_sessions(threads=0):
+    """
+    New onnxruntime sessions for every encoder. Required after fork():
+    a session's thread pool lives in the parent only.
+    """
+    for encoder in list(_ENCODERS):
+        encoder.reopen(threads)
+
+
+def onnx_encoder(model, model_name, cache_dir, quantize=False, threads=0):
+    """Wraps a loaded SentenceTransformer in the matching ONNX encoder."""
+    first = type(model[0]).__name__
+    if first == "CLIPModel":
+        return OnnxClipEncoder(model, model_name, cache_dir, quantize=quantize, threads=threads)
+    return OnnxTextEncoder(model, model_name, cache_dir, quantize=quantize, threads=threads)
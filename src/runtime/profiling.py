@@ -0,0 +1,313 @@
+# src/runtime/profiling.py
+"""
+On-demand CPU and memory profiling, written as flamegraph-ready folded stacks.
+
+    with profile_session("sample", memory=True, name="turn-3") as session:
+        graph.invoke(...)
+    session.paths   # turn-3.folded (flamegraph.pl / speedscope / inferno), turn-3.mem.json, turn-3.mem.folded
+
+    sample    wall-clock sampler over every thread (search pool, batchers included)
+    cprofile  deterministic, calling thread only; also writes a .prof for pstats / snakeviz
+    memory    tracemalloc diff over the session, allocations attributed to the
+              model / search / prompt stages by the frames that made them
+
+Nothing is started or hooked unless a session is opened; entry points use
+`maybe_profile(None)`, a do-nothing context manager, when profiling is off.
+"""
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import re
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+from src.runtime.logs import get_logger
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(".cache", "profiles"))
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", 0.005))  # seconds between stack samples
+MEMORY_FRAMES = 32
+KINDS = ("sample", "cprofile")
+log = get_logger(__name__)
+
+# Innermost matching frame wins: a Qdrant call made from a node counts as search
+STAGES = (
+    ("model", ("sentence_transformers", "transformers/", "torch/", "onnxruntime", "fastembed", "tokenizers",
+               "PIL/", "src/runtime/onnx_encoders", "src/runtime/batching", "src/ingestion/visual")),
+    ("search", ("qdrant_client", "grpc", "httpx", "httpcore", "src/tools/qdrant_search", "src/tools/vector_codec")),
+    ("prompt", ("langchain_core/prompts", "langchain_core/messages", "langchain_google_genai",
+                "src/runtime/stub_llm", "src/nodes/")),
+)
+# Threads parked here are idle, not slow
+_IDLE = {
+    ("threading.py", "wait"), ("threading.py", "_wait_for_tstate_lock"), ("queue.py", "get"),
+    ("selectors.py", "select"), ("socket.py", "accept"), ("thread.py", "_worker"),
+}
+_ACTIVE = threading.Lock()
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _short(filename):
+    """src/nodes/researcher.py, qdrant_client/..., threading.py: short but unambiguous."""
+    if filename.startswith(_PROJECT_ROOT + os.sep):
+        return filename[len(_PROJECT_ROOT) + 1:]
+    return re.split(r"(?:site-packages|dist-packages|lib/python\d+\.\d+)/", filename)[-1]
+
+
+def _label(code):
+    return f"{code.co_name} ({_short(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _thread_group(name):
+    return re.sub(r"[_-]?\d+$", "", name) or name  # search_3 -> search
+
+
+class SamplingProfiler:
+    """Samples every thread's stack each `interval` seconds -> {"thread;outer;...;inner": samples}."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL, include_idle=False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _is_idle(self, frame):
+        return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in _IDLE
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me or (not self.include_idle and self._is_idle(frame)): continue
+                stack = []
+                while frame is not None:
+                    stack.append(_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(_thread_group(names.get(ident, "thread")))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self):
+        return self.stacks
+
+
+def pstats_to_folded(stats, scale=1e6):
+    """
+    cProfile keeps caller -> callee edges, not whole stacks: rebuild the paths
+    from the roots, splitting each function's own time over its callers in
+    proportion to their share of its cumulative time. Weights are microseconds.
+    """
+    entries = stats.stats  # func -> (cc, nc, own, cumulative, callers)
+    callees = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    def label(func):
+        filename, line, name = func
+        return f"{name} ({_short(filename)}:{line})".replace(";", ":")
+
+    folded = Counter()
+
+    def walk(func, path, share, depth):
+        _, _, own, cumulative, _ = entries[func]
+        path = path + [label(func)]
+        if own * share * scale >= 1:
+            folded[";".join(path)] += int(own * share * scale)
+        if depth >= 64: return
+        for callee, edge_cumulative in callees.get(func, ()):
+            if callee in entries and label(callee) not in path and entries[callee][3]:
+                walk(callee, path, share * min(1.0, edge_cumulative / entries[callee][3]), depth + 1)
+
+    for func, entry in entries.items():
+        if not entry[4]:  # no callers: a root
+            walk(func, [], 1.0, 0)
+    return folded
+
+
+class TracingProfiler:
+    """cProfile on the calling thread."""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def folded(self):
+        return pstats_to_folded(pstats.Stats(self.profile))
+
+
+def stage_of(traceback):
+    """model | search | prompt | other, from the innermost frame that belongs to a stage."""
+    for frame in reversed(traceback):  # tracemalloc tracebacks: oldest call first
+        filename = frame.filename.replace(os.sep, "/")
+        for stage, markers in STAGES:
+            if any(marker in filename for marker in markers):
+                return stage
+    return "other"
+
+
+class MemoryProfiler:
+    """tracemalloc snapshot before / after: what the session allocated and kept, by stage."""
+
+    def __init__(self, frames=MEMORY_FRAMES, top=15):
+        self.frames = frames
+        self.top = top
+        self._started_tracing = False
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        self._before = self._snapshot()
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+
+    def stop(self):
+        _, self.peak = tracemalloc.get_traced_memory()
+        self._after = self._snapshot()
+        if self._started_tracing:
+            tracemalloc.stop()
+
+    def report(self):
+        stages = {name: {"bytes": 0, "blocks": 0} for name, _ in STAGES}
+        stages["other"] = {"bytes": 0, "blocks": 0}
+        folded, top = Counter(), []
+        for stat in self._after.compare_to(self._before, "traceback"):
+            if stat.size_diff <= 0: continue
+            stage = stage_of(stat.traceback)
+            stages[stage]["bytes"] += stat.size_diff
+            stages[stage]["blocks"] += max(stat.count_diff, 0)
+            frames = [f"{_short(f.filename)}:{f.lineno}".replace(";", ":") for f in stat.traceback]
+            folded[";".join([stage] + frames)] += stat.size_diff
+            top.append((stat.size_diff, stage, frames[-1] if frames else "?"))
+        top.sort(reverse=True)
+        return {
+            "peak_traced_bytes": self.peak,
+            "stages": stages,
+            "top": [{"bytes": size, "stage": stage, "where": where} for size, stage, where in top[:self.top]],
+        }, folded
+
+
+def write_folded(path, stacks):
+    with open(path, "w") as f:
+        for stack, weight in sorted(stacks.items()):
+            if weight > 0:
+                f.write(f"{stack} {weight}\n")
+
+
+class profile_session:
+    """
+    Profiles the enclosed block. kind: "sample" | "cprofile" | None (memory only,
+    or nothing at all). Files land in `directory` as <name>.folded / .prof /
+    .mem.json / .mem.folded; `paths` lists them after the block.
+    """
+
+    def __init__(self, kind="sample", memory=False, name=None, directory=None, interval=SAMPLE_INTERVAL):
+        if kind not in KINDS + (None,):
+            raise ValueError(f"unknown profiler {kind!r} (expected one of {', '.join(KINDS)})")
+        self.kind = kind
+        self.memory = memory
+        self.name = name or time.strftime("profile-%Y%m%d-%H%M%S")
+        self.directory = directory or PROFILE_DIR
+        self.interval = interval
+        self.paths = []
+        self.seconds = 0.0
+
+    def __enter__(self):
+        if not _ACTIVE.acquire(blocking=False):
+            raise RuntimeError("a profile session is already running")
+        self._cpu = None
+        if self.kind == "sample":
+            self._cpu = SamplingProfiler(self.interval)
+        elif self.kind == "cprofile":
+            self._cpu = TracingProfiler()
+        self._memory = MemoryProfiler() if self.memory else None
+        if self._memory: self._memory.start()
+        self._started = time.perf_counter()
+        if self._cpu: self._cpu.start()
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if self._cpu: self._cpu.stop()
+            self.seconds = time.perf_counter() - self._started
+            if self._memory: self._memory.stop()
+            self._write()
+        finally:
+            _ACTIVE.release()
+        return False
+
+    def _write(self):
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, self.name)
+        if self._cpu:
+            write_folded(f"{base}.folded", self._cpu.folded())
+            self.paths.append(f"{base}.folded")
+        if isinstance(self._cpu, TracingProfiler):
+            self._cpu.profile.dump_stats(f"{base}.prof")
+            self.paths.append(f"{base}.prof")
+        if self._memory:
+            report, folded = self._memory.report()
+            report["seconds"] = round(self.seconds, 3)
+            with open(f"{base}.mem.json", "w") as f:
+                json.dump(report, f, indent=2)
+            write_folded(f"{base}.mem.folded", folded)
+            self.paths += [f"{base}.mem.json", f"{base}.mem.folded"]
+
+
+def maybe_profile(kind=None, memory=False, **kwargs):
+    """profile_session when profiling was asked for, else a do-nothing context."""
+    if kind is None and not memory:
+        return contextlib.nullcontext()
+    return profile_session(kind, memory, **kwargs)
+
+
+def install_profile_signal(kind="sample", memory=False, seconds=30.0, prefix="window", signum=signal.SIGUSR1):
+    """
+    `kill -USR1 <pid>` profiles the next `seconds` of a running server (every
+    thread); the files are written when the window closes.
+    """
+    if kind == "cprofile":
+        # cProfile hooks the thread that enables it, here the signal handler's
+        raise ValueError("a profile window needs the 'sample' profiler")
+
+    def stop_later(session):
+        time.sleep(seconds)
+        session.__exit__(None, None, None)
+        log.warning("🔬 Profile written: %s", ", ".join(session.paths))
+
+    def on_signal(signum, frame):
+        session = profile_session(kind, memory, name=f"{prefix}-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}")
+        try:
+            session.__enter__()
+        except RuntimeError:
+            return  # a window is already open
+        threading.Thread(target=stop_later, args=(session,), name="profile-window", daemon=True).start()
+
+    signal.signal(signum, on_signal)
@@ -0,0 +1,136 @@
+# src/runtime/singleflight.py
+import functools
+import inspect
+import json
+import re
+import threading
+
+from src.runtime.metrics import register_collector
+
+
+def normalize_text(value):
+    """
+    Natural-language query text only:
+    '  EVM can be  HACKED ' and 'evm can be hacked' -> same key part.
+    """
+    return re.sub(r"\s+", " ", value).strip().casefold()
+
+
+def normalize_key_part(value, text_fields=()):
+    """
+    Makes a value comparable across callers. Values are kept exact (paths,
+    URLs and filter values are case-sensitive); only strings under a dict key
+    named in `text_fields` are normalized as query text.
+    """
+    if isinstance(value, dict):
+        return {
+            str(k): normalize_text(v) if k in text_fields and isinstance(v, str) else normalize_key_part(v, text_fields)
+            for k, v in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [normalize_key_part(v, text_fields) for v in value]
+    return value
+
+
+def make_key(namespace, *parts, text_fields=()):
+    """Builds a stable string key from a namespace and any JSON-like parts."""
+    normalized = [normalize_key_part(p, text_fields) for p in parts]
+    return namespace + ":" + json.dumps(normalized, sort_keys=True, default=str)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls that share a key into ONE execution.
+    The first caller (the leader) runs the function; everyone arriving while
+    it is in flight waits and receives the same result (or the same error).
+    Results are shared objects, so callers must treat them as read-only.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        _GROUPS[name] = self
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            self.calls += 1
+            call = self._in_flight.get(key)
+            if call is not None:
+                self.coalesced += 1
+                is_leader = False
+            else:
+                call = _Call()
+                self._in_flight[key] = call
+                self.executions += 1
+                is_leader = True
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            call.done.set()
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._in_flight),
+            }
+
+
+# Every group registers itself here so metrics can be read from one place
+_GROUPS = {}
+
+
+def singleflight_metrics():
+    """Returns {group_name: {calls, executions, coalesced, in_flight}}."""
+    return {name: group.metrics() for name, group in _GROUPS.items()}
+
+
+register_collector("agent_singleflight", singleflight_metrics)
+
+
+def coalesced(group, namespace, ignore=(), text_fields=()):
+    """
+    Decorator: routes a function through `group`, keyed on its normalized
+    arguments (positional and keyword calls map to the same key).
+    Arguments named in `ignore` (e.g. a per-caller deadline) are left out of the key;
+    those in `text_fields` (the query text) are matched case- and whitespace-insensitively.
+    """
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {k: v for k, v in bound.arguments.items() if k not in ignore}
+            key = make_key(namespace, arguments, text_fields=text_fields)
+            return group.do(key, fn, *args, **kwargs)
+
+        return wrapper
+    return decorator
@@ -0,0 +1,166 @@
+# src/runtime/stub_llm.py
+"""
+Local stand-in for Gemini: a tiny HTTP server with configurable latency and
+error injection, plus a LangChain chat model that talks to it.
+Run it with:  python -m src.runtime.stub_llm --port 8089 --latency 0.3
+and point the app at it with LLM_BACKEND=stub.
+"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+
+def _strip_fences(text):
+    return text.replace("```json", "").replace("```", "").strip()
+
+
+def canned_reply(messages):
+    """
+    Deterministic answers shaped like what each node expects:
+    planner -> plan JSON, memory writer -> profile JSON, responder -> verdict text.
+    """
+    system = next((m["content"] for m in messages if m["role"] == "system"), "")
+    user = messages[-1]["content"] if messages else ""
+
+    if "information retrieval agent" in system:
+        claim = re.search(r"USER INPUT: (.*?)(\n|$)", user)
+        image = re.search(r"IMAGE UPLOADED: (.*?)(\n|$)", user)
+        plans = [{
+            "tool": "search_hybrid",
+            "query": claim.group(1).strip() if claim else user[:200],
+            "filters": None,
+            "purpose": "Verify the text claim",
+        }]
+        if image and image.group(1).strip() not in ("", "None"):
+            plans.insert(0, {
+                "tool": "search_image",
+                "query": image.group(1).strip(),
+                "filters": None,
+                "purpose": "Identify the object",
+            })
+        return json.dumps({"plans": plans})
+
+    if "long term memory" in system:
+        return json.dumps({
+            "name": "Unknown",
+            "location": "Unknown",
+            "persona": "Citizen",
+            "interaction_style": "Normal",
+            "content_preferences": {"show_twitter": True, "show_urls": True, "show_actions": True},
+            "summary": "Stub profile generated for testing.",
+        })
+
+    return "⚪ **UNVERIFIED** (stub LLM): evidence received and summarised for testing."
+
+
+class StubLLMServer:
+    """
+    Threaded HTTP server on 127.0.0.1 answering POST /v1/chat.
+    - latency:  seconds to sleep before every answer
+    - statuses: status codes returned for the first N requests (e.g. [429, 429])
+    - reply:    callable(messages) -> str, defaults to canned_reply
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, statuses=None, reply=canned_reply):
+        self.latency = latency
+        self.statuses = list(statuses or [])
+        self.reply = reply
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with stub._lock:
+                    stub.requests_served += 1
+                    status = stub.statuses.pop(0) if stub.statuses else 200
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                if status == 200:
+                    payload = {"content": stub.reply(body.get("messages", []))}
+                else:
+                    payload = {"error": {"code": status, "status": "RESOURCE_EXHAUSTED" if status == 429 else "UNAVAILABLE"}}
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/chat"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class StubLLMError(Exception):
+    pass
+
+
+class StubChatModel(BaseChatModel):
+    """LangChain chat model backed by StubLLMServer (drop-in for ChatGoogleGenerativeAI)."""
+
+    url: str
+    model: str = "stub-llm"
+    timeout: float = 60
+
+    @property
+    def _llm_type(self):
+        return "stub"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        role = {"human": "user", "ai": "assistant"}
+        payload = {
+            "model": self.model,
+            "messages": [{"role": role.get(m.type, m.type), "content": m.content} for m in messages],
+        }
+        response = requests.post(self.url, json=payload, timeout=self.timeout)
+        if response.status_code >= 400:
+            raise StubLLMError(f"{response.status_code} {response.text}")
+        message = AIMessage(content=response.json()["content"])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def with_structured_output(self, schema, **kwargs):
+        return self | RunnableLambda(lambda m: schema.model_validate_json(_strip_fences(m.content)))
+
+
+if __name__ == "__main__":
+    import typer
+
+    def main(
+        port: int = typer.Option(8089, help="Port to listen on"),
+        latency: float = typer.Option(0.0, help="Seconds of latency per request"),
+    ):
+        server = StubLLMServer(port=port, latency=latency).start()
+        print(f"🧪 Stub LLM listening on {server.url} (latency {latency}s). Ctrl+C to stop.")
+        try:
+            while True: time.sleep(3600)
+        except KeyboardInterrupt:
+            server.stop()
+
+    typer.run(main)
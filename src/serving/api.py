@@ -0,0 +1,449 @@
+# src/serving/api.py
+"""
+aiohttp front end for the agent graph.
+
+    POST /chat            {"message", "user_id"?, "thread_id"?, "image_path"?}  -> JSON answer
+                          (or multipart/form-data with the same fields + an "image" file)
+    POST /chat/stream     same body, answered as Server-Sent Events (one event per graph node)
+    GET  /ws              WebSocket; every text frame is a /chat body, node events are pushed back
+    POST /upload          multipart "image" -> {"image_path"} to pass to /chat
+    GET  /health          liveness (the process answers)
+    GET  /ready           readiness: 503 while the models warm up or the worker drains
+    GET  /metrics         Prometheus text (spans, counters, cache / gateway / batcher stats)
+    GET  /metrics.json    the same as JSON, with p50/p95/p99 per span
+
+Graph turns are synchronous (LLM + Qdrant clients) and run on a thread pool;
+a TurnLimiter in front of it turns overload into fast 503s instead of a queue
+that grows until every client times out.
+"""
+import asyncio
+import contextlib
+import hashlib
+import io
+import ipaddress
+import json
+import os
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from aiohttp import WSCloseCode, WSMsgType, web
+
+from src.runtime.batching import BatcherOverloaded
+from src.runtime.logs import get_logger
+from src.runtime.metrics import metrics_json, prometheus_text
+from src.serving.session import new_thread_id, stream_turn
+
+log = get_logger(__name__)
+
+# Turns running at once (threads), and how many more may wait for one of them
+TURN_THREADS = int(os.getenv("SERVE_TURN_THREADS", 8))
+MAX_PENDING = int(os.getenv("SERVE_MAX_PENDING", 32))
+QUEUE_TIMEOUT = float(os.getenv("SERVE_QUEUE_TIMEOUT", 10))
+RETRY_AFTER = 2  # seconds, suggested to rejected clients
+UPLOAD_DIR = os.getenv("SERVE_UPLOAD_DIR", os.path.join(".cache", "uploads"))
+MAX_UPLOAD_MB = int(os.getenv("SERVE_MAX_UPLOAD_MB", 10))
+# Hosts whose image URLs the server may download (comma-separated); empty: uploads only
+IMAGE_URL_HOSTS = {h.strip().lower() for h in os.getenv("SERVE_IMAGE_URL_HOSTS", "").split(",") if h.strip()}
+MAX_ID_LENGTH = 128
+
+GRAPH = web.AppKey("graph", object)
+POOL = web.AppKey("pool", ThreadPoolExecutor)
+LIMITER = web.AppKey("limiter", object)
+STATUS = web.AppKey("status", dict)
+SOCKETS = web.AppKey("sockets", weakref.WeakKeyDictionary)  # open WebSocket -> mid-turn?
+WORKER_ID = web.AppKey("worker_id", int)
+
+
+class Overloaded(Exception):
+    """No turn slot and no room (or time) left to wait for one."""
+
+
+class TurnLimiter:
+    """
+    At most `max_active` turns run; up to `max_pending` more wait (for at most
+    `timeout` seconds) for a slot. Anything beyond that is rejected at once.
+    """
+
+    def __init__(self, max_active, max_pending, timeout):
+        self.max_active = max_active
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(max_active)
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def __aenter__(self):
+        if self._slots.locked() and self.waiting >= self.max_pending:
+            self.rejected += 1
+            raise Overloaded(f"{self.active} turns running, {self.waiting} waiting")
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise Overloaded(f"no turn slot within {self.timeout:.0f}s")
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        self.active -= 1
+        self.completed += 1
+        self._slots.release()
+
+    def metrics(self):
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "max_active": self.max_active,
+            "max_pending": self.max_pending,
+        }
+
+
+def _unavailable(reason):
+    return web.HTTPServiceUnavailable(
+        text=json.dumps({"error": reason}),
+        content_type="application/json",
+        headers={"Retry-After": str(RETRY_AFTER)},
+    )
+
+
+def _event(node, update):
+    """JSON-able summary of one node's update."""
+    update = update or {}
+    event = {"node": node}
+    if node == "generate_query":
+        event["search_plans"] = update.get("search_plans") or []
+    elif node == "execute_search":
+        event["dropped_evidence"] = update.get("dropped_evidence") or []
+    elif node == "write_answer":
+        event["answer"] = update["messages"][-1].content
+    return event
+
+
+# ------------------------------------------------------------------ inputs
+
+def _clean_id(value, default):
+    value = str(value or "").strip()
+    if len(value) > MAX_ID_LENGTH:
+        raise web.HTTPBadRequest(text=f"ids are limited to {MAX_ID_LENGTH} characters")
+    return value or default
+
+
+async def _check_url(url):
+    """
+    The server downloads image URLs itself: only allow-listed hosts, and only
+    when they resolve to public addresses (no localhost, cloud metadata, LAN).
+    Redirects are followed by the download, so list only hosts you trust.
+    """
+    parsed = urlsplit(url)
+    host = (parsed.hostname or "").lower()
+    if host not in IMAGE_URL_HOSTS:
+        raise web.HTTPBadRequest(text="image URLs from this host are not accepted; upload the image instead")
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, parsed.port or (443 if parsed.scheme == "https" else 80))
+    except OSError:
+        raise web.HTTPBadRequest(text=f"cannot resolve image host '{host}'")
+    for *_, sockaddr in infos:
+        address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if not address.is_global or address.is_multicast:
+            raise web.HTTPBadRequest(text=f"image host '{host}' resolves to a non-public address")
+    return url
+
+
+async def _check_image_path(image_path):
+    """Remote clients may point at their own uploads or allow-listed URLs, never at arbitrary server files."""
+    if not image_path:
+        return None
+    if image_path.startswith(("http://", "https://")):
+        return await _check_url(image_path)
+    resolved = os.path.realpath(image_path)
+    if os.path.dirname(resolved) != os.path.realpath(UPLOAD_DIR) or not os.path.exists(resolved):
+        raise web.HTTPBadRequest(text="'image_path' must be a path returned by /upload or an allowed URL")
+    return resolved
+
+
+def save_upload(data, filename=""):
+    """Validates and stores an uploaded image under its content hash. Returns the path."""
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img.verify()
+            extension = (img.format or "img").lower()
+    except (UnidentifiedImageError, OSError):
+        raise web.HTTPBadRequest(text=f"'{filename or 'image'}' is not a readable image")
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(UPLOAD_DIR, f"{hashlib.sha256(data).hexdigest()}.{extension}")
+    if not os.path.exists(path):
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    return os.path.realpath(path)
+
+
+async def _read_body(request):
+    """Fields of a JSON or multipart request; a multipart "image" file is saved like /upload."""
+    if request.content_type.startswith("multipart/"):
+        body = {}
+        async for part in await request.multipart():
+            if part.name == "image" and part.filename:
+                body["image_path"] = save_upload(await part.read(), part.filename)
+            elif part.name:
+                body[part.name] = await part.text()
+        return body
+    try:
+        body = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text="Body must be JSON or multipart/form-data")
+    if not isinstance(body, dict):
+        raise web.HTTPBadRequest(text="Body must be a JSON object")
+    return body
+
+
+async def _turn_args(body):
+    message = (body.get("message") or "").strip()
+    if not message:
+        raise web.HTTPBadRequest(text="'message' is required")
+    return {
+        "message": message,
+        "user_id": _clean_id(body.get("user_id"), "guest"),
+        "thread_id": _clean_id(body.get("thread_id"), new_thread_id()),
+        "image_path": await _check_image_path(body.get("image_path")),
+    }
+
+
+# ------------------------------------------------------------------ turns
+
+async def _turn_events(app, args):
+    """
+    Async iterator over a turn's node events. The graph runs in a pool thread
+    and hands events over as they happen. If the client goes away the turn
+    still runs to completion in its thread (it cannot be interrupted), but
+    nothing more is sent.
+    """
+    if app[STATUS]["draining"]:
+        raise Overloaded("shutting down")
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    done = object()
+
+    def produce():
+        try:
+            for node, update in stream_turn(app[GRAPH], **args):
+                loop.call_soon_threadsafe(events.put_nowait, _event(node, update))
+        except BaseException as e:
+            loop.call_soon_threadsafe(events.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(events.put_nowait, done)
+
+    async with app[LIMITER]:
+        worker = loop.run_in_executor(app[POOL], produce)
+        try:
+            while True:
+                item = await events.get()
+                if item is done: break
+                if isinstance(item, BaseException): raise item
+                yield item
+        finally:
+            await asyncio.shield(worker)  # the slot is only free once the thread is
+
+
+async def chat(request):
+    args = await _turn_args(await _read_body(request))
+    started = time.perf_counter()
+    answer, dropped = None, []
+    try:
+        async for event in _turn_events(request.app, args):
+            answer = event.get("answer", answer)
+            dropped = event.get("dropped_evidence", dropped)
+    except (Overloaded, BatcherOverloaded) as e:
+        raise _unavailable(str(e))
+    return web.json_response({
+        "user_id": args["user_id"],
+        "thread_id": args["thread_id"],
+        "answer": answer,
+        "dropped_evidence": dropped,
+        "seconds": round(time.perf_counter() - started, 3),
+    })
+
+
+async def chat_stream(request):
+    args = await _turn_args(await _read_body(request))
+    async with contextlib.aclosing(_turn_events(request.app, args)) as events:
+        try:
+            first = await anext(events, None)  # overload surfaces as a plain 503, before the stream starts
+        except (Overloaded, BatcherOverloaded) as e:
+            raise _unavailable(str(e))
+        return await _stream_events(request, args, first, events)
+
+
+async def _stream_events(request, args, first, events):
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+    await response.prepare(request)
+
+    async def send(name, data):
+        await response.write(f"event: {name}\ndata: {json.dumps(data, default=str)}\n\n".encode())
+
+    await send("session", {"user_id": args["user_id"], "thread_id": args["thread_id"]})
+    try:
+        if first is not None:
+            await send("node", first)
+        async for event in events:
+            await send("node", event)
+        await send("done", {})
+    except ConnectionResetError:
+        raise  # client gone: nothing left to tell it
+    except Exception as e:
+        await send("error", {"error": str(e)})
+    await response.write_eof()
+    return response
+
+
+async def websocket(request):
+    ws = web.WebSocketResponse(heartbeat=30)
+    await ws.prepare(request)
+    sockets = request.app[SOCKETS]
+    sockets[ws] = False
+    # The connection fixes defaults; each frame may still override them
+    defaults = {"user_id": request.query.get("user_id"), "thread_id": request.query.get("thread_id")}
+
+    async for msg in ws:
+        if msg.type != WSMsgType.TEXT: continue
+        try:
+            body = json.loads(msg.data)
+            args = await _turn_args({**defaults, **{k: v for k, v in body.items() if v}})
+        except (ValueError, AttributeError):
+            await ws.send_json({"event": "error", "error": "Frames must be JSON objects"})
+            continue
+        except web.HTTPBadRequest as e:
+            await ws.send_json({"event": "error", "error": e.text})
+            continue
+        defaults.update(user_id=args["user_id"], thread_id=args["thread_id"])
+
+        await ws.send_json({"event": "session", "user_id": args["user_id"], "thread_id": args["thread_id"]})
+        sockets[ws] = True
+        try:
+            async with contextlib.aclosing(_turn_events(request.app, args)) as events:
+                async for event in events:
+                    await ws.send_json({"event": "node", **event}, dumps=lambda d: json.dumps(d, default=str))
+            await ws.send_json({"event": "done"})
+        except (Overloaded, BatcherOverloaded) as e:
+            await ws.send_json({"event": "overloaded", "error": str(e), "retry_after": RETRY_AFTER})
+        except ConnectionResetError:
+            break
+        except Exception as e:
+            await ws.send_json({"event": "error", "error": str(e)})
+        finally:
+            sockets[ws] = False
+        if request.app[STATUS]["draining"]:
+            await ws.close(code=WSCloseCode.GOING_AWAY, message=b"server shutting down")
+    return ws
+
+
+async def upload(request):
+    body = await _read_body(request)
+    if not body.get("image_path"):
+        raise web.HTTPBadRequest(text="Send the image as a multipart 'image' file")
+    return web.json_response({"image_path": body["image_path"]})
+
+
+async def health(request):
+    return web.json_response({"status": "ok", "worker": request.app[WORKER_ID], "pid": os.getpid()})
+
+
+async def ready(request):
+    status = request.app[STATUS]
+    ok = status["warm"] and not status["draining"] and status["error"] is None
+    return web.json_response(
+        {
+            "ready": ok,
+            "worker": request.app[WORKER_ID],
+            "warm": status["warm"],
+            "warm_up_seconds": status["warm_up_seconds"],
+            "warm_up_error": status["error"],
+            "draining": status["draining"],
+            "turns": request.app[LIMITER].metrics(),
+        },
+        status=200 if ok else 503,
+    )
+
+
+async def metrics(request):
+    return web.Response(text=prometheus_text(), headers={
+        "Content-Type": "text/plain; version=0.0.4; charset=utf-8",
+        "X-Worker": str(request.app[WORKER_ID]),  # each pre-forked worker reports its own process
+    })
+
+
+async def metrics_summary(request):
+    return web.json_response({"worker": request.app[WORKER_ID], "metrics": metrics_json()})
+
+
+# ------------------------------------------------------------------ app
+
+def create_app(graph, worker_id=0, warm_up=None):
+    """
+    `warm_up`, if given, runs in the background after startup; /ready stays 503
+    until it finishes. Pre-forked workers pass None: their parent already warmed up.
+    """
+    app = web.Application(client_max_size=MAX_UPLOAD_MB * 1024 * 1024)
+    app[GRAPH] = graph
+    app[POOL] = ThreadPoolExecutor(max_workers=TURN_THREADS, thread_name_prefix="turn")
+    app[LIMITER] = TurnLimiter(TURN_THREADS, MAX_PENDING, QUEUE_TIMEOUT)
+    app[STATUS] = {"warm": warm_up is None, "warm_up_seconds": None, "error": None, "draining": False}
+    app[SOCKETS] = weakref.WeakKeyDictionary()
+    app[WORKER_ID] = worker_id
+
+    app.router.add_post("/chat", chat)
+    app.router.add_post("/chat/stream", chat_stream)
+    app.router.add_get("/ws", websocket)
+    app.router.add_post("/upload", upload)
+    app.router.add_get("/health", health)
+    app.router.add_get("/ready", ready)
+    app.router.add_get("/metrics", metrics)
+    app.router.add_get("/metrics.json", metrics_summary)
+
+    async def start(app):
+        if warm_up is None: return
+
+        async def run_warm_up():
+            started = time.perf_counter()
+            try:
+                await asyncio.get_running_loop().run_in_executor(app[POOL], warm_up)
+                app[STATUS]["warm"] = True
+            except Exception as e:
+                app[STATUS]["error"] = repr(e)
+                log.error("❌ Warm-up failed: %r", e)
+            app[STATUS]["warm_up_seconds"] = round(time.perf_counter() - started, 2)
+
+        app[STATUS]["task"] = asyncio.create_task(run_warm_up())  # keeps a reference until done
+
+    async def drain(app):
+        # No new turns; /ready flips to 503. aiohttp then waits (shutdown_timeout) for
+        # in-flight turns; idle WebSockets are told to reconnect elsewhere now, busy
+        # ones right after their turn.
+        app[STATUS]["draining"] = True
+        for ws, busy in list(app[SOCKETS].items()):
+            if not busy:
+                await ws.close(code=WSCloseCode.GOING_AWAY, message=b"server shutting down")
+
+    async def close_pool(app):
+        app[POOL].shutdown(wait=False)
+
+    app.on_startup.append(start)
+    app.on_shutdown.append(drain)
+    app.on_cleanup.append(close_pool)
+    return app
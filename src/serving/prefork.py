@@ -0,0 +1,157 @@
+# src/serving/prefork.py
+"""
+Pre-fork serving: the parent loads and warms every model ONCE, freezes the
+heap (gc.freeze, so collections in the children do not dirty the shared
+pages) and forks N workers that share those pages copy-on-write.
+Each worker gets its own slice of the cores for torch / onnxruntime.
+"""
+import gc
+import os
+import signal
+import socket
+import time
+
+from src.runtime.logs import get_logger
+
+log = get_logger(__name__)
+
+
+def threads_per_worker(workers, cpus=None):
+    """Cores split evenly between workers (at least one thread each)."""
+    return max(1, (cpus or os.cpu_count() or 1) // max(workers, 1))
+
+
+def warm_up(threads=1):
+    """
+    Runs every model once so lazy initialisation (weights, tokenizers,
+    kernels) is done before the first request. Before a fork torch must stay
+    single-threaded (threads=1): an OpenMP pool must not cross fork().
+    """
+    import torch
+    from PIL import Image
+
+    from src.config import dense_image_model, dense_text_model, sparse_text_model
+
+    torch.set_num_threads(threads)
+    dense_text_model.encode("query: warm up", normalize_embeddings=True)
+    dense_image_model.encode(Image.new("RGB", (224, 224)), normalize_embeddings=True)
+    list(sparse_text_model.embed(["warm up"]))
+
+
+def configure_worker(threads):
+    """Per-worker inference threads (called in the child right after fork)."""
+    import torch
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # already fixed for this process
+    from src.config import EMBEDDING_BACKEND
+    if EMBEDDING_BACKEND != "torch":
+        from src.runtime.onnx_encoders import reopen_sessions
+        reopen_sessions(threads)
+
+
+def bind_socket(host, port, reuse_port, listen=True):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    if listen:
+        sock.listen(1024)
+    sock.setblocking(False)
+    return sock
+
+
+class PreforkServer:
+    """
+    Supervisor for N forked workers. `serve(sock, worker_id)` runs in each
+    child and must block until shutdown. Connections (and with them the
+    sessions) are spread by the kernel: SO_REUSEPORT gives every worker its
+    own accept queue; without it the workers share one listening socket.
+    Crashed workers are respawned; SIGTERM/SIGINT are forwarded to all.
+    """
+
+    def __init__(self, serve, host="0.0.0.0", port=8080, workers=2, threads=None, prepare=warm_up):
+        self.serve = serve
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.threads = threads or threads_per_worker(workers)
+        self.prepare = prepare
+        self.reuse_port = hasattr(socket, "SO_REUSEPORT")
+        self._children = {}
+        self._stopping = False
+
+    def _spawn(self, worker_id, shared_sock):
+        pid = os.fork()
+        if pid:
+            self._children[pid] = worker_id
+            return
+        # --- child ---
+        exit_code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGUSR1, signal.SIG_IGN)  # until the worker installs a profile trigger
+            configure_worker(self.threads)
+            sock = shared_sock or bind_socket(self.host, self.port, reuse_port=True)
+            self.serve(sock, worker_id)
+        except BaseException as e:
+            log.error("❌ [worker %d] %r", worker_id, e)
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    def _forward(self, signum):
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def _stop(self, signum, frame):
+        self._stopping = True
+        self._forward(signal.SIGTERM)
+
+    def run(self):
+        if self.prepare:
+            started = time.perf_counter()
+            self.prepare()
+            print(f"🔥 Models warmed up in {time.perf_counter() - started:.1f}s (pid {os.getpid()})")
+
+        # With SO_REUSEPORT each child binds (and listens on) its own socket; the parent's
+        # only reserves the port: a listening one would get its share of connections, never accepted
+        shared = bind_socket(self.host, self.port, reuse_port=self.reuse_port, listen=not self.reuse_port)
+        shared_for_children = None if self.reuse_port else shared
+
+        gc.collect()
+        gc.freeze()
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        # `kill -USR1 <parent>` opens a profile window in every worker
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self._forward(signum))
+
+        for worker_id in range(self.workers):
+            self._spawn(worker_id, shared_for_children)
+        print(
+            f"🚀 {self.workers} workers x {self.threads} threads on http://{self.host}:{self.port} "
+            f"({'SO_REUSEPORT' if self.reuse_port else 'shared socket'})"
+        )
+
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            worker_id = self._children.pop(pid, None)
+            if worker_id is None: continue
+            if not self._stopping:
+                log.warning("⚠️ Worker %d (pid %d) exited with %s; respawning.", worker_id, pid, status)
+                time.sleep(0.5)
+                self._spawn(worker_id, shared_for_children)
+        shared.close()
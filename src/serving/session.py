@@ -0,0 +1,38 @@
+# src/serving/session.py
+"""One agent turn, shared by every entry point that is not the interactive CLI."""
+import time
+import uuid
+
+from src.runtime.logs import log_context
+
+
+def new_thread_id():
+    return str(uuid.uuid4())
+
+
+def turn_inputs(message, user_id, thread_id, image_path=None):
+    """(payload, config) in the shape cli.py passes to the graph."""
+    config = {"configurable": {"user_id": user_id, "thread_id": thread_id}}
+    payload = {"messages": [("user", message)], "current_image_path": image_path}
+    return payload, config
+
+
+def stream_turn(graph, message, user_id, thread_id, image_path=None):
+    """Yields (node_name, update) as each node of the graph finishes."""
+    payload, config = turn_inputs(message, user_id, thread_id, image_path)
+    with log_context(thread_id=thread_id, user_id=user_id):
+        for event in graph.stream(payload, config=config):
+            for node, update in event.items():
+                yield node, update
+
+
+def run_turn(graph, message, user_id, thread_id, image_path=None):
+    """Runs a whole turn. Returns {"answer", "dropped_evidence", "seconds"}."""
+    started = time.perf_counter()
+    answer, dropped = None, []
+    for node, update in stream_turn(graph, message, user_id, thread_id, image_path):
+        if node == "execute_search":
+            dropped = (update or {}).get("dropped_evidence") or []
+        elif node == "write_answer":
+            answer = update["messages"][-1].content
+    return {"answer": answer, "dropped_evidence": dropped, "seconds": round(time.perf_counter() - started, 3)}
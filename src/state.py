@@ -13,4 +13,5 @@ class AgentState(TypedDict):
     # Workflow Data (Passing data between nodes)
     search_plans: List[dict]      # Output of Query Generator
     retrieved_docs: str    # Output of Search Tool
+    dropped_evidence: List[str]   # Search plans that missed their deadline
     current_image_path: Optional[str] = None
\ No newline at end of file
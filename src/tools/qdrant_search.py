@@ -1,6 +1,7 @@
 
 import os
 import json
+import math
 from qdrant_client import QdrantClient, models
 from sentence_transformers import SentenceTransformer
 from fastembed import SparseTextEmbedding
@@ -10,18 +11,61 @@ from io import BytesIO
 
 from src.config import (
     client, 
-    dense_text_model, 
-    dense_image_model, 
     sparse_text_model,
-    DATA_COLLECTION_NAME
+    text_embedder,
+    image_embedder,
+    DATA_COLLECTION_NAME,
+    SPARSE_MIN_WEIGHT,
+    SPARSE_TOP_K,
 )
+from src.runtime.singleflight import SingleFlight, coalesced
+from src.runtime.batching import wait_result
+from src.runtime.deadline import LatencyTracker, hedged_call
+from src.runtime.logs import get_logger
+from src.runtime.metrics import span
+from src.tools.vector_codec import prune_sparse
 
 
 
 
 # --- CONFIGURATION ---
+log = get_logger(__name__)
 COLLECTION_NAME = DATA_COLLECTION_NAME
 
+# Concurrent identical searches (same normalized query text + exact filters / image + limit)
+# share one embedding + Qdrant round trip.
+search_flight = SingleFlight("retrieval")
+
+# Observed Qdrant latencies; a read still pending after their p95 gets a hedged duplicate
+qdrant_latency = LatencyTracker()
+IMAGE_FETCH_TIMEOUT = 10
+
+
+def embed(embedder, item, deadline=None):
+    """Queued on the shared embedding service; waits no longer than the deadline allows."""
+    timeout = deadline.remaining() if deadline is not None else None
+    with span(f"encode.{embedder.name}", "model"):  # queue wait included: it is what the turn pays
+        future = embedder.submit(item, timeout)  # full queue -> BatcherOverloaded, never an unbounded wait
+        remaining = deadline.remaining() if deadline is not None else None
+        return wait_result(future, remaining).tolist()
+
+
+def query_points(deadline=None, **kwargs):
+    """
+    client.query_points(...) with hedging and an optional Deadline.
+    Reads are idempotent, so a duplicate request is safe.
+    """
+    if deadline is not None:
+        # Ask Qdrant to give up server-side too (whole seconds, rounded up, at least 1):
+        # an attempt abandoned by hedged_call does not keep a pool thread busy past it
+        kwargs.setdefault("timeout", max(1, math.ceil(deadline.remaining())))
+    with span(f"qdrant.{kwargs.get('using', 'query')}", "db"):
+        return hedged_call(
+            lambda: client.query_points(**kwargs).points,
+            qdrant_latency,
+            deadline=deadline,
+        )
+
 # --- 2. HELPER: DYNAMIC FILTER BUILDER ---
 def build_filter(filter_dict):
     """
@@ -51,28 +95,36 @@ def build_filter(filter_dict):
     return models.Filter(must=conditions)
 
 
-def search_sparse(query_text, filters=None, limit=5):
-    print(f"\n🔍 [SPARSE] Searching for: '{query_text}'")
+@coalesced(search_flight, "search_sparse", ignore=("deadline",), text_fields=("query_text",))
+def search_sparse(query_text, filters=None, limit=5, deadline=None):
+    log.info("🔍 [SPARSE] Searching for: '%s'", query_text)
     
-    query_vector = list(sparse_text_model.embed([query_text]))[0]
-
-    hits = client.query_points(
+    with span("encode.sparse_text", "model"):
+        query_vector = list(sparse_text_model.embed([query_text]))[0]
+    # Same pruning as the stored documents (terms pruned there can never match anyway)
+    indices, values = prune_sparse(query_vector.indices, query_vector.values, SPARSE_TOP_K, SPARSE_MIN_WEIGHT)
+    if len(indices) == 0:
+        indices, values = query_vector.indices, query_vector.values
+
+    hits = query_points(
+        deadline,
         collection_name=COLLECTION_NAME,
         query=models.SparseVector(
-            indices=query_vector.indices.tolist(),
-            values=query_vector.values.tolist()
+            indices=indices.tolist(),
+            values=values.tolist()
         ),
         using="sparse_text",    # Specify the vector name here
         query_filter=build_filter(filters),
         limit=limit
-    ).points
+    )
     
     return hits
 
 
 # --- 5. RETRIEVAL FUNCTION 3: IMAGE SEARCH (Visual) ---
-def search_image(image_source, filters=None, limit=5):
-    print(f"\n🔍 [IMAGE] Searching with image input...")
+@coalesced(search_flight, "search_image", ignore=("deadline",))
+def search_image(image_source, filters=None, limit=5, deadline=None):
+    log.info("🔍 [IMAGE] Searching with image input...")
     
     if not image_source: return []
     
@@ -81,12 +133,17 @@ def search_image(image_source, filters=None, limit=5):
         
         # FIX 1: Check for both http and https
         if image_source.startswith(("http://", "https://")):
-            response = requests.get(image_source, stream=True, timeout=10)
-            
-            # FIX 2: Raise error if status is 404/500
-            response.raise_for_status() 
+            timeout = IMAGE_FETCH_TIMEOUT
+            if deadline is not None:
+                timeout = min(timeout, max(deadline.remaining(), 0.1))
+            with span("fetch.image", "io"):
+                response = requests.get(image_source, stream=True, timeout=timeout)
+                
+                # FIX 2: Raise error if status is 404/500
+                response.raise_for_status() 
+                content = response.content
             
-            img = Image.open(BytesIO(response.content))
+            img = Image.open(BytesIO(content))
         
         elif os.path.exists(image_source):
             img = Image.open(image_source)
@@ -98,78 +155,79 @@ def search_image(image_source, filters=None, limit=5):
    
 
         # 2. Vectorize Image (CLIP)
-        image_vector = dense_image_model.encode(img, normalize_embeddings=True).tolist()
+        image_vector = embed(image_embedder, img, deadline)
 
         # 3. Search "dense_image" vector space
-        hits = client.query_points(
+        hits = query_points(
+            deadline,
             collection_name=COLLECTION_NAME,
             query=image_vector,
             using="dense_image",    # Specify the vector name here
             query_filter=build_filter(filters),
             limit=limit
-        ).points
+        )
 
         return hits
 
+    except TimeoutError:
+        # Let the executor report this stream as dropped instead of "no match"
+        raise
+    except requests.Timeout as e:
+        raise TimeoutError(f"image fetch timed out: {e}")
     except Exception as e:
-        print(f"❌ Image Search Failed: {e}")
+        log.error("❌ Image Search Failed: %s", e)
         return []
 
 
 # --- 6. RETRIEVAL FUNCTION 4: HYBRID SEARCH (RRF Fusion) ---
-def search_hybrid(query_text, filters=None, limit=5):
-    print(f"\n🔍 [HYBRID] Searching for: '{query_text}'")
+@coalesced(search_flight, "search_hybrid", ignore=("deadline",), text_fields=("query_text",))
+def search_hybrid(query_text, filters=None, limit=5, deadline=None):
+    log.info("🔍 [HYBRID] Searching for: '%s'", query_text)
     
     # RRF (Reciprocal Rank Fusion) is the industry standard for 
     # combining Dense (Semantic) + Sparse (Keyword) results.
     
     # 1. Get Results from both worlds
-    dense_hits = search_dense(query_text, filters, limit=limit*2)
-    sparse_hits = search_sparse(query_text, filters, limit=limit*2)
+    dense_hits = search_dense(query_text, filters, limit=limit*2, deadline=deadline)
+    sparse_hits = search_sparse(query_text, filters, limit=limit*2, deadline=deadline)
     
     # 2. Fuse Scores (RRF Algorithm)
-    # Score = 1 / (rank + k)
-    rank_k = 60
+    return rrf_fuse([dense_hits, sparse_hits], limit)
+
+
+def rrf_fuse(rankings, limit, rank_k=60):
+    """Reciprocal Rank Fusion: score = sum of 1 / (rank + k) over the rankings. Returns the top hits."""
     fused_scores = {}
+    for hits in rankings:
+        for rank, hit in enumerate(hits):
+            if hit.id not in fused_scores: fused_scores[hit.id] = {"hit": hit, "score": 0}
+            fused_scores[hit.id]["score"] += 1 / (rank + rank_k)
     
-    # Process Dense Ranks
-    for rank, hit in enumerate(dense_hits):
-        if hit.id not in fused_scores: fused_scores[hit.id] = {"hit": hit, "score": 0}
-        fused_scores[hit.id]["score"] += 1 / (rank + rank_k)
-        
-    # Process Sparse Ranks
-    for rank, hit in enumerate(sparse_hits):
-        if hit.id not in fused_scores: fused_scores[hit.id] = {"hit": hit, "score": 0}
-        fused_scores[hit.id]["score"] += 1 / (rank + rank_k)
-    
-    # 3. Sort by new fused score
+    # Sort by new fused score, return top N original hit objects
     sorted_results = sorted(
         fused_scores.values(), 
         key=lambda x: x["score"], 
         reverse=True
     )
-    
-    # Return top N original hit objects
     return [item["hit"] for item in sorted_results[:limit]]
 
 # --- 3. RETRIEVAL FUNCTION 1: DENSE SEARCH (Semantic) ---
-def search_dense(query_text, filters=None, limit=5):
-    print(f"\n🔍 [DENSE] Searching for: '{query_text}'")
+@coalesced(search_flight, "search_dense", ignore=("deadline",), text_fields=("query_text",))
+def search_dense(query_text, filters=None, limit=5, deadline=None):
+    log.info("🔍 [DENSE] Searching for: '%s'", query_text)
     
     # 1. Vectorize Query (E5 needs "query: " prefix)
-    query_vector = dense_text_model.encode(
-        f"query: {query_text}", 
-        normalize_embeddings=True
-    ).tolist()
+    query_vector = embed(text_embedder, f"query: {query_text}", deadline)
 
     # 2. Search "dense_text" vector space
-    hits = client.query_points(
+    hits = query_points(
+        deadline,
         collection_name=COLLECTION_NAME,
         query=query_vector,     # Pass the vector list directly
         using="dense_text",     # Specify the vector name here
         query_filter=build_filter(filters),
         limit=limit
-    ).points
+    )
     return hits
 
 
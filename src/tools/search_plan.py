@@ -0,0 +1,139 @@
+# src/tools/search_plan.py
+import re
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, create_model
+
+TOOLS = ("search_hybrid", "search_dense", "search_sparse", "search_image")
+# search_hybrid already fuses dense + sparse, so it subsumes both for the same query
+SUBSUMED_BY_HYBRID = ("search_dense", "search_sparse")
+
+
+def build_plan_models(payload_schema):
+    """
+    Builds the Pydantic models the planner LLM is bound to.
+    Filter fields come straight from the indexed payload schema
+    ({"category": "keyword", "trust_score": "float", ...}), so the LLM
+    cannot invent fields that Qdrant has no index for.
+    """
+    filter_fields = {}
+    for field, kind in payload_schema.items():
+        if kind == "float":
+            filter_fields[field] = (Optional[float], Field(default=None, description=f"Minimum {field}"))
+        else:
+            filter_fields[field] = (Optional[List[str]], Field(default=None, description=f"Allowed {field} values"))
+    PlanFilters = create_model("PlanFilters", **filter_fields)
+
+    class SearchPlan(BaseModel):
+        tool: Literal[TOOLS] = Field(description="Which retrieval tool to call")
+        query: str = Field(description="Optimized search string, or the image path for search_image")
+        filters: Optional[PlanFilters] = Field(default=None, description="Payload filters, ANDed together")
+        purpose: str = Field(default="General Search", description="Why this search is needed")
+
+    class SearchPlanList(BaseModel):
+        plans: List[SearchPlan] = Field(description="Ordered list of searches to run")
+
+    return SearchPlanList
+
+
+def _normalize_query(query):
+    return re.sub(r"\s+", " ", query or "").strip().casefold()
+
+
+def validate_filters(filters, payload_schema):
+    """
+    Keeps only indexed fields with values of the right type.
+    keyword -> list of str (build_filter turns lists into MatchAny)
+    float   -> float (build_filter turns numbers into a >= range)
+    """
+    if not filters: return None
+
+    clean = {}
+    for field, value in filters.items():
+        kind = payload_schema.get(field)
+        if kind is None or value is None or value == [] or value == "":
+            continue
+        if kind == "float":
+            if isinstance(value, bool): continue
+            try:
+                clean[field] = float(value)
+            except (TypeError, ValueError):
+                continue
+        else:
+            values = value if isinstance(value, list) else [value]
+            values = [str(v) for v in values if isinstance(v, (str, int, float)) and str(v).strip()]
+            if values:
+                clean[field] = sorted(set(values))
+    return clean or None
+
+
+def merge_filters(a, b):
+    """
+    Filters for ONE search that returns everything either plan would have.
+    Only constraints present in both survive; lists are unioned and numeric
+    thresholds take the looser (lower) bound.
+    """
+    if not a or not b: return None
+
+    merged = {}
+    for field in a.keys() & b.keys():
+        va, vb = a[field], b[field]
+        if isinstance(va, list) and isinstance(vb, list):
+            merged[field] = sorted(set(va) | set(vb))
+        elif isinstance(va, float) and isinstance(vb, float):
+            merged[field] = min(va, vb)
+    return merged or None
+
+
+def optimize_plans(plans, payload_schema, max_plans=4, image_path=None):
+    """
+    Cleans the planner output before it reaches the search executor:
+    1. Validates tools and filter fields against the indexed payload schema.
+    2. Drops search_image plans when no image was uploaded.
+    3. Merges plans that share tool + query (and dense/sparse into hybrid).
+    4. Caps the number of plans.
+    Returns plain dicts, which is what AgentState.search_plans carries.
+    """
+    has_image = bool(image_path) and image_path != "None"
+    merged = {}
+    order = []
+
+    for plan in plans:
+        if isinstance(plan, BaseModel):
+            plan = plan.model_dump()
+        tool = plan.get("tool") if plan.get("tool") in TOOLS else "search_hybrid"
+        query = (plan.get("query") or "").strip()
+        if not query: continue
+        if tool == "search_image" and not has_image: continue
+
+        candidate = {
+            "tool": tool,
+            "query": query,
+            "filters": validate_filters(plan.get("filters"), payload_schema),
+            "purpose": plan.get("purpose") or "General Search",
+        }
+        key = (tool, _normalize_query(query) if tool != "search_image" else query)
+
+        if key not in merged:
+            merged[key] = candidate
+            order.append(key)
+            continue
+
+        existing = merged[key]
+        existing["filters"] = merge_filters(existing["filters"], candidate["filters"])
+        if candidate["purpose"] not in existing["purpose"]:
+            existing["purpose"] += f"; {candidate['purpose']}"
+
+    # Same query planned with hybrid AND dense/sparse -> one hybrid search
+    for key in list(order):
+        tool, query = key
+        hybrid_key = ("search_hybrid", query)
+        if tool in SUBSUMED_BY_HYBRID and hybrid_key in merged:
+            hybrid = merged[hybrid_key]
+            other = merged.pop(key)
+            order.remove(key)
+            hybrid["filters"] = merge_filters(hybrid["filters"], other["filters"])
+            if other["purpose"] not in hybrid["purpose"]:
+                hybrid["purpose"] += f"; {other['purpose']}"
+
+    return [merged[key] for key in order][:max_plans]
@@ -0,0 +1,26 @@
+# src/tools/vector_codec.py
+"""
+Vector shaping shared by ingestion and search, so documents and queries
+are always encoded the same way.
+"""
+import numpy as np
+
+
+def prune_sparse(indices, values, top_k=0, min_weight=0.0):
+    """
+    Drops low-weight BM25 terms: weights below `min_weight`, then all but the
+    `top_k` heaviest. 0 disables either rule. Index order is preserved.
+    """
+    indices = np.asarray(indices)
+    values = np.asarray(values)
+    keep = np.ones(len(values), dtype=bool)
+    if min_weight:
+        keep &= values >= min_weight
+    if top_k and keep.sum() > top_k:
+        candidates = np.flatnonzero(keep)
+        heaviest = candidates[np.argsort(-values[candidates], kind="stable")[:top_k]]
+        keep = np.zeros(len(values), dtype=bool)
+        keep[heaviest] = True
+    if keep.all():
+        return indices, values
+    return indices[keep], values[keep]
@@ -0,0 +1,74 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+import numpy as np
+from qdrant_client import QdrantClient, models
+from src.ingestion.aliases import (
+    ReindexVerificationError,
+    gc_versions,
+    list_versions,
+    resolve_alias,
+    swap_alias,
+    verify_collection,
+    versioned_name,
+)
+
+ALIAS = "Test_Collection"
+
+
+def build_version(client, version, n_points):
+    name = versioned_name(ALIAS, version)
+    client.create_collection(
+        collection_name=name,
+        vectors_config={"dense_text": models.VectorParams(size=8, distance=models.Distance.COSINE)},
+    )
+    vectors = np.random.default_rng(version).normal(size=(n_points, 8))
+    client.upsert(
+        collection_name=name,
+        points=[models.PointStruct(id=i, vector={"dense_text": v.tolist()}) for i, v in enumerate(vectors)],
+    )
+    return name
+
+
+def test_verify_swap_and_gc():
+    print("\n🧪 TEST 1: Verified versions are swapped in, old ones collected")
+    print("-" * 40)
+
+    client = QdrantClient(":memory:")
+    names = [build_version(client, v, 30) for v in (1, 2, 3)]
+    for name in names:
+        report = verify_collection(client, name, expected_points=30)
+        swap_alias(client, ALIAS, name)
+    print(f"Last report: {report} | live: {resolve_alias(client, ALIAS)}")
+
+    dropped = gc_versions(client, ALIAS, keep=2)
+    print(f"Dropped: {dropped} | remaining: {list_versions(client, ALIAS)}")
+    assert resolve_alias(client, ALIAS) == names[-1]
+    assert dropped == [names[0]] and list_versions(client, ALIAS) == names[1:]
+    assert client.count(collection_name=ALIAS).count == 30, "Search through the alias must hit the live version"
+    print("✅ SUCCESS")
+
+
+def test_count_mismatch_blocks_swap():
+    print("\n🧪 TEST 2: A short collection never goes live")
+    print("-" * 40)
+
+    client = QdrantClient(":memory:")
+    name = build_version(client, 1, 10)
+    try:
+        verify_collection(client, name, expected_points=12)
+        print("❌ FAILURE: verification passed on a short collection.")
+    except ReindexVerificationError as e:
+        print(f"✅ SUCCESS: {e}")
+    assert resolve_alias(client, ALIAS) is None
+
+
+if __name__ == "__main__":
+    test_verify_swap_and_gc()
+    test_count_mismatch_blocks_swap()
@@ -0,0 +1,192 @@
+import sys
+import os
+import asyncio
+import io
+import tempfile
+import threading
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+os.environ["SERVE_UPLOAD_DIR"] = tempfile.mkdtemp()
+os.environ["SERVE_TURN_THREADS"] = "2"
+os.environ["SERVE_MAX_PENDING"] = "1"
+os.environ["SERVE_IMAGE_URL_HOSTS"] = "93.184.216.34,localhost,169.254.169.254"
+
+from aiohttp import FormData
+from aiohttp.test_utils import TestClient, TestServer
+from langchain_core.messages import AIMessage
+from PIL import Image
+from src.runtime.batching import BatcherOverloaded
+from src.serving.api import create_app
+
+
+class FakeGraph:
+    """Same stream() shape as the compiled graph; `gate` holds turns open."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.gate.set()
+        self.calls = []
+
+    def stream(self, payload, config=None):
+        self.calls.append((payload, config))
+        self.gate.wait(5)
+        yield {"load_memory": {"user_context": ""}}
+        yield {"generate_query": {"search_plans": [{"tool": "search_hybrid", "query": "q"}]}}
+        yield {"execute_search": {"retrieved_docs": "...", "dropped_evidence": []}}
+        message = payload["messages"][-1][1]
+        yield {"write_answer": {"messages": [AIMessage(content=f"verdict for: {message}")]}}
+        yield {"memory_writer": None}
+
+
+async def with_client(graph, test, **app_kwargs):
+    client = TestClient(TestServer(create_app(graph, **app_kwargs)))
+    await client.start_server()
+    try:
+        await test(client)
+    finally:
+        await client.close()
+
+
+def test_chat_and_stream():
+    print("\n🧪 TEST 1: /chat answers, /chat/stream emits one SSE event per node")
+    print("-" * 40)
+    graph = FakeGraph()
+
+    async def test(client):
+        r = await client.post("/chat", json={"message": "EVMs are hacked", "user_id": "u1", "thread_id": "t1"})
+        body = await r.json()
+        assert r.status == 200 and body["answer"] == "verdict for: EVMs are hacked", body
+        assert graph.calls[-1][1]["configurable"] == {"user_id": "u1", "thread_id": "t1"}
+
+        r = await client.post("/chat/stream", json={"message": "streamed"})
+        text = await r.text()
+        events = [line[len("event: "):] for line in text.splitlines() if line.startswith("event: ")]
+        print(f"SSE events: {events}")
+        assert events == ["session"] + ["node"] * 5 + ["done"], events
+        assert "verdict for: streamed" in text
+
+        r = await client.post("/chat", json={"message": "x", "image_path": "/etc/passwd"})
+        assert r.status == 400, "server files must not be readable through image_path"
+
+    asyncio.run(with_client(graph, test))
+    print("✅ SUCCESS")
+
+
+def test_upload_and_websocket():
+    print("\n🧪 TEST 2: Image upload feeds the turn; WebSocket streams node events")
+    print("-" * 40)
+    graph = FakeGraph()
+
+    async def test(client):
+        buffer = io.BytesIO()
+        Image.new("RGB", (8, 8), "red").save(buffer, format="PNG")
+        form = FormData()
+        form.add_field("message", "is this seal valid?")
+        form.add_field("image", buffer.getvalue(), filename="seal.png", content_type="image/png")
+        r = await client.post("/chat", data=form)
+        assert r.status == 200, await r.text()
+        image_path = graph.calls[-1][0]["current_image_path"]
+        assert image_path and os.path.exists(image_path), image_path
+
+        bad = FormData()
+        bad.add_field("image", b"not an image", filename="x.png")
+        assert (await client.post("/upload", data=bad)).status == 400
+
+        ws = await client.ws_connect("/ws?user_id=u2")
+        await ws.send_json({"message": "hello"})
+        received = []
+        while not received or received[-1]["event"] != "done":
+            received.append(await ws.receive_json(timeout=5))
+        await ws.close()
+        print(f"WS events: {[e.get('node', e['event']) for e in received]}")
+        assert received[0] == {"event": "session", "user_id": "u2", "thread_id": received[0]["thread_id"]}
+        assert any(e.get("answer") == "verdict for: hello" for e in received)
+
+    asyncio.run(with_client(graph, test))
+    print("✅ SUCCESS")
+
+
+def test_backpressure_and_readiness():
+    print("\n🧪 TEST 3: Beyond 2 running + 1 waiting turns -> 503; /ready waits for warm-up")
+    print("-" * 40)
+    graph = FakeGraph()
+    graph.gate.clear()
+
+    async def test(client):
+        r = await client.get("/ready")
+        assert r.status == 503 and not (await r.json())["warm"], "must not be ready while warming"
+        await asyncio.sleep(0.4)
+        r = await client.get("/ready")
+        assert r.status == 200, await r.text()
+
+        turns = [asyncio.create_task(client.post("/chat", json={"message": f"m{i}"})) for i in range(3)]
+        await asyncio.sleep(0.3)  # 2 running, 1 waiting
+        r = await client.post("/chat", json={"message": "one too many"})
+        print(f"Overflow request: {r.status} Retry-After={r.headers.get('Retry-After')} {await r.text()}")
+        assert r.status == 503 and r.headers.get("Retry-After")
+
+        graph.gate.set()
+        statuses = [resp.status for resp in await asyncio.gather(*turns)]
+        assert statuses == [200, 200, 200], statuses
+        turns_metrics = (await (await client.get("/ready")).json())["turns"]
+        print(f"Limiter: {turns_metrics}")
+        assert turns_metrics["rejected"] == 1 and turns_metrics["completed"] == 3
+
+    asyncio.run(with_client(graph, test, warm_up=lambda: time.sleep(0.2)))
+    print("✅ SUCCESS")
+
+
+class SaturatedGraph(FakeGraph):
+    """The embedding queue is full by the time the turn reaches retrieval."""
+
+    def stream(self, payload, config=None):
+        self.calls.append((payload, config))
+        yield {"load_memory": {"user_context": ""}}
+        raise BatcherOverloaded("dense_text: 1024 requests already queued")
+
+
+def test_image_urls_and_embedding_overload():
+    print("\n🧪 TEST 4: Image URLs only from allowed public hosts; a full embedding queue -> 503")
+    print("-" * 40)
+    graph = FakeGraph()
+
+    async def test(client):
+        for url in [
+            "https://evil.example.org/x.png",                      # not allow-listed
+            "http://localhost:6333/collections",                    # loopback
+            "http://169.254.169.254/latest/meta-data/",             # cloud metadata (link-local)
+        ]:
+            r = await client.post("/chat", json={"message": "x", "image_path": url})
+            print(f"{url} -> {r.status} {await r.text()}")
+            assert r.status == 400, url
+        assert not graph.calls, "a refused URL must never reach the graph"
+
+        r = await client.post("/chat", json={"message": "x", "image_path": "https://93.184.216.34/evm.png"})
+        assert r.status == 200 and graph.calls[-1][0]["current_image_path"] == "https://93.184.216.34/evm.png"
+
+    asyncio.run(with_client(graph, test))
+
+    async def saturated(client):
+        r = await client.post("/chat", json={"message": "EVMs are hacked"})
+        print(f"Saturated embedder: {r.status} Retry-After={r.headers.get('Retry-After')} {await r.text()}")
+        assert r.status == 503 and r.headers.get("Retry-After")
+        async with client.ws_connect("/ws") as ws:
+            await ws.send_json({"message": "EVMs are hacked"})
+            events = [await ws.receive_json() for _ in range(3)]
+        assert [e["event"] for e in events] == ["session", "node", "overloaded"], events
+
+    asyncio.run(with_client(SaturatedGraph(), saturated))
+    print("✅ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_chat_and_stream()
+    test_upload_and_websocket()
+    test_backpressure_and_readiness()
+    test_image_urls_and_embedding_overload()
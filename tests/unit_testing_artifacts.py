@@ -0,0 +1,59 @@
+import sys
+import os
+import shutil
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+import numpy as np
+from src.ingestion.artifacts import EmbeddingArtifacts, VectorArtifactStore, artifact_key
+
+
+def test_dense_round_trip_float16():
+    print("\n🧪 TEST 1: Dense vectors survive a reopen (float16, mmap)")
+    print("-" * 40)
+
+    root = tempfile.mkdtemp()
+    store = VectorArtifactStore(root, "intfloat/multilingual-e5-base", segment_rows=2)
+    vectors = np.random.default_rng(0).normal(size=(5, 768)).astype(np.float32)
+    for i, v in enumerate(vectors):
+        store.put(artifact_key(f"passage: chunk {i}"), v)
+    store.put(artifact_key("passage: chunk 4"), vectors[4])  # already pending: not counted twice
+    assert len(store) == 5, len(store)
+    store.flush()
+    assert len(store) == 5, len(store)
+
+    reopened = VectorArtifactStore(root, "intfloat/multilingual-e5-base")
+    loaded = reopened.get(artifact_key("passage: chunk 3"))
+    drift = float(np.max(np.abs(loaded - vectors[3])))
+    print(f"✅ {len(reopened)} vectors in {len(reopened._segments)} segments | max abs drift {drift:.4f}")
+    assert len(reopened) == 5
+    assert drift < 1e-2
+    shutil.rmtree(root)
+
+
+def test_sparse_csr_and_model_isolation():
+    print("\n🧪 TEST 2: Sparse CSR round trip, stores are per model version")
+    print("-" * 40)
+
+    root = tempfile.mkdtemp()
+    artifacts = EmbeddingArtifacts(root, "e5", "bm25", "clip", "chunker-v1")
+    artifacts.sparse_text.put("k", (np.array([3, 17]), np.array([0.4, 1.2])))
+    artifacts.flush()
+
+    indices, values = EmbeddingArtifacts(root, "e5", "bm25", "clip", "chunker-v1").sparse_text.get("k")
+    print(f"✅ indices={indices.tolist()} values={values.tolist()}")
+    assert indices.tolist() == [3, 17]
+
+    other = EmbeddingArtifacts(root, "e5", "bm25-v2", "clip", "chunker-v1")
+    assert other.sparse_text.get("k") is None, "A new model version must not reuse old vectors"
+    shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    test_dense_round_trip_float16()
+    test_sparse_csr_and_model_isolation()
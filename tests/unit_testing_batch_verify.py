@@ -0,0 +1,145 @@
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+import zlib
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+import numpy as np
+from src.batch.claims import BatchVerifier, normalize_claim, parse_verdict
+
+
+class FakeBackend:
+    """Bag-of-words vectors, canned verdicts; counts calls and peak LLM concurrency."""
+
+    dim = 256
+
+    def __init__(self, crash_after=None):
+        self.embedded = 0
+        self.verdicts = 0
+        self.in_flight = 0
+        self.peak = 0
+        self.crash_after = crash_after
+        self._lock = threading.Lock()
+
+    def embed(self, texts):
+        self.embedded += len(texts)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in normalize_claim(text).split():
+                vectors[i, zlib.crc32(word.encode()) % self.dim] += 1
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+    def retrieve(self, claims, vectors):
+        return [{"evidence": f"evidence for {c['claim']}", "sources": ["https://eci.gov.in"]} for c in claims]
+
+    def verdict(self, claim, evidence):
+        with self._lock:
+            self.verdicts += 1
+            if self.crash_after is not None and self.verdicts > self.crash_after:
+                raise KeyboardInterrupt("simulated crash")
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.01)
+        with self._lock:
+            self.in_flight -= 1
+        label = "🔴 **MISINFORMATION**" if "hacked" in claim else "🟢 **VERIFIED**"
+        return f"{label}\n{evidence}", False
+
+
+def write_claims(path, claims):
+    with open(path, "w", encoding="utf-8") as f:
+        for c in claims:
+            f.write((json.dumps(c) if isinstance(c, dict) else c) + "\n")
+
+
+CLAIMS = [
+    {"id": "a", "claim": "EVMs can be hacked via Bluetooth"},
+    {"id": "b", "claim": "Forwarded: EVMs can be HACKED via bluetooth!!! 😱"},   # exact after normalizing
+    {"id": "c", "claim": "EVMs can be hacked via Bluetooth easily"},             # near duplicate
+    {"id": "d", "claim": "EVMs can be hacked via Bluetooth", "image_path": "seal.jpg"},  # other image: new
+    "",                                                                          # blank line
+    "VVPAT slips are counted in five polling stations",                          # plain-text line
+    {"id": "g", "claim": "fwd: evms can be hacked via bluetooth easily"},         # exact of the near dupe
+]
+
+
+def read_output(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_dedupe_and_order():
+    print("\n🧪 TEST 1: Exact + near duplicates share one verdict; output keeps input order")
+    print("-" * 40)
+    folder = tempfile.mkdtemp()
+    src, out = os.path.join(folder, "claims.jsonl"), os.path.join(folder, "verdicts.jsonl")
+    write_claims(src, CLAIMS)
+
+    backend = FakeBackend()
+    summary = BatchVerifier(backend, chunk_size=3, llm_concurrency=2, near_threshold=0.85).run(src, out)
+    rows = read_output(out)
+    print(f"Summary: { {k: v for k, v in summary.items() if k != 'stages'} }")
+    print(f"Rows: {[(r['id'], r['verdict'], r['duplicate_of'], r.get('match')) for r in rows]}")
+
+    assert [r["line"] for r in rows] == list(range(len(CLAIMS)))
+    assert rows[1]["duplicate_of"] == "a" and rows[1]["match"] == "exact"
+    assert rows[2]["duplicate_of"] == "a" and rows[2]["match"] == "near"
+    assert rows[3]["duplicate_of"] is None, "same text with another image is another claim"
+    assert rows[4]["verdict"] is None and rows[4]["error"] == "empty claim"
+    assert rows[6]["duplicate_of"] == "a", "repeat of a near duplicate resolves to the canonical claim"
+    assert rows[0]["verdict"] == rows[2]["verdict"] == "MISINFORMATION" and rows[5]["verdict"] == "VERIFIED"
+    assert backend.verdicts == summary["unique"] == 3 and backend.peak <= 2
+    assert summary["llm_calls_saved"] == 3
+    print("✅ SUCCESS")
+
+
+def test_resume_after_crash():
+    print("\n🧪 TEST 2: A crash mid-run resumes from the last checkpoint without redoing work")
+    print("-" * 40)
+    folder = tempfile.mkdtemp()
+    src, out = os.path.join(folder, "claims.jsonl"), os.path.join(folder, "verdicts.jsonl")
+    claims = [{"id": str(i), "claim": f"claim number {i} about polling booth {i * 7}"} for i in range(40)]
+    claims += [{"id": "dup", "claim": "Claim number 3 about polling booth 21"}]
+    write_claims(src, claims)
+
+    crashing = FakeBackend(crash_after=25)
+    try:
+        BatchVerifier(crashing, chunk_size=10, llm_concurrency=1, near_threshold=0.99).run(src, out)
+        print("❌ FAILURE: crash was not raised")
+    except KeyboardInterrupt:
+        pass
+    done_before = len(read_output(out))
+    print(f"Rows on disk after the crash: {done_before}")
+
+    backend = FakeBackend()
+    summary = BatchVerifier(backend, chunk_size=10, llm_concurrency=4, near_threshold=0.99).run(src, out)
+    rows = read_output(out)
+    print(f"Resumed run verified {backend.verdicts} claims; summary claims={summary['claims']}")
+    assert [r["line"] for r in rows] == list(range(len(claims))), "no line lost or written twice"
+    assert backend.verdicts == 40 - done_before, "already verified chunks are not redone"
+    assert rows[-1]["duplicate_of"] == "3", "dedupe still works across the resume"
+    assert summary["claims"] == len(claims)
+    print("✅ SUCCESS")
+
+
+def test_parse_verdict():
+    print("\n🧪 TEST 3: Verdict labels")
+    print("-" * 40)
+    assert parse_verdict("⚪ **UNVERIFIED** — nothing found") == "UNVERIFIED"
+    assert parse_verdict("🟡 **MISLEADING/OUT OF CONTEXT**") == "MISLEADING"
+    assert parse_verdict("no label at all") == "UNVERIFIED"
+    print("✅ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_dedupe_and_order()
+    test_resume_after_crash()
+    test_parse_verdict()
@@ -0,0 +1,163 @@
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+from src.runtime.batching import BatcherOverloaded, MicroBatcher
+
+
+def test_concurrent_calls_share_batches():
+    print("\n🧪 TEST 1: 40 concurrent single encodes -> a handful of batched calls")
+    print("-" * 40)
+
+    sizes = []
+
+    def fake_encode(texts):
+        sizes.append(len(texts))
+        time.sleep(0.02)  # model time
+        return [len(t) for t in texts]
+
+    batcher = MicroBatcher("test_text", fake_encode, max_batch_size=16, max_wait_ms=10)
+    texts = [f"query: claim number {i}" for i in range(40)]
+    with ThreadPoolExecutor(max_workers=40) as pool:
+        results = list(pool.map(batcher, texts))
+
+    m = batcher.metrics()
+    print(f"Batch sizes: {sizes} | metrics: {m}")
+    assert results == [len(t) for t in texts], "Every caller must get ITS OWN result"
+    assert m["items"] == 40 and m["batches"] < 40 and max(sizes) <= 16
+    print("✅ SUCCESS")
+
+
+def test_errors_and_backpressure():
+    print("\n🧪 TEST 2: A failing batch fails its futures; a full queue rejects")
+    print("-" * 40)
+
+    def broken(items):
+        raise ValueError("model exploded")
+
+    batcher = MicroBatcher("test_broken", broken, max_wait_ms=1)
+    try:
+        batcher("x", timeout=2)
+        print("❌ FAILURE: error was swallowed")
+    except ValueError as e:
+        print(f"Caller saw: {e}")
+
+    def slow(items):
+        time.sleep(0.3)
+        return items
+
+    tiny = MicroBatcher("test_tiny", slow, max_batch_size=1, max_queue=1)
+    tiny.submit("a")
+    time.sleep(0.05)  # worker picks "a" up
+    tiny.submit("b")  # fills the queue
+    try:
+        tiny.submit("c", timeout=0.01)
+        print("❌ FAILURE: queue overflow accepted")
+    except BatcherOverloaded as e:
+        print(f"✅ SUCCESS: {e} | rejected={tiny.metrics()['rejected']}")
+
+
+def test_full_queue_fails_fast():
+    print("\n🧪 TEST 3: With no timeout a full queue raises at once instead of blocking")
+    print("-" * 40)
+    gate = threading.Event()
+    tiny = MicroBatcher("test_full", lambda items: gate.wait(5) and items, max_batch_size=1, max_queue=1)
+    tiny.submit("a")
+    time.sleep(0.05)  # worker is stuck on "a"
+    tiny.submit("b")  # fills the queue
+    started = time.perf_counter()
+    try:
+        tiny.submit("c")
+        raise AssertionError("queue overflow accepted")
+    except BatcherOverloaded:
+        pass
+    try:
+        tiny("d", timeout=0.1)
+        raise AssertionError("queue overflow accepted")
+    except BatcherOverloaded:
+        pass
+    elapsed = time.perf_counter() - started
+    gate.set()
+    print(f"Rejected in {elapsed * 1000:.0f} ms | rejected={tiny.metrics()['rejected']}")
+    assert elapsed < 1 and tiny.metrics()["rejected"] == 2
+    print("✅ SUCCESS")
+
+
+def test_search_embed_respects_deadline():
+    print("\n🧪 TEST 4: qdrant_search.embed() -> BatcherOverloaded / timeout within the Deadline")
+    print("-" * 40)
+    import numpy as np
+    from src.runtime.deadline import Deadline
+    from src.tools.qdrant_search import embed
+
+    gate = threading.Event()
+    calls = []
+
+    def stuck_model(texts):
+        calls.append(list(texts))
+        gate.wait(5)
+        return [np.zeros(4) for _ in texts]
+
+    embedder = MicroBatcher("test_embed", stuck_model, max_batch_size=1, max_queue=1)
+    embedder.submit("query: a")
+    time.sleep(0.05)  # the model is busy with "a"
+
+    # Room in the queue, but the model will not get to it in time: the caller leaves at the deadline
+    started = time.perf_counter()
+    try:
+        embed(embedder, "query: b", Deadline(0.2))
+        raise AssertionError("embed outlived its deadline")
+    except FutureTimeout:
+        pass
+    waited = time.perf_counter() - started
+    # The queue is now full ("b" is still in it): the next caller is turned away within its deadline
+    started = time.perf_counter()
+    try:
+        embed(embedder, "query: c", Deadline(0.2))
+        raise AssertionError("queue overflow accepted")
+    except BatcherOverloaded:
+        pass
+    rejected = time.perf_counter() - started
+    gate.set()
+    time.sleep(0.1)
+    print(f"Timed out after {waited * 1000:.0f} ms, rejected after {rejected * 1000:.0f} ms | model saw {calls}")
+    assert waited < 0.5 and rejected < 0.5
+    assert calls == [["query: a"]], "the abandoned request must not reach the model"
+    print("✅ SUCCESS")
+
+
+def test_survives_fork():
+    print("\n🧪 TEST 5: A forked worker gets its own batcher thread")
+    print("-" * 40)
+
+    batcher = MicroBatcher("test_fork", lambda items: [i * 2 for i in items], max_wait_ms=1)
+    assert batcher(1, timeout=2) == 2  # worker thread running in the parent
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os._exit(0 if batcher(21, timeout=2) == 42 else 1)
+        except BaseException:
+            os._exit(1)
+    _, status = os.waitpid(pid, 0)
+    if os.waitstatus_to_exitcode(status) == 0:
+        print("✅ SUCCESS: child served its call")
+    else:
+        print("❌ FAILURE: child batcher did not answer")
+
+
+if __name__ == "__main__":
+    test_concurrent_calls_share_batches()
+    test_errors_and_backpressure()
+    test_full_queue_fails_fast()
+    test_search_embed_respects_deadline()
+    test_survives_fork()
@@ -0,0 +1,60 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+import numpy as np
+from src.ingestion.chunking import SemanticSplitter, split_sentences
+
+
+class TopicModel:
+    """Stand-in for E5: one axis per topic, counts every encode call."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, texts, **kwargs):
+        self.calls += 1
+        return np.array([[1.0, 0.0] if "EVM" in t else [0.0, 1.0] for t in texts])
+
+
+def test_breaks_on_topic_shift():
+    print("\n🧪 TEST 1: Splitter breaks where the topic changes")
+    print("-" * 40)
+
+    splitter = SemanticSplitter(TopicModel(), buffer_size=0)
+    chunks = splitter.split("EVM is standalone. EVM has no radio. Voters queue outside. Voters show ID.")
+    print(f"✅ Chunks: {chunks}")
+    assert chunks == ["EVM is standalone. EVM has no radio.", "Voters queue outside. Voters show ID."]
+
+
+def test_many_documents_one_encode():
+    print("\n🧪 TEST 2: A whole batch of documents costs ONE encode call")
+    print("-" * 40)
+
+    model = TopicModel()
+    splitter = SemanticSplitter(model)
+    docs = ["EVM is sealed. Voters wait.", "Single sentence.", "EVM one. EVM two. Voters three."]
+    results = splitter.split_many(docs)
+    print(f"✅ {len(results)} documents split with {model.calls} encode call(s)")
+    assert model.calls == 1
+    assert results[1] == ["Single sentence."]
+
+
+def test_sentence_split_handles_danda():
+    print("\n🧪 TEST 3: Hindi sentence ends (।) are respected")
+    print("-" * 40)
+
+    sentences = split_sentences("ईवीएम सुरक्षित है। वीवीपैट पर्ची गिनी जाती है।")
+    print(f"✅ {sentences}")
+    assert len(sentences) == 2
+
+
+if __name__ == "__main__":
+    test_breaks_on_topic_shift()
+    test_many_documents_one_encode()
+    test_sentence_split_handles_danda()
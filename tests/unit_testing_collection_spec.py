@@ -0,0 +1,103 @@
+import sys
+import os
+import copy
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+from qdrant_client import QdrantClient, models
+from src.ingestion.collection_spec import (
+    DATA_COLLECTION_SPEC,
+    apply_spec,
+    diff_spec,
+    with_dense_storage,
+    with_vector_sizes,
+)
+
+# Payload indexes are a no-op in local Qdrant, so they are left out here
+SPEC = with_vector_sizes({k: v for k, v in DATA_COLLECTION_SPEC.items() if k != "payload_indexes"}, dense_image=512)
+
+
+def test_create_then_no_drift():
+    print("\n🧪 TEST 1: A collection created from the spec shows no vector/sparse drift")
+    print("-" * 40)
+
+    client = QdrantClient(":memory:")
+    apply_spec(client, "spec_test", SPEC)
+    drift = [c for c in diff_spec(client, "spec_test", SPEC) if c[0].startswith(("vectors.", "sparse_vectors."))]
+    print(f"Drift: {drift}")
+    assert not drift
+    print("✅ SUCCESS")
+
+
+def test_immutable_changes_need_reindex():
+    print("\n🧪 TEST 2: Size/distance changes are reported as needing a rebuild")
+    print("-" * 40)
+
+    client = QdrantClient(":memory:")
+    apply_spec(client, "spec_test", SPEC)
+    changed = copy.deepcopy(SPEC)
+    changed["vectors"]["dense_text"]["size"] = 1024
+    changed["vectors"]["dense_text"]["distance"] = "Dot"
+
+    pending = [key for key, _, _, mutable in diff_spec(client, "spec_test", changed) if not mutable]
+    print(f"Needs reindex: {pending}")
+    assert set(pending) == {"vectors.dense_text.size", "vectors.dense_text.distance"}
+    print("✅ SUCCESS")
+
+
+class QuantizationRecordingClient:
+    """Local Qdrant ignores quantization: this keeps track of it and of the updates sent."""
+
+    def __init__(self):
+        self.client = QdrantClient(":memory:")
+        self.quantization = None
+        self.updates = []
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def create_collection(self, **kwargs):
+        self.quantization = kwargs.get("quantization_config")
+        return self.client.create_collection(**kwargs)
+
+    def get_collection(self, collection_name):
+        info = self.client.get_collection(collection_name)
+        info.config.quantization_config = self.quantization
+        return info
+
+    def update_collection(self, collection_name, **kwargs):
+        self.updates.append(kwargs)
+        if "quantization_config" in kwargs:
+            q = kwargs["quantization_config"]
+            self.quantization = None if q == models.Disabled.DISABLED else q
+        return self.client.update_collection(collection_name=collection_name, **kwargs)
+
+
+def test_quantization_is_switched_off_again():
+    print("\n🧪 TEST 3: uint8 -> float32 removes the scalar quantization")
+    print("-" * 40)
+
+    client = QuantizationRecordingClient()
+    apply_spec(client, "spec_test", with_dense_storage(SPEC, "uint8"))
+    assert client.quantization is not None
+
+    float32 = with_dense_storage(SPEC, "float32")
+    drift = [c for c in diff_spec(client, "spec_test", float32) if c[0] == "quantization"]
+    print(f"Drift: {drift}")
+    assert drift and drift[0][3], "quantization must be a mutable change"
+    apply_spec(client, "spec_test", float32)
+    print(f"Update sent: {client.updates[-1].get('quantization_config')}")
+    assert client.updates[-1]["quantization_config"] == models.Disabled.DISABLED
+    assert client.quantization is None
+    assert not [c for c in diff_spec(client, "spec_test", float32) if c[0] == "quantization"]
+    print("✅ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_create_then_no_drift()
+    test_immutable_changes_need_reindex()
+    test_quantization_is_switched_off_again()
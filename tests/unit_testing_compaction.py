@@ -0,0 +1,57 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+import numpy as np
+from src.ingestion.compaction import compaction_report, print_report
+from src.tools.vector_codec import prune_sparse
+
+
+def test_prune_sparse():
+    print("\n🧪 TEST 1: BM25 pruning keeps the heaviest terms in index order")
+    print("-" * 40)
+
+    indices = np.array([5, 9, 12, 40, 77])
+    values = np.array([0.2, 1.5, 0.05, 0.9, 1.1])
+    top = prune_sparse(indices, values, top_k=3)
+    floor = prune_sparse(indices, values, min_weight=0.5)
+    same = prune_sparse(indices, values)
+    print(f"top_k=3 -> {top[0].tolist()} | min_weight=0.5 -> {floor[0].tolist()}")
+    assert top[0].tolist() == [9, 40, 77]
+    assert floor[0].tolist() == [9, 40, 77]
+    assert same[0] is indices, "No pruning configured must be a no-op"
+    print("✅ SUCCESS")
+
+
+def test_report_rows():
+    print("\n🧪 TEST 2: Report covers every variant with sane deltas")
+    print("-" * 40)
+
+    rng = np.random.default_rng(0)
+    dense = rng.normal(size=(400, 64)).astype(np.float32)
+    dense /= np.linalg.norm(dense, axis=1, keepdims=True)
+    sparse = []
+    for _ in range(300):
+        terms = rng.choice(2000, size=40, replace=False)
+        sparse.append((np.sort(terms), rng.gamma(1.0, 1.0, size=40)))
+
+    rows = compaction_report({"dense_text": dense}, sparse, n_points=100000, n_queries=20, k=10,
+                             sparse_options=[(16, 0.0)])
+    print_report(rows)
+    by_variant = {(r["vector"], r["variant"]): r for r in rows}
+    assert by_variant[("dense_text", "float32")]["recall@10"] == 1.0
+    assert by_variant[("dense_text", "float16")]["recall@10"] >= 0.95
+    assert by_variant[("dense_text", "float16")]["disk_delta"] == -0.5
+    pruned = [r for r in rows if r["vector"] == "sparse_text" and "16" in r["variant"]][0]
+    assert pruned["disk_delta"] < 0 and 0 < pruned["recall@10"] <= 1
+    print("✅ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_prune_sparse()
+    test_report_rows()
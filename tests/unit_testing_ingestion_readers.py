@@ -0,0 +1,48 @@
+import sys
+import os
+import json
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+from src.ingestion.readers import iter_batches, iter_json_array, iter_records
+
+SETUP_DIR = os.path.join(parent_dir, "setup")
+
+
+def test_streaming_matches_json_load():
+    print("\n🧪 TEST 1: Streaming JSON array reader matches json.load")
+    print("-" * 40)
+
+    for name in ["clean_EVM.json", "clean_FAQ.json", "metadata.json"]:
+        path = os.path.join(SETUP_DIR, name)
+        with open(path, encoding="utf-8") as f:
+            expected = json.load(f)
+        # Tiny chunks force records to straddle chunk boundaries
+        streamed = list(iter_json_array(path, chunk_size=64))
+        print(f"✅ {name}: {len(streamed)} records")
+        assert streamed == expected
+
+
+def test_jsonl_and_batches():
+    print("\n🧪 TEST 2: JSONL reader + micro-batching")
+    print("-" * 40)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False, encoding="utf-8") as f:
+        for i in range(5):
+            f.write(json.dumps({"payload": {"text_content": f"claim {i}"}}) + "\n\n")
+        path = f.name
+
+    batches = list(iter_batches(iter_records(path), 2))
+    os.remove(path)
+    print(f"✅ Batch sizes: {[len(b) for b in batches]}")
+    assert [len(b) for b in batches] == [2, 2, 1]
+
+
+if __name__ == "__main__":
+    test_streaming_matches_json_load()
+    test_jsonl_and_batches()
@@ -0,0 +1,75 @@
+import sys
+import os
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from src.runtime.llm_cache import SQLiteLLMCache
+
+PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are a planner."),
+    ("user", "USER INPUT: {last_message}")
+])
+
+
+def test_repeat_prompt_is_served_from_cache():
+    print("\n🧪 TEST 1: Identical inputs hit the cache")
+    print("-" * 40)
+
+    cache = SQLiteLLMCache(":memory:")
+    llm = FakeListChatModel(responses=["plan-1", "plan-2"])
+    chain = cache.wrap(PROMPT | llm | StrOutputParser(), model="fake", prompt=PROMPT)
+
+    first = chain.invoke({"last_message": "EVM can be hacked"})
+    second = chain.invoke({"last_message": "EVM can be hacked"})
+    stats = cache.stats()
+
+    print(f"✅ Outputs: {first} / {second} | Stats: {stats}")
+    assert first == second == "plan-1", "Second call must not reach the LLM"
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_messages_round_trip_and_bypass():
+    print("\n🧪 TEST 2: AIMessage outputs round-trip, bypass forces a live call")
+    print("-" * 40)
+
+    cache = SQLiteLLMCache(":memory:")
+    llm = FakeListChatModel(responses=["profile-1", "profile-2"])
+    chain = cache.wrap(PROMPT | llm, model="fake", prompt=PROMPT)
+
+    chain.invoke({"last_message": "hi"})
+    cached = chain.invoke({"last_message": "hi"})
+    live = chain.invoke({"last_message": "hi"}, config={"configurable": {"llm_cache_bypass": True}})
+
+    print(f"✅ Cached: {cached.content} | Live: {live.content}")
+    assert cached.content == "profile-1"
+    assert live.content == "profile-2"
+    assert cache.stats()["bypassed"] == 1
+
+
+def test_ttl_and_size_eviction():
+    print("\n🧪 TEST 3: TTL and max_entries eviction")
+    print("-" * 40)
+
+    cache = SQLiteLLMCache(":memory:", ttl_seconds=1, max_entries=2)
+    for i in range(3):
+        cache.put(f"k{i}", f'"v{i}"')
+    assert cache.stats()["entries"] == 2, "Oldest entry must be evicted"
+    assert cache.get("k0") is None
+
+    time.sleep(1.1)
+    assert cache.get("k2") is None, "Expired entry must not be served"
+    print(f"✅ Stats: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    test_repeat_prompt_is_served_from_cache()
+    test_messages_round_trip_and_bypass()
+    test_ttl_and_size_eviction()
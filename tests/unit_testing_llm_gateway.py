@@ -0,0 +1,145 @@
+import sys
+import os
+import threading
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+from langchain_core.prompts import ChatPromptTemplate
+from src.runtime.llm_gateway import AdaptiveLimiter, LLMGateway, GatewayUnavailable, TokenBucket
+from src.runtime.stub_llm import StubLLMServer, StubChatModel
+
+PROMPT = ChatPromptTemplate.from_messages([
+    ("system", "You are the Final Responder."),
+    ("user", "{claim}")
+])
+
+
+def test_breaker_opens_on_429_storm():
+    print("\n🧪 TEST 1: A burst of 429s opens the breaker and sheds load")
+    print("-" * 40)
+
+    server = StubLLMServer(statuses=[429] * 3).start()
+    gateway = LLMGateway(failure_threshold=3, reset_timeout=0.5)
+    chain = PROMPT | gateway.guard(StubChatModel(url=server.url))
+
+    outcomes = []
+    for _ in range(5):
+        try:
+            chain.invoke({"claim": "EVM can be hacked"})
+            outcomes.append("ok")
+        except GatewayUnavailable:
+            outcomes.append("shed")
+        except Exception:
+            outcomes.append("error")
+
+    metrics = gateway.metrics()
+    print(f"✅ Outcomes: {outcomes} | Server hits: {server.requests_served} | {metrics}")
+    assert outcomes == ["error", "error", "error", "shed", "shed"]
+    assert server.requests_served == 3, "Open breaker must not reach the server"
+    assert metrics["concurrency_limit"] < 4, "Overload errors must shrink concurrency"
+
+    # After the reset timeout a half-open trial succeeds and closes the breaker
+    time.sleep(0.6)
+    reply = chain.invoke({"claim": "EVM can be hacked"})
+    print(f"✅ Recovered: {reply.content[:40]}...")
+    assert gateway.breaker.state == "closed"
+    server.stop()
+
+
+def test_concurrency_is_bounded():
+    print("\n🧪 TEST 2: Concurrent callers never exceed the limit")
+    print("-" * 40)
+
+    server = StubLLMServer(latency=0.2).start()
+    gateway = LLMGateway(initial_concurrency=2, max_concurrency=2, rate=100, burst=100)
+    llm = gateway.guard(StubChatModel(url=server.url))
+    peak = []
+
+    def call():
+        llm.invoke("hello")
+
+    def watch():
+        for _ in range(20):
+            peak.append(gateway.limiter.in_flight)
+            time.sleep(0.02)
+
+    threads = [threading.Thread(target=call) for _ in range(6)] + [threading.Thread(target=watch)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    print(f"✅ Peak in-flight: {max(peak)} | {gateway.metrics()}")
+    assert max(peak) <= 2
+    server.stop()
+
+
+def test_token_bucket_rate():
+    print("\n🧪 TEST 3: Token bucket refuses when the wait would be too long")
+    print("-" * 40)
+
+    bucket = TokenBucket(rate=1, capacity=2)
+    assert bucket.acquire(0) and bucket.acquire(0)
+    assert not bucket.acquire(0.1), "Third call within 100ms must be refused"
+    print("✅ Burst of 2 allowed, third refused")
+
+
+def test_limit_follows_each_call_kind():
+    print("\n🧪 TEST 4: Fast planner + slow responder calls do not starve the limit")
+    print("-" * 40)
+
+    limiter = AdaptiveLimiter(initial=4, max_limit=16, window=10)
+    for _ in range(40):
+        for kind, latency in (("planner", 0.3), ("responder", 4.0), ("memory", 1.0)):
+            assert limiter.acquire(0)
+            limiter.release(latency=latency, kind=kind)
+    grown = limiter.limit
+    print(f"Mixed traffic at steady latency -> limit {grown:.2f}")
+    assert grown > 4, "steady latency per kind must not shrink the limit"
+
+    # The backend gets permanently slower: the baseline moves up once the window has turned over
+    for _ in range(30):
+        assert limiter.acquire(0)
+        limiter.release(latency=1.5, kind="planner")
+    print(f"Planner baseline after slowdown: {limiter.baseline('planner')} | limit {limiter.limit:.2f}")
+    assert limiter.baseline("planner") == 1.5 and limiter.limit >= limiter.min_limit * 2
+    print("✅ SUCCESS")
+
+
+def test_breaker_ignores_bad_replies():
+    print("\n🧪 TEST 5: Parse / validation errors do not trip the breaker; timeouts do")
+    print("-" * 40)
+
+    gateway = LLMGateway(failure_threshold=2, reset_timeout=30, rate=100, burst=100)
+
+    def bad_json():
+        raise ValueError("1 validation error for SearchPlanList")
+
+    def timeout():
+        raise TimeoutError("read timed out")
+
+    for _ in range(5):
+        try:
+            gateway.call(bad_json, kind="planner")
+        except ValueError:
+            pass
+    assert gateway.breaker.state == "closed", "a healthy backend sending bad JSON is not an outage"
+    for _ in range(2):
+        try:
+            gateway.call(timeout, kind="planner")
+        except TimeoutError:
+            pass
+    print(f"✅ {gateway.metrics()}")
+    assert gateway.breaker.state == "open" and gateway.metrics()["failed"] == 7
+    print("✅ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_breaker_opens_on_429_storm()
+    test_concurrency_is_bounded()
+    test_token_bucket_rate()
+    test_limit_follows_each_call_kind()
+    test_breaker_ignores_bad_replies()
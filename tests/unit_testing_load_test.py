@@ -0,0 +1,81 @@
+import sys
+import os
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+from benchmarks.load_test import RSSSampler, load_report, simulate, user_script
+from src.runtime.metrics import span
+
+
+class FakeGraph:
+    """Two timed nodes and an LLM call per turn; messages containing 'boom' fail."""
+
+    def __init__(self, node_seconds=0.05):
+        self.node_seconds = node_seconds
+        self.seen = []
+
+    def stream(self, payload, config=None):
+        message = payload["messages"][-1][1]
+        self.seen.append((config["configurable"]["user_id"], config["configurable"]["thread_id"], message))
+        with span("execute_search", "node"):
+            time.sleep(self.node_seconds)
+        yield {"execute_search": {"retrieved_docs": "..."}}
+        if "boom" in message:
+            raise RuntimeError("stub LLM down")
+        with span("write_answer", "node"):
+            with span("llm.responder", "llm"):
+                time.sleep(self.node_seconds)
+        yield {"write_answer": {"messages": []}}
+
+
+def test_concurrent_users_and_report():
+    print("\n🧪 TEST 1: Concurrent users, per-node percentiles, throughput")
+    print("-" * 40)
+    queries = ["Can EVMs be hacked?", "Is VVPAT counting rigged?", "Are 15 lakh EVMs missing?"]
+    scripts = [user_script(queries, user, turns=3, images=["a.png"], image_every=2) for user in range(6)]
+    assert scripts[0] != scripts[1] and len(scripts[0]) == 3
+    assert any(image for script in scripts for _, image in script)
+
+    graph = FakeGraph()
+    with RSSSampler(interval=0.01) as sampler:
+        rows, wall = simulate(graph, scripts)
+    report = load_report(rows, wall)
+    print(report["end_to_end"], report["throughput_turns_per_sec"], f"peak {sampler.peak:.0f} MB")
+
+    assert report["turns"] == 18 and report["errors"] == 0
+    # Six users in parallel: about three sequential turns of ~0.1 s, not eighteen
+    assert wall < 18 * 0.1 * 0.6, wall
+    assert set(report["nodes"]) == {"execute_search", "write_answer"}
+    assert report["nodes"]["write_answer"]["n"] == 18
+    assert report["calls"]["llm:llm.responder"]["p50_ms"] >= 45
+    assert report["end_to_end"]["p99_ms"] >= report["end_to_end"]["p50_ms"] >= 95
+    # One thread per user, kept across that user's turns
+    threads = {}
+    for user_id, thread_id, _ in graph.seen:
+        threads.setdefault(user_id, set()).add(thread_id)
+    assert len(threads) == 6 and all(len(t) == 1 for t in threads.values())
+    assert sampler.peak > 0
+    print("✅ SUCCESS")
+
+
+def test_failed_turns_are_counted():
+    print("\n🧪 TEST 2: Failed turns are reported, not timed")
+    print("-" * 40)
+    scripts = [[("boom", None), ("Can EVMs be hacked?", None)] for _ in range(2)]
+    rows, wall = simulate(FakeGraph(node_seconds=0.01), scripts, think_time=0.01, ramp_up=0.02)
+    report = load_report(rows, wall)
+    print(report["errors"], report["error_samples"])
+    assert report["turns"] == 4 and report["errors"] == 2
+    assert report["end_to_end"]["n"] == 2
+    assert report["error_samples"] == ["RuntimeError('stub LLM down')"]
+    print("✅ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_concurrent_users_and_report()
+    test_failed_turns_are_counted()
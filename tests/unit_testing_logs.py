@@ -0,0 +1,73 @@
+import sys
+import os
+import contextvars
+import io
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+from src.runtime.logs import configure_logging, flush_logs, get_logger, log_context, stop_logging
+
+log = get_logger("src.tests.logs")
+
+
+def test_json_lines_carry_correlation_ids():
+    print("\n🧪 TEST 1: JSON output with thread_id / user_id")
+    print("-" * 40)
+    out = io.StringIO()
+    configure_logging(level="INFO", fmt="json", stream=out)
+
+    log.debug("hidden %s", "debug")
+    with log_context(thread_id="t-1", user_id="alice"):
+        log.info("🔍 [DENSE] Searching for: '%s'", "evm hacking")
+        # Pool threads that copy the context keep the ids (like the search pool)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(contextvars.copy_context().run, log.warning, "⏱️ %s dropped", "search_image").result()
+    log.error("outside the turn", extra={"stage": "verdict"})
+    flush_logs()
+
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    print(lines)
+    assert [l["msg"] for l in lines] == ["🔍 [DENSE] Searching for: 'evm hacking'", "⏱️ search_image dropped", "outside the turn"]
+    assert lines[0]["level"] == "INFO" and lines[0]["logger"] == "agent.tests.logs"
+    assert lines[0]["thread_id"] == lines[1]["thread_id"] == "t-1"
+    assert lines[1]["user_id"] == "alice"
+    assert "thread_id" not in lines[2] and lines[2]["stage"] == "verdict"
+    print("✅ SUCCESS")
+
+
+def test_console_format_and_disabled_cost():
+    print("\n🧪 TEST 2: Console output is the bare message; disabled levels cost ~nothing")
+    print("-" * 40)
+    out = io.StringIO()
+    configure_logging(level="WARNING", fmt="console", stream=out)
+
+    log.info("not shown")
+    log.warning("   ⚠️ Responder degraded: %s", "breaker open")
+    flush_logs()
+    assert out.getvalue() == "   ⚠️ Responder degraded: breaker open\n", out.getvalue()
+
+    class Expensive:
+        def __str__(self):
+            raise AssertionError("formatted although INFO is disabled")
+
+    n = 100_000
+    start = time.perf_counter()
+    for _ in range(n):
+        log.info("🔍 [HYBRID] Searching for: '%s'", Expensive())
+    per_call = (time.perf_counter() - start) / n
+    print(f"   disabled log.info: {per_call * 1e9:.0f} ns/call")
+    assert per_call < 5e-6
+    stop_logging()
+    print("✅ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_json_lines_carry_correlation_ids()
+    test_console_format_and_disabled_cost()
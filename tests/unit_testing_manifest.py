@@ -0,0 +1,106 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+from src.ingestion.manifest import IngestionManifest, content_hash, point_id, record_identity
+
+MYTH = {"payload": {"record_type": "official_truth", "debunked_myth": "EVMs can be hacked via bluetooth", "Reality": "v1"}}
+
+
+def simulate_run(manifest, records, chunks_per_record, source="myths.jsonl"):
+    """Mimics the pipeline: returns the keys that would be re-embedded."""
+    embedded = []
+    for record in records:
+        key = manifest.claim_key(record_identity(record, source), source)
+        h = content_hash(record)
+        if manifest.lookup(key)[0] == h: continue
+        manifest.stage(key, h, chunks_per_record.get(key, 1))
+        embedded.append(key)
+    return embedded
+
+
+def test_point_ids_are_deterministic():
+    print("\n🧪 TEST 1: Same record + chunk -> same point id")
+    print("-" * 40)
+
+    key = record_identity(MYTH, "myths.jsonl")
+    assert point_id(key, 0) == point_id(record_identity(dict(MYTH), "myths.jsonl"), 0)
+    assert point_id(key, 0) != point_id(key, 1)
+    print(f"✅ {point_id(key, 0)}")
+
+
+def test_rerun_only_embeds_changes():
+    print("\n🧪 TEST 2: Re-run embeds only changed records, detects removals")
+    print("-" * 40)
+
+    other = {"payload": {"record_type": "official_truth", "debunked_myth": "VVPAT slips destroyed", "Reality": "v1"}}
+    manifest = IngestionManifest(":memory:")
+    assert len(simulate_run(manifest, [MYTH, other], {})) == 2
+    manifest.commit_run(removed_keys=[k for k, _ in manifest.removed(["myths.jsonl"])])
+
+    # Run 2: MYTH edited, 'other' removed from the feed
+    manifest.run_id = "run-2"
+    edited = {"payload": {**MYTH["payload"], "Reality": "v2"}}
+    embedded = simulate_run(manifest, [edited], {})
+    removed = manifest.removed(["myths.jsonl"])
+
+    print(f"✅ Re-embedded: {len(embedded)} | Removed: {len(removed)}")
+    assert len(embedded) == 1
+    assert len(removed) == 1 and removed[0][1] == 1, "Removed record must report its chunk count"
+    manifest.commit_run(removed_keys=[k for k, _ in removed])
+
+    # Run 3: nothing changed
+    manifest.run_id = "run-3"
+    assert simulate_run(manifest, [edited], {}) == []
+    print("✅ Unchanged feed -> nothing to embed")
+
+
+def test_shrunk_record_reports_stale_chunks():
+    print("\n🧪 TEST 3: A record that shrinks from 3 to 1 chunks leaves 2 stale ids")
+    print("-" * 40)
+
+    manifest = IngestionManifest(":memory:")
+    key = record_identity(MYTH, "myths.jsonl")
+    simulate_run(manifest, [MYTH], {key: 3})
+    manifest.commit_run()
+
+    manifest.run_id = "run-2"
+    simulate_run(manifest, [{"payload": {**MYTH["payload"], "Reality": "short"}}], {key: 1})
+    stale = manifest.stale_point_ids()
+    print(f"✅ Stale: {stale}")
+    assert stale == [point_id(key, 1), point_id(key, 2)]
+
+
+def test_failed_record_keeps_its_points():
+    print("\n🧪 TEST 4: A record that fails to embed keeps its committed state and is retried")
+    print("-" * 40)
+
+    manifest = IngestionManifest(":memory:")
+    key = record_identity(MYTH, "myths.jsonl")
+    simulate_run(manifest, [MYTH], {key: 3})
+    manifest.commit_run()
+
+    # Run 2: the record changed but its image download failed -> claimed, never staged
+    manifest.run_id = "run-2"
+    edited = {"payload": {**MYTH["payload"], "Reality": "v2"}}
+    assert manifest.claim_key(record_identity(edited, "myths.jsonl"), "myths.jsonl") == key
+    assert manifest.stale_point_ids() == [] and manifest.removed(["myths.jsonl"]) == []
+    manifest.commit_run()
+    assert manifest.lookup(key) == (content_hash(MYTH), 3), "old hash and chunks must survive a failure"
+
+    # Run 3: the image is back -> the edit is picked up
+    manifest.run_id = "run-3"
+    assert simulate_run(manifest, [edited], {key: 3}) == [key]
+    print("✅ Nothing deleted on failure, retried on the next run")
+
+
+if __name__ == "__main__":
+    test_point_ids_are_deterministic()
+    test_rerun_only_embeds_changes()
+    test_shrunk_record_reports_stale_chunks()
+    test_failed_record_keeps_its_points()
@@ -0,0 +1,101 @@
+import sys
+import os
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypedDict
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import StateGraph, START, END
+from src.runtime.metrics import (
+    counter,
+    format_trace,
+    histogram,
+    metrics_json,
+    prometheus_text,
+    register_collector,
+    span,
+    traced_node,
+    turn_trace,
+)
+
+
+def test_prometheus_and_json():
+    print("\n🧪 TEST 1: Histogram / counter / collector export")
+    print("-" * 40)
+    h = histogram("test_latency_seconds", "Test latencies", buckets=(0.01, 0.1, 1))
+    for value in (0.005, 0.05, 0.05, 0.5, 5):
+        h.observe(value, stage="search")
+    counter("test_plans_total", "Test plans").inc(tool="search_hybrid")
+    counter("test_plans_total", "Test plans").inc(2, tool="search_hybrid")
+    register_collector("test_cache", lambda: {"hits": 3, "misses": 1, "state": "closed"})
+
+    text = prometheus_text()
+    assert 'test_latency_seconds_bucket{stage="search",le="0.01"} 1' in text
+    assert 'test_latency_seconds_bucket{stage="search",le="0.1"} 3' in text
+    assert 'test_latency_seconds_bucket{stage="search",le="+Inf"} 5' in text
+    assert 'test_latency_seconds_count{stage="search"} 5' in text
+    assert 'test_plans_total{tool="search_hybrid"} 3' in text
+    assert "test_cache_hits 3" in text and "test_cache_state" not in text
+
+    series = metrics_json()["test_latency_seconds"]["series"][0]
+    print(f"JSON series: {series}")
+    assert series["count"] == 5 and series["p50"] == 0.05 and series["max"] == 5
+    print("✅ SUCCESS")
+
+
+def test_turn_trace_follows_nodes_and_pools():
+    print("\n🧪 TEST 2: Node + call spans land in the turn trace (pool threads included)")
+    print("-" * 40)
+
+    class State(TypedDict):
+        x: int
+
+    pool = ThreadPoolExecutor(max_workers=2)
+
+    def search(state):
+        def call():
+            with span("qdrant.dense_text", "db"):
+                time.sleep(0.02)
+        futures = [pool.submit(contextvars.copy_context().run, call) for _ in range(2)]
+        for f in futures:
+            f.result()
+        return {"x": 1}
+
+    def writer(state, config: RunnableConfig):
+        # The wrapper must keep the signature, or LangGraph stops passing `config`
+        assert config["configurable"]["user_id"] == "u1"
+        with span("llm.responder", "llm"):
+            time.sleep(0.01)
+        return {"x": 2}
+
+    graph = StateGraph(State)
+    graph.add_node("execute_search", traced_node("execute_search", search))
+    graph.add_node("write_answer", traced_node("write_answer", writer))
+    graph.add_edge(START, "execute_search")
+    graph.add_edge("execute_search", "write_answer")
+    graph.add_edge("write_answer", END)
+    app = graph.compile()
+
+    with turn_trace() as trace:
+        app.invoke({"x": 0}, config={"configurable": {"user_id": "u1"}})
+    print(format_trace(trace))
+    names = [name for name, _, _, _ in trace.spans]
+    assert names.count("qdrant.dense_text") == 2, names
+    assert {"execute_search", "write_answer", "llm.responder"} <= set(names)
+
+    with span("outside.any.turn", "db"):
+        pass
+    assert "outside.any.turn" not in [n for n, _, _, _ in trace.spans]
+    print("✅ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_prometheus_and_json()
+    test_turn_trace_follows_nodes_and_pools()
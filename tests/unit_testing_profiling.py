@@ -0,0 +1,128 @@
+import sys
+import os
+import glob
+import json
+import signal
+import tempfile
+import threading
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+from src.runtime.profiling import install_profile_signal, maybe_profile, profile_session
+
+
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    n = 0
+    while time.perf_counter() < end:
+        n += 1
+    return n
+
+
+def fake_stage(filename, source):
+    """A function whose frames look like they come from `filename` (e.g. the search tool)."""
+    namespace = {}
+    exec(compile(source, filename, "exec"), namespace)
+    return namespace["run"]
+
+
+def read_folded(path):
+    with open(path) as f:
+        rows = [line.rsplit(" ", 1) for line in f.read().splitlines()]
+    return {stack: int(weight) for stack, weight in rows}
+
+
+def test_cpu_profiles_are_folded_stacks():
+    print("\n🧪 TEST 1: Sampling (all threads) and cProfile -> folded stacks")
+    print("-" * 40)
+    with tempfile.TemporaryDirectory() as tmp:
+        with profile_session("sample", name="turn", directory=tmp, interval=0.002) as session:
+            worker = threading.Thread(target=spin, args=(0.2,), name="search_0")
+            worker.start()
+            spin(0.2)
+            worker.join()
+        stacks = read_folded(os.path.join(tmp, "turn.folded"))
+        print(f"   {len(stacks)} stacks, {sum(stacks.values())} samples")
+        assert session.paths == [os.path.join(tmp, "turn.folded")]
+        assert any(s.startswith("search;") and "spin (" in s for s in stacks)  # pool threads grouped by name
+        assert any(s.startswith("MainThread;") and "spin (" in s for s in stacks)
+        assert not any("profile-sampler" in s for s in stacks)
+
+        with profile_session("cprofile", name="traced", directory=tmp) as session:
+            spin(0.05)
+        assert sorted(os.path.basename(p) for p in session.paths) == ["traced.folded", "traced.prof"]
+        stacks = read_folded(os.path.join(tmp, "traced.folded"))
+        assert any(s.endswith(")") and "spin (" in s for s in stacks)
+        assert all(weight > 0 for weight in stacks.values())
+    print("✅ SUCCESS")
+
+
+def test_memory_by_stage_and_off_switch():
+    print("\n🧪 TEST 2: tracemalloc attributed to model / search / prompt")
+    print("-" * 40)
+    search = fake_stage(
+        os.path.join(parent_dir, "src", "tools", "qdrant_search.py"),
+        "def run():\n    return [bytes(1024) for _ in range(2000)]\n",
+    )
+    prompt = fake_stage(
+        os.path.join(parent_dir, "src", "nodes", "researcher.py"),
+        "def run():\n    return ['evidence %d ' % i * 20 for i in range(1000)]\n",
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        with profile_session(None, memory=True, name="turn", directory=tmp) as session:
+            kept = (search(), prompt())
+        with open(os.path.join(tmp, "turn.mem.json")) as f:
+            report = json.load(f)
+        print(report["stages"])
+        assert report["stages"]["search"]["bytes"] >= 2000 * 1024
+        assert report["stages"]["prompt"]["bytes"] > 100_000
+        assert report["stages"]["model"]["bytes"] < report["stages"]["search"]["bytes"]
+        assert report["top"][0]["where"].startswith("src/tools/qdrant_search.py:")
+        assert any(s.startswith("search;") for s in read_folded(os.path.join(tmp, "turn.mem.folded")))
+        assert len(session.paths) == 2  # no CPU profile asked for
+
+        with maybe_profile(None, False) as nothing:
+            spin(0.01)
+        assert nothing is None and len(os.listdir(tmp)) == 2
+    del kept
+    print("✅ SUCCESS")
+
+
+def test_signal_opens_a_window():
+    print("\n🧪 TEST 3: SIGUSR1 profiles a time window")
+    print("-" * 40)
+    import src.runtime.profiling as profiling
+    previous = (signal.getsignal(signal.SIGUSR1), profiling.PROFILE_DIR)
+    with tempfile.TemporaryDirectory() as tmp:
+        profiling.PROFILE_DIR = tmp
+        try:
+            install_profile_signal("sample", seconds=0.3, prefix="serve")
+            os.kill(os.getpid(), signal.SIGUSR1)
+            os.kill(os.getpid(), signal.SIGUSR1)  # ignored while the window is open
+            spin(0.5)
+            deadline = time.time() + 5
+            while not glob.glob(os.path.join(tmp, "serve-*.folded")) and time.time() < deadline:
+                time.sleep(0.05)
+            files = glob.glob(os.path.join(tmp, "serve-*.folded"))
+            print(files)
+            assert len(files) == 1
+            try:
+                install_profile_signal("cprofile")
+                raise AssertionError("cprofile cannot follow a window")
+            except ValueError:
+                pass
+        finally:
+            signal.signal(signal.SIGUSR1, previous[0])
+            profiling.PROFILE_DIR = previous[1]
+    print("✅ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_cpu_profiles_are_folded_stacks()
+    test_memory_by_stage_and_off_switch()
+    test_signal_opens_a_window()
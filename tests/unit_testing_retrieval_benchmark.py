@@ -0,0 +1,92 @@
+import sys
+import os
+import json
+import tempfile
+from types import SimpleNamespace
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+from benchmarks.retrieval import build_golden, compare_reports, evaluate, is_relevant
+
+GOLDEN = build_golden()
+MYTHS = {q["expected"]["value"] for q in GOLDEN if q["expected"]["field"] == "debunked_myth"}
+
+
+def hit(**payload):
+    return SimpleNamespace(payload=payload)
+
+
+def test_golden_set_from_seed_data():
+    print("\n🧪 TEST 1: Golden queries cover myths, FAQs and visuals")
+    print("-" * 40)
+    kinds = {}
+    for q in GOLDEN:
+        kinds[q["kind"]] = kinds.get(q["kind"], 0) + 1
+    print(kinds)
+    assert kinds["myth_exact"] == kinds["myth_question"] == len(MYTHS) > 0
+    assert kinds["faq_lead"] > 0 and kinds["visual_title"] > 0
+    assert {q["input"] for q in GOLDEN if q["kind"].startswith("image_")} == {"image"}
+    assert len({q["id"] for q in GOLDEN}) == len(GOLDEN)
+    assert build_golden() == GOLDEN  # deterministic
+
+    faq = next(q for q in GOLDEN if q["kind"] == "faq_lead")
+    full = faq["expected"]["value"]
+    # Any chunk of the record counts, other records do not
+    assert is_relevant({"text_content": full[:300]}, faq["expected"])
+    assert not is_relevant({"text_content": "Something else entirely"}, faq["expected"])
+    print("✅ SUCCESS")
+
+
+def test_recall_mrr_and_compare():
+    print("\n🧪 TEST 2: recall@k / MRR / latency from fake searches, run comparison")
+    print("-" * 40)
+    myth_queries = [q for q in GOLDEN if q["kind"] == "myth_exact"][:10]
+    image_queries = [q for q in GOLDEN if q["input"] == "image"]
+
+    def perfect(query, limit):
+        myth = next(q["expected"]["value"] for q in myth_queries if q["query"] == query)
+        return [hit(debunked_myth=myth)] + [hit(debunked_myth="other")] * (limit - 1)
+
+    def third(query, limit):
+        myth = next(q["expected"]["value"] for q in myth_queries if q["query"] == query)
+        return [hit(debunked_myth="other"), hit(), hit(debunked_myth=myth)][:limit]
+
+    def broken(query, limit):
+        raise RuntimeError("qdrant down")
+
+    results = evaluate(
+        myth_queries + image_queries,
+        {"search_dense": perfect, "search_sparse": third, "search_image": broken},
+        ks=[1, 3], repeat=2, concurrency=2,
+    )
+    print(json.dumps({t: r["overall"] for t, r in results.items()}, indent=2))
+    dense, sparse, image = (results[t]["overall"] for t in ("search_dense", "search_sparse", "search_image"))
+    assert dense["n"] == 20 and dense["recall@1"] == 1.0 and dense["mrr"] == 1.0
+    assert sparse["recall@1"] == 0.0 and sparse["recall@3"] == 1.0 and abs(sparse["mrr"] - 1 / 3) < 1e-3
+    assert image["errors"] == image["n"] == 2 * len(image_queries) and image["recall@3"] == 0.0
+    assert set(results["search_image"]["misses"]) == {q["id"] for q in image_queries}
+    assert {"p50_ms", "p95_ms", "p99_ms", "qps"} <= set(dense)
+
+    # The report survives a JSON round trip and compares run against run
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "run.json")
+        with open(path, "w") as f:
+            json.dump({"meta": {"label": "base"}, "results": results}, f)
+        with open(path) as f:
+            base = json.load(f)
+    worse = json.loads(json.dumps(base))
+    worse["results"]["search_dense"]["overall"]["recall@1"] = 0.8
+    _, regressions = compare_reports(base, worse, max_recall_drop=0.05)
+    assert regressions == ["search_dense recall@1 1.0 -> 0.8"], regressions
+    _, regressions = compare_reports(base, base, max_recall_drop=0.0, max_p95_increase=0.0)
+    assert regressions == []
+    print("✅ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_golden_set_from_seed_data()
+    test_recall_mrr_and_compare()
@@ -0,0 +1,65 @@
+import sys
+import os
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+from src.tools.search_plan import build_plan_models, optimize_plans
+
+SCHEMA = {"category": "keyword", "topic_tags": "keyword", "trust_score": "float"}
+
+
+def test_schema_parses_planner_output():
+    print("\n🧪 TEST 1: Planner JSON validates against the plan schema")
+    print("-" * 40)
+
+    SearchPlanList = build_plan_models(SCHEMA)
+    parsed = SearchPlanList.model_validate({"plans": [{
+        "tool": "search_hybrid",
+        "query": "EVM hacking bluetooth",
+        "filters": {"category": ["Busted fake news"], "trust_score": 0.9},
+        "purpose": "Verify the text claim"
+    }]})
+    print(f"✅ Parsed: {parsed.plans[0]}")
+    assert parsed.plans[0].filters.category == ["Busted fake news"]
+
+
+def test_duplicates_are_merged():
+    print("\n🧪 TEST 2: Same query on hybrid + dense + sparse becomes one search")
+    print("-" * 40)
+
+    plans = optimize_plans([
+        {"tool": "search_hybrid", "query": "EVM can be hacked", "filters": {"topic_tags": ["EVM security"]}, "purpose": "Check claim"},
+        {"tool": "search_dense", "query": "evm can be  hacked", "filters": {"topic_tags": "Election scams"}, "purpose": "Semantic check"},
+        {"tool": "search_sparse", "query": "EVM can be hacked", "filters": None, "purpose": "Keyword check"},
+    ], SCHEMA)
+
+    print(f"✅ Optimised: {plans}")
+    assert len(plans) == 1
+    assert plans[0]["tool"] == "search_hybrid"
+    assert plans[0]["filters"] is None, "Merged search must not be narrower than any input plan"
+
+
+def test_filters_validated_and_plans_capped():
+    print("\n🧪 TEST 3: Unknown fields dropped, image plans need an image, count capped")
+    print("-" * 40)
+
+    plans = optimize_plans([
+        {"tool": "search_image", "query": "assets/random.jpg", "filters": {}, "purpose": "Hallucinated image"},
+        {"tool": "search_hybrid", "query": "VVPAT price", "filters": {"invented_field": "x", "trust_score": "0.9"}, "purpose": "a"},
+        {"tool": "search_hybrid", "query": "Form 17C", "filters": None, "purpose": "b"},
+        {"tool": "search_hybrid", "query": "Voter eligibility", "filters": None, "purpose": "c"},
+    ], SCHEMA, max_plans=2, image_path="None")
+
+    print(f"✅ Optimised: {plans}")
+    assert [p["query"] for p in plans] == ["VVPAT price", "Form 17C"]
+    assert plans[0]["filters"] == {"trust_score": 0.9}
+
+
+if __name__ == "__main__":
+    test_schema_parses_planner_output()
+    test_duplicates_are_merged()
+    test_filters_validated_and_plans_capped()
@@ -0,0 +1,104 @@
+import sys
+import os
+import threading
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+from src.runtime.singleflight import SingleFlight, coalesced, make_key
+
+
+def test_concurrent_calls_coalesce():
+    print("\n🧪 TEST 1: Concurrent identical calls share one execution")
+    print("-" * 40)
+
+    group = SingleFlight("test_concurrent")
+    executions = []
+
+    @coalesced(group, "slow_search", text_fields=("query_text",))
+    def slow_search(query_text, filters=None, limit=5):
+        executions.append(query_text)
+        time.sleep(0.2)
+        return [query_text, limit]
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda q=q: results.append(slow_search(q)))
+        for q in ["EVM can be hacked", "  evm can be HACKED ", "EVM can be hacked"]
+    ]
+    for t in threads: t.start()
+    for t in threads: t.join()
+
+    metrics = group.metrics()
+    print(f"✅ Metrics: {metrics}")
+    assert len(executions) == 1, "Normalized duplicates must run once"
+    assert metrics["coalesced"] == 2
+    assert all(r == results[0] for r in results)
+
+
+def test_errors_are_shared_and_not_cached():
+    print("\n🧪 TEST 2: Errors propagate to waiters and are not remembered")
+    print("-" * 40)
+
+    group = SingleFlight("test_errors")
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise RuntimeError("qdrant down")
+
+    try:
+        group.do("k", failing)
+    except RuntimeError as e:
+        print(f"✅ Raised: {e}")
+    assert group.do("k", lambda: "ok") == "ok", "Key must be released after a failure"
+    assert group.metrics()["in_flight"] == 0
+
+
+def test_keys_ignore_argument_style():
+    print("\n🧪 TEST 3: Filters order does not change the key, filter values stay exact")
+    print("-" * 40)
+
+    a = make_key("hybrid", {"category": "News", "trust_score": 0.9})
+    b = make_key("hybrid", {"trust_score": 0.9, "category": "News"})
+    print(f"✅ Key: {a}")
+    assert a == b
+    assert a != make_key("hybrid", {"category": "news", "trust_score": 0.9}), "Qdrant matches are case-sensitive"
+
+
+def test_image_paths_are_case_sensitive():
+    print("\n🧪 TEST 4: Different images never share a search")
+    print("-" * 40)
+
+    group = SingleFlight("test_images")
+    gate = threading.Event()
+
+    @coalesced(group, "search_image", ignore=("deadline",))
+    def search_image(image_source, filters=None, limit=5, deadline=None):
+        gate.wait(1)
+        return image_source
+
+    results = {}
+    threads = [
+        threading.Thread(target=lambda p=p: results.__setitem__(p, search_image(p)))
+        for p in ["/img/A.jpg", "/img/a.jpg", "https://example.org/img/A.jpg", "https://example.org/img/a.jpg"]
+    ]
+    for t in threads: t.start()
+    time.sleep(0.1)
+    gate.set()
+    for t in threads: t.join()
+
+    print(f"✅ {results} | {group.metrics()}")
+    assert all(source == result for source, result in results.items()), "A caller got another image's results"
+    assert group.metrics()["coalesced"] == 0
+
+
+if __name__ == "__main__":
+    test_concurrent_calls_coalesce()
+    test_errors_are_shared_and_not_cached()
+    test_keys_ignore_argument_style()
+    test_image_paths_are_case_sensitive()
@@ -0,0 +1,131 @@
+import sys
+import os
+import shutil
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+import numpy as np
+from qdrant_client import QdrantClient, models
+from src.ingestion.aliases import resolve_alias, swap_alias, versioned_name
+from src.ingestion.snapshots import export_bundle, restore_bundle, restore_bundles
+
+
+def seed(client):
+    name = versioned_name("Data", 1)
+    client.create_collection(
+        collection_name=name,
+        vectors_config={
+            "dense_text": models.VectorParams(size=8, distance=models.Distance.COSINE),
+            "dense_image": models.VectorParams(size=4, distance=models.Distance.COSINE),
+        },
+        sparse_vectors_config={"sparse_text": models.SparseVectorParams(modifier=models.Modifier.IDF)},
+    )
+    rng = np.random.default_rng(0)
+    points = []
+    for i in range(30):
+        vector = {
+            "dense_text": rng.normal(size=8).tolist(),
+            "sparse_text": models.SparseVector(indices=[i, 100 + i], values=[1.0, 0.5]),
+        }
+        if i % 3 == 0:
+            vector["dense_image"] = rng.normal(size=4).tolist()
+        points.append(models.PointStruct(id=i, vector=vector, payload={"title": f"doc {i}", "tags": ["a", "b"]}))
+    client.upsert(collection_name=name, points=points)
+    swap_alias(client, "Data", name)
+    return points
+
+
+def test_bundle_round_trip():
+    print("\n🧪 TEST 1: Bundle export -> restore into a fresh in-memory Qdrant")
+    print("-" * 40)
+
+    folder = tempfile.mkdtemp()
+    try:
+        source = QdrantClient(":memory:")
+        original = seed(source)
+        manifest = export_bundle(source, "Data", folder, part_size=7)
+
+        target = QdrantClient(":memory:")
+        result = restore_bundle(target, os.path.join(folder, "Data"))
+        print(f"Manifest: {manifest['points']} points / {manifest['parts']} parts | restored: {result}")
+
+        restored = {p.id: p for p in target.retrieve("Data", ids=[0, 1], with_vectors=True)}
+        assert resolve_alias(target, "Data") == result["collection"], "Alias must be recreated"
+        assert result["points"] == 30
+        assert "dense_image" in restored[0].vector and "dense_image" not in restored[1].vector
+        assert restored[1].vector["sparse_text"].indices == [1, 101]
+        # Cosine collections store normalized vectors
+        expected = np.asarray(original[0].vector["dense_text"])
+        assert np.allclose(restored[0].vector["dense_text"], expected / np.linalg.norm(expected), atol=1e-6)
+        assert restored[0].payload == original[0].payload
+        print("✅ SUCCESS: vectors, sparse terms, payloads and alias survive the round trip.")
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_restore_into_populated_collection():
+    print("\n🧪 TEST 2: Restoring into a collection that already has points")
+    print("-" * 40)
+
+    folder = tempfile.mkdtemp()
+    try:
+        source = QdrantClient(":memory:")
+        original = seed(source)
+        # Plain (non-aliased) export, restored into a target that holds 5 unrelated points
+        export_bundle(source, versioned_name("Data", 1), folder, part_size=7)
+
+        target = QdrantClient(":memory:")
+        name = versioned_name("Data", 1)
+        target.create_collection(collection_name=name, vectors_config=source.get_collection(name).config.params.vectors,
+                                 sparse_vectors_config=source.get_collection(name).config.params.sparse_vectors)
+        target.upsert(collection_name=name, points=[
+            models.PointStruct(id=1000 + i, vector={"dense_text": p.vector["dense_text"]}, payload={"title": "extra"})
+            for i, p in enumerate(original[:5])
+        ])
+        result = restore_bundle(target, os.path.join(folder, name))
+        total = target.count(collection_name=name, exact=True).count
+        print(f"Restored: {result} | collection now holds {total}")
+        assert result["points"] == 30 and total == 35
+        print("✅ SUCCESS: existing points do not fail the check.")
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_restore_export_directory():
+    print("\n🧪 TEST 3: Restoring a whole export directory (QDRANT_BOOTSTRAP_BUNDLE)")
+    print("-" * 40)
+
+    folder = tempfile.mkdtemp()
+    try:
+        source = QdrantClient(":memory:")
+        seed(source)
+        source.create_collection(
+            collection_name="profiles",
+            vectors_config={"summary_vector": models.VectorParams(size=4, distance=models.Distance.COSINE)},
+        )
+        source.upsert(collection_name="profiles", points=[models.PointStruct(id=1, vector={"summary_vector": [1, 0, 0, 0]})])
+        for name in ("Data", "profiles"):
+            export_bundle(source, name, folder)
+
+        target = QdrantClient(":memory:")
+        results = restore_bundles(target, folder)
+        print(f"Restored: {results}")
+        assert [r["points"] for r in results] == [30, 1]
+        assert resolve_alias(target, "Data") == results[0]["collection"]
+        assert target.count(collection_name="profiles", exact=True).count == 1
+        # A single bundle directory works too
+        assert restore_bundles(QdrantClient(":memory:"), os.path.join(folder, "profiles"))[0]["points"] == 1
+        print("✅ SUCCESS: every bundle in the export lands in the client.")
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    test_bundle_round_trip()
+    test_restore_into_populated_collection()
+    test_restore_export_directory()
@@ -0,0 +1,229 @@
+import sys
+import os
+import shutil
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+# Get the parent directory (mas_election_agent/)
+parent_dir = os.path.dirname(current_dir)
+# Add the parent directory to Python's search path
+sys.path.append(parent_dir)
+
+import numpy as np
+from PIL import Image
+from src.ingestion.visual import ImageDownloader, VisualPipeline
+
+
+class CountingModel:
+    """Stands in for CLIP: records batch sizes, returns one vector per image."""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, images, batch_size=32, **kwargs):
+        self.calls.append((len(images), [img.size for img in images]))
+        return np.ones((len(images), 4), dtype=np.float32)
+
+
+def make_image(folder, name, size, mode="RGBA"):
+    path = os.path.join(folder, name)
+    Image.new(mode, size, color=(200, 10, 10, 255) if mode == "RGBA" else 128).save(path)
+    return path
+
+
+def test_batched_pipeline():
+    print("\n🧪 TEST 1: Local images are decoded, downscaled and encoded in ONE call")
+    print("-" * 40)
+
+    folder = tempfile.mkdtemp()
+    try:
+        paths = [make_image(folder, f"img{i}.png", (1200, 800)) for i in range(3)]
+        model = CountingModel()
+        visual = VisualPipeline(model, os.path.join(folder, "cache"), decode_workers=2, max_side=224)
+        vectors = visual.embed(paths + [os.path.join(folder, "missing.png")])
+        visual.close()
+
+        batch, sizes = model.calls[0]
+        print(f"Encode calls: {len(model.calls)} | batch {batch} | sizes {sizes}")
+        print(f"Stages: {visual.stats.summary()}")
+        if len(model.calls) == 1 and batch == 3 and all(max(s) <= 224 for s in sizes) \
+                and vectors[os.path.join(folder, "missing.png")] is None \
+                and visual.stats.summary()["fetch"]["failed"] == 1:
+            print("✅ SUCCESS: one batched encode, downscaled images, missing file reported not raised.")
+        else:
+            print("❌ FAILURE: unexpected pipeline behaviour.")
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_content_addressed_cache():
+    print("\n🧪 TEST 2: Two URLs with identical bytes share one cached blob")
+    print("-" * 40)
+
+    folder = tempfile.mkdtemp()
+    try:
+        downloader = ImageDownloader(folder, retries=1)
+
+        class FakeResponse:
+            content = b"same-image-bytes"
+            def raise_for_status(self): pass
+
+        import src.ingestion.visual as visual_module
+        original_get = visual_module.requests.get
+        fetched = []
+        visual_module.requests.get = lambda url, timeout: fetched.append(url) or FakeResponse()
+        try:
+            first = downloader.fetch("https://example.org/a.png")
+            second = downloader.fetch("https://example.org/b.png")
+            again = downloader.fetch("https://example.org/a.png")
+        finally:
+            visual_module.requests.get = original_get
+
+        blobs = os.listdir(downloader.blob_dir)
+        print(f"Network fetches: {len(fetched)} | blobs on disk: {len(blobs)}")
+        if first == second == again and len(blobs) == 1 and len(fetched) == 2:
+            print("✅ SUCCESS: duplicates stored once, repeat URL served from the cache.")
+        else:
+            print("❌ FAILURE: cache did not dedupe by content.")
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_changed_image_behind_same_url():
+    print("\n🧪 TEST 3: Images are identified by their bytes, not their URL")
+    print("-" * 40)
+
+    folder = tempfile.mkdtemp()
+    try:
+        import src.ingestion.visual as visual_module
+
+        class FakeResponse:
+            def __init__(self, content): self.content = content
+            def raise_for_status(self): pass
+
+        served = {"https://example.org/a.png": b"v1", "https://example.org/copy.png": b"v1"}
+        original_get = visual_module.requests.get
+        visual_module.requests.get = lambda url, timeout: FakeResponse(served[url])
+        try:
+            first = VisualPipeline(CountingModel(), folder)
+            paths = first.fetch(list(served))
+            digests = {url: first.downloader.digest(p) for url, p in paths.items()}
+            # Same bytes at two URLs -> one content key
+            assert len(set(digests.values())) == 1, digests
+
+            # Next run: the image behind the URL changed -> new bytes, new key
+            served["https://example.org/a.png"] = b"v2"
+            second = VisualPipeline(CountingModel(), folder)
+            changed = second.downloader.digest(second.fetch(["https://example.org/a.png"])["https://example.org/a.png"])
+        finally:
+            visual_module.requests.get = original_get
+
+        local = os.path.join(folder, "local.bin")
+        with open(local, "wb") as f:
+            f.write(b"v1")
+        print(f"Keys: {digests} -> {changed}")
+        assert changed != digests["https://example.org/a.png"]
+        assert first.downloader.digest(local) == digests["https://example.org/copy.png"]
+        print("✅ SUCCESS: content keys follow the bytes.")
+    finally:
+        shutil.rmtree(folder)
+
+
+def test_dead_url_costs_no_final_backoff():
+    print("\n🧪 TEST 4: A dead URL only waits between attempts, not after the last one")
+    print("-" * 40)
+
+    folder = tempfile.mkdtemp()
+    try:
+        import time
+        import src.ingestion.visual as visual_module
+        downloader = ImageDownloader(folder, retries=3, backoff=0.1)  # waits 0.1 + 0.2, never the 0.4
+        attempts = []
+
+        def dead(url, timeout):
+            attempts.append(url)
+            raise ConnectionError("connection refused")
+
+        original_get = visual_module.requests.get
+        visual_module.requests.get = dead
+        started = time.perf_counter()
+        try:
+            downloader.fetch("https://example.org/gone.png")
+            raise AssertionError("dead URL returned a path")
+        except ConnectionError:
+            pass
+        finally:
+            visual_module.requests.get = original_get
+        elapsed = time.perf_counter() - started
+        print(f"Attempts: {len(attempts)} | gave up after {elapsed:.2f}s")
+        assert len(attempts) == 3 and 0.3 <= elapsed < 0.6, elapsed
+        print("✅ SUCCESS")
+    finally:
+        shutil.rmtree(folder)
+
+
+# Importing any of these loads the models (or a Qdrant client)
+MODEL_MODULES = ("src.config", "src.ingestion.pipeline", "src.ingestion.records", "src.batch", "src.tools",
+                 "src.nodes", "src.graph", "sentence_transformers", "torch", "fastembed")
+# Scripts that can start the decode pool (through ingest / reindex / batch verification)
+ENTRY_SCRIPTS = ["batch_verify.py", "setup/ingest.py", "setup/populate_qdrant.py", "setup/snapshot.py",
+                 "benchmarks/load_test.py", "benchmarks/retrieval.py"]
+
+
+def loaded_modules():
+    return sorted(sys.modules)
+
+
+def _top_level_imports(path):
+    """Modules imported when the file is imported (not run): skips functions and the __main__ guard."""
+    import ast
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    names = []
+
+    def visit(statements):
+        for node in statements:
+            if isinstance(node, ast.Import):
+                names.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                names.append(node.module)
+            elif isinstance(node, ast.If) and "__main__" in ast.dump(node.test):
+                continue
+            elif isinstance(node, (ast.If, ast.Try, ast.With)):
+                visit(node.body)
+                visit(getattr(node, "orelse", []))
+    visit(tree.body)
+    return names
+
+
+def test_decode_workers_stay_model_free():
+    print("\n🧪 TEST 5: Spawned decode workers (and the entry scripts they re-import) load no models")
+    print("-" * 40)
+
+    folder = tempfile.mkdtemp()
+    try:
+        visual = VisualPipeline(CountingModel(), folder, decode_workers=1)
+        in_worker = visual._pool().submit(loaded_modules).result(timeout=60)
+        visual.close()
+    finally:
+        shutil.rmtree(folder)
+    heavy = [m for m in in_worker if m.startswith(MODEL_MODULES)]
+    print(f"Worker modules: {len(in_worker)} | model modules: {heavy}")
+    assert not heavy, heavy
+
+    offenders = {}
+    for script in ENTRY_SCRIPTS:
+        bad = [m for m in _top_level_imports(os.path.join(parent_dir, script)) if m.startswith(MODEL_MODULES)]
+        if bad:
+            offenders[script] = bad
+    print(f"Entry scripts importing models at top level: {offenders}")
+    assert not offenders, "move these imports under `if __name__ == '__main__':` or into the command"
+    print("✅ SUCCESS")
+
+
+if __name__ == "__main__":
+    test_batched_pipeline()
+    test_content_addressed_cache()
+    test_changed_image_behind_same_url()
+    test_dead_url_costs_no_final_backoff()
+    test_decode_workers_stay_model_free()